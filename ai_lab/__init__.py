@@ -0,0 +1 @@
+"""Shared helpers for the ai-lab experiments."""
@@ -0,0 +1,328 @@
+"""
+Repeatable benchmarks of the lab's pipelines from recorded HTTP cassettes.
+
+Each pipeline runs in a fresh child process, in an empty working directory,
+under its cassette (see ai_lab.cassette). With latency replay turned off,
+what is left is the cost of our own orchestration: wall time, CPU time, peak
+RSS and Python allocations. Results are saved as JSON and can be compared with
+an earlier run to catch regressions.
+
+The crews run in their own uv environments, so their children are started
+with `uv run --project <crew>`, with the repo root on PYTHONPATH.
+"""
+
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import runpy
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+BENCH_QUERY = "Latest AI Agent frameworks in 2025"
+
+# Placeholder credentials so clients can be constructed during replay
+REPLAY_ENV = {
+    "OPENAI_API_KEY": "sk-replay",
+    "SERPER_API_KEY": "replay",
+    "SENDGRID_API_KEY": "SG.replay",
+    "POLYGON_DATA_TOKEN": "replay",
+    "PUSHOVER_USER": "replay",
+    "PUSHOVER_TOKEN": "replay",
+}
+BENCH_ENV = {
+    # Keep local spans, skip the OpenAI trace upload and crewAI telemetry
+    "AI_LAB_TRACE_EXPORT": "local",
+    "CREWAI_DISABLE_TELEMETRY": "true",
+    "OTEL_SDK_DISABLED": "true",
+    # Persistent caches would turn later runs into cache hits
+    "SERPER_CACHE_DISABLED": "true",
+}
+
+
+@dataclass
+class BenchConfig:
+    """Cassette and result locations and the regression threshold"""
+    cassette_dir: str = "cassettes"
+    results_dir: str = "bench_results"
+    regression_threshold: float = 0.15
+
+    @classmethod
+    def from_env(cls) -> 'BenchConfig':
+        """Create config from environment variables"""
+        return cls(
+            cassette_dir=os.getenv("AI_LAB_CASSETTE_DIR", "cassettes"),
+            results_dir=os.getenv("AI_LAB_BENCH_DIR", "bench_results"),
+            regression_threshold=float(os.getenv("AI_LAB_BENCH_THRESHOLD", "0.15")),
+        )
+
+
+@dataclass
+class Pipeline:
+    """A benchmarkable entry point"""
+    name: str
+    run: Callable[[], Any]
+    path: str
+    project: Optional[str] = None
+
+
+def _deep_research():
+    from research_manager import ResearchManager
+
+    async def consume():
+        async for _ in ResearchManager().run(BENCH_QUERY):
+            pass
+    asyncio.run(consume())
+
+
+def _sales_agent():
+    script = runpy.run_path(str(REPO_ROOT / "src/salesAgent/openai-agents.py"), run_name="bench")
+    asyncio.run(script["main"]())
+
+
+def _simple_research():
+    runpy.run_path(str(REPO_ROOT / "src/simpleResearch/simple-research.py"), run_name="__main__")
+
+
+def _stock_picker():
+    from stock_picker.main import run
+    run()
+
+
+def _financial_researcher():
+    from financial_researcher.main import run
+    run()
+
+
+PIPELINES: Dict[str, Pipeline] = {p.name: p for p in [
+    Pipeline("deep_research", _deep_research, "src/deep_research"),
+    Pipeline("sales_agent", _sales_agent, "src/salesAgent"),
+    Pipeline("simple_research", _simple_research, "src/simpleResearch"),
+    Pipeline("stock_picker", _stock_picker, "src/crewExp/stock_picker/src",
+             project="src/crewExp/stock_picker"),
+    Pipeline("financial_researcher", _financial_researcher, "src/crewExp/financial_researcher/src",
+             project="src/crewExp/financial_researcher"),
+]}
+
+
+@dataclass
+class BenchResult:
+    """Measurements from one pipeline run"""
+    pipeline: str
+    status: str = "ok"
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    peak_rss_mb: float = 0.0
+    alloc_peak_mb: Optional[float] = None
+    alloc_blocks: Optional[int] = None
+    requests: Dict[str, int] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_child(name: str, cassette_path: str, result_path: str, allocs: bool = True):
+    """Run one pipeline in this process and write its BenchResult as JSON"""
+    from ai_lab.cassette import CassetteConfig, use_cassette
+
+    pipeline = PIPELINES[name]
+    sys.path.insert(0, str(REPO_ROOT / pipeline.path))
+    result = BenchResult(pipeline=name)
+    if allocs:
+        tracemalloc.start()
+    blocks = sys.getallocatedblocks()
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        with use_cassette(cassette_path, CassetteConfig.from_env()) as cassette:
+            try:
+                pipeline.run()
+            finally:
+                result.requests = dict(cassette.stats)
+    except BaseException as e:
+        result.status = "error"
+        result.error = f"{type(e).__name__}: {str(e)}"
+    result.wall_s = round(time.perf_counter() - wall, 3)
+    result.cpu_s = round(time.process_time() - cpu, 3)
+    result.alloc_blocks = sys.getallocatedblocks() - blocks
+    if allocs:
+        result.alloc_peak_mb = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1)
+        tracemalloc.stop()
+    result.peak_rss_mb = _peak_rss_mb()
+    Path(result_path).write_text(json.dumps(asdict(result)))
+    # Skip interpreter teardown of whatever the pipeline left running
+    sys.stdout.flush()
+    os._exit(0)
+
+
+def _child_command(pipeline: Pipeline) -> List[str]:
+    if pipeline.project:
+        return ["uv", "run", "--project", str(REPO_ROOT / pipeline.project), "python"]
+    return [sys.executable]
+
+
+def child_env(record: bool, timing: str = "none") -> Dict[str, str]:
+    """Environment for a pipeline child; replay fills in placeholder credentials"""
+    env = {**os.environ, **BENCH_ENV}
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(REPO_ROOT), env.get("PYTHONPATH")]))
+    env["AI_LAB_CASSETTE_MODE"] = "record" if record else "replay"
+    env["AI_LAB_REPLAY_TIMING"] = timing
+    if not record:
+        for key, value in REPLAY_ENV.items():
+            env.setdefault(key, value)
+    return env
+
+
+def measure(name: str, config: BenchConfig, record: bool = False, timing: str = "none",
+            allocs: bool = True) -> BenchResult:
+    """Run a pipeline once in a fresh child process"""
+    pipeline = PIPELINES[name]
+    cassette = (Path(config.cassette_dir) / f"{name}.json").resolve()
+    if not record and not cassette.exists():
+        return BenchResult(pipeline=name, status="skipped", error=f"no cassette at {cassette}")
+    env = child_env(record, timing)
+
+    with tempfile.TemporaryDirectory(prefix=f"bench-{name}-") as workdir:
+        result_path = Path(workdir) / "result.json"
+        command = _child_command(pipeline) + [
+            "-m", "ai_lab.bench", "child", name, str(cassette), str(result_path),
+        ] + ([] if allocs else ["--no-allocs"])
+        completed = subprocess.run(command, cwd=workdir, env=env, capture_output=True, text=True)
+        if not result_path.exists():
+            error = (completed.stderr or completed.stdout).strip().splitlines()[-1:] or ["no output"]
+            return BenchResult(pipeline=name, status="error", error=f"exit {completed.returncode}: {error[0]}")
+        return BenchResult(**json.loads(result_path.read_text()))
+
+
+def summarize(runs: List[BenchResult]) -> Dict[str, Any]:
+    """Median times and worst-case memory over repeated runs"""
+    ok = [r for r in runs if r.status == "ok"]
+    if not ok:
+        return {"status": runs[-1].status, "error": runs[-1].error, "runs": len(runs)}
+    allocs = [r.alloc_peak_mb for r in ok if r.alloc_peak_mb is not None]
+    return {
+        "status": "ok" if len(ok) == len(runs) else "partial",
+        "runs": len(runs),
+        "wall_s": round(statistics.median(r.wall_s for r in ok), 3),
+        "cpu_s": round(statistics.median(r.cpu_s for r in ok), 3),
+        "peak_rss_mb": max(r.peak_rss_mb for r in ok),
+        "alloc_peak_mb": max(allocs) if allocs else None,
+        "alloc_blocks": int(statistics.median(r.alloc_blocks or 0 for r in ok)),
+        "requests": ok[-1].requests,
+        "error": next((r.error for r in runs if r.error), None),
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Metrics that got worse than the baseline by more than the threshold"""
+    regressions = []
+    for name, stats in current["pipelines"].items():
+        before = baseline.get("pipelines", {}).get(name)
+        if not before or stats.get("status") != "ok" or before.get("status") != "ok":
+            continue
+        for metric in ("wall_s", "cpu_s", "peak_rss_mb", "alloc_peak_mb"):
+            old, new = before.get(metric), stats.get(metric)
+            if old and new and new > old * (1 + threshold):
+                regressions.append(f"{name}.{metric}: {old} -> {new} (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def run_bench(names: List[str], config: Optional[BenchConfig] = None, record: bool = False,
+              timing: str = "none", repeat: int = 3, allocs: bool = True,
+              baseline: Optional[str] = None) -> int:
+    """Benchmark pipelines, print a table, save results; returns an exit code"""
+    config = config or BenchConfig.from_env()
+    unknown = [n for n in names if n not in PIPELINES]
+    if unknown:
+        print(f"Unknown pipelines: {', '.join(unknown)}. Available: {', '.join(PIPELINES)}")
+        return 2
+    names = names or list(PIPELINES)
+    report: Dict[str, Any] = {
+        "created_at": datetime.now().isoformat(),
+        "timing": timing,
+        "python": sys.version.split()[0],
+        "pipelines": {},
+    }
+    for name in names:
+        runs = [measure(name, config, record=record, timing=timing, allocs=allocs)
+                for _ in range(1 if record else repeat)]
+        report["pipelines"][name] = summarize(runs)
+
+    print(f"{'pipeline':<22} {'status':<8} {'wall':>8} {'cpu':>8} {'rss MB':>8} {'alloc MB':>9} {'requests':>9}")
+    for name, stats in report["pipelines"].items():
+        if "wall_s" not in stats:
+            print(f"{name:<22} {stats['status']:<8} {stats.get('error') or ''}")
+            continue
+        requests = sum(stats["requests"].values())
+        alloc = "-" if stats["alloc_peak_mb"] is None else f"{stats['alloc_peak_mb']:.1f}"
+        print(f"{name:<22} {stats['status']:<8} {stats['wall_s']:>7.2f}s {stats['cpu_s']:>7.2f}s "
+              f"{stats['peak_rss_mb']:>8.1f} {alloc:>9} {requests:>9}")
+        if stats.get("error"):
+            print(f"{'':<22} {stats['error']}")
+    if record:
+        recorded = [n for n, s in report["pipelines"].items() if s["status"] == "ok"]
+        print(f"\nCassettes written to {config.cassette_dir}: {', '.join(recorded) or 'none'}")
+        return 0 if len(recorded) == len(names) else 1
+
+    results_dir = Path(config.results_dir)
+    results_dir.mkdir(parents=True, exist_ok=True)
+    out = results_dir / f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    out.write_text(json.dumps(report, indent=2))
+    print(f"\nResults saved to {out}")
+
+    if baseline:
+        regressions = compare(report, json.loads(Path(baseline).read_text()), config.regression_threshold)
+        if regressions:
+            print(f"\nRegressions against {baseline}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\nNo regressions against {baseline}")
+    return 0
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("pipelines", nargs="*", help=f"any of: {', '.join(PIPELINES)} (default: all)")
+    parser.add_argument("--record", action="store_true", help="run live and (re)write the cassettes")
+    parser.add_argument("--timing", default="none",
+                        help="replayed latency: none, recorded, or a scale factor (default: none)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per pipeline; medians are reported")
+    parser.add_argument("--no-allocs", action="store_true", help="skip tracemalloc (it slows runs down)")
+    parser.add_argument("--baseline", help="earlier results file to check for regressions")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "child":
+        parser = argparse.ArgumentParser(prog="ai_lab.bench child")
+        parser.add_argument("name")
+        parser.add_argument("cassette")
+        parser.add_argument("result")
+        parser.add_argument("--no-allocs", action="store_true")
+        args = parser.parse_args(sys.argv[2:])
+        run_child(args.name, args.cassette, args.result, allocs=not args.no_allocs)
+        return
+    parser = argparse.ArgumentParser(prog="ai_lab.bench", description="Benchmark pipelines from cassettes")
+    add_arguments(parser)
+    args = parser.parse_args()
+    sys.exit(run_bench(args.pipelines, record=args.record, timing=args.timing, repeat=args.repeat,
+                       allocs=not args.no_allocs, baseline=args.baseline))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+Model cascade for Agents SDK agents with cheap, checkable outputs.
+
+A `CascadeModel` answers with a small model first and checks the result: the
+agent's `output_type` schema for structured agents, plus any checks passed in.
+Only a response that fails is retried on the large model. Turns that call
+tools or hand off are passed through unchecked, since there is no final output
+to judge yet.
+
+Escalations are counted per agent in `cascade_metrics`; the summary is logged
+at exit and available from `cascade_metrics.summary()`.
+"""
+
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Union
+import atexit
+import logging
+import os
+import threading
+import time
+
+from agents.models.interface import Model
+from agents.models.openai_provider import OpenAIProvider
+
+logger = logging.getLogger(__name__)
+
+# A check gets the parsed output (or the text for plain-text agents) and
+# returns a reason to escalate, or None when the output is acceptable.
+Check = Callable[[Any], Optional[str]]
+
+PASSTHROUGH_ITEMS = ("function_call", "file_search_call", "web_search_call", "computer_call")
+
+
+@dataclass
+class CascadeConfig:
+    """Model cascade configuration"""
+    enabled: bool = True
+    small_model: str = "gpt-4.1-nano"
+    large_model: str = "gpt-4o-mini"
+
+    @classmethod
+    def from_env(cls) -> 'CascadeConfig':
+        """Create config from environment variables"""
+        return cls(
+            enabled=os.getenv('AI_LAB_CASCADE', '1') != '0',
+            small_model=os.getenv('AI_LAB_CASCADE_SMALL_MODEL', 'gpt-4.1-nano'),
+            large_model=os.getenv('AI_LAB_CASCADE_LARGE_MODEL', 'gpt-4o-mini'),
+        )
+
+
+class CascadeMetrics:
+    """Per-agent call and escalation counts"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._agents: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, agent: str, small_ms: float, escalated: bool = False,
+               reason: Optional[str] = None, large_ms: float = 0.0):
+        with self._lock:
+            stats = self._agents.setdefault(agent, {
+                "calls": 0, "escalations": 0, "small_ms": 0.0, "large_ms": 0.0, "reasons": {},
+            })
+            stats["calls"] += 1
+            stats["small_ms"] += small_ms
+            if escalated:
+                stats["escalations"] += 1
+                stats["large_ms"] += large_ms
+                stats["reasons"][reason] = stats["reasons"].get(reason, 0) + 1
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            result = {}
+            for agent, stats in self._agents.items():
+                calls, escalations = stats["calls"], stats["escalations"]
+                result[agent] = {
+                    "calls": calls,
+                    "escalations": escalations,
+                    "escalation_rate": round(escalations / calls, 3) if calls else 0.0,
+                    "avg_small_ms": round(stats["small_ms"] / calls, 1) if calls else 0.0,
+                    "avg_large_ms": round(stats["large_ms"] / escalations, 1) if escalations else 0.0,
+                    "reasons": dict(stats["reasons"]),
+                }
+            return result
+
+    def reset(self):
+        with self._lock:
+            self._agents.clear()
+
+
+cascade_metrics = CascadeMetrics()
+
+
+@atexit.register
+def _log_summary():
+    for agent, stats in cascade_metrics.summary().items():
+        logger.info(
+            f"Cascade {agent}: {stats['escalations']}/{stats['calls']} escalated "
+            f"({stats['escalation_rate']:.0%})"
+        )
+
+
+def output_text(items: Sequence[Any]) -> Optional[str]:
+    """Final text of a model response, or None if the turn calls a tool or hands off"""
+    text = None
+    for item in items:
+        kind = getattr(item, "type", None)
+        if kind in PASSTHROUGH_ITEMS:
+            return None
+        if kind == "message":
+            parts = [getattr(part, "text", "") for part in item.content if getattr(part, "type", "") == "output_text"]
+            text = "".join(parts)
+    return text
+
+
+class CascadeModel(Model):
+    """Try the small model, validate, and escalate to the large model on failure"""
+
+    def __init__(self, agent_name: str, small: Union[str, Model], large: Union[str, Model],
+                 checks: Sequence[Check] = (), metrics: CascadeMetrics = cascade_metrics):
+        self.agent_name = agent_name
+        self.checks = list(checks)
+        self.metrics = metrics
+        self._small = small
+        self._large = large
+        self._provider: Optional[OpenAIProvider] = None
+
+    def _resolve(self, model: Union[str, Model]) -> Model:
+        if isinstance(model, Model):
+            return model
+        # Resolved on first use so the client picks up keys loaded by load_dotenv
+        if self._provider is None:
+            self._provider = OpenAIProvider()
+        return self._provider.get_model(model)
+
+    def validate(self, items: Sequence[Any], output_schema: Any) -> Optional[str]:
+        """Reason to escalate, or None if the small model's output is acceptable"""
+        text = output_text(items)
+        if text is None:
+            if any(getattr(item, "type", None) in PASSTHROUGH_ITEMS for item in items):
+                return None
+            return "no output"
+        if not text.strip():
+            return "empty output"
+        output: Any = text
+        if output_schema is not None and not output_schema.is_plain_text():
+            try:
+                output = output_schema.validate_json(text)
+            except Exception as e:
+                logger.debug(f"Cascade {self.agent_name} schema failure: {str(e)}")
+                return "schema"
+        for check in self.checks:
+            try:
+                reason = check(output)
+            except Exception as e:
+                reason = f"check error: {str(e)}"
+            if reason:
+                return reason
+        return None
+
+    async def get_response(self, system_instructions, input, model_settings, tools, output_schema,
+                           handoffs, tracing, **kwargs):
+        args = (system_instructions, input, model_settings, tools, output_schema, handoffs, tracing)
+        start = time.perf_counter()
+        try:
+            response = await self._resolve(self._small).get_response(*args, **kwargs)
+            reason = self.validate(response.output, output_schema)
+        except Exception as e:
+            logger.warning(f"Cascade {self.agent_name} small model failed: {str(e)}")
+            response, reason = None, "error"
+        small_ms = (time.perf_counter() - start) * 1000
+        if reason is None:
+            self.metrics.record(self.agent_name, small_ms)
+            return response
+
+        logger.info(f"Cascade {self.agent_name}: escalating ({reason})")
+        start = time.perf_counter()
+        response = await self._resolve(self._large).get_response(*args, **kwargs)
+        self.metrics.record(self.agent_name, small_ms, True, reason, (time.perf_counter() - start) * 1000)
+        return response
+
+    async def stream_response(self, system_instructions, input, model_settings, tools, output_schema,
+                              handoffs, tracing, **kwargs) -> AsyncIterator[Any]:
+        """Stream the small model's response once it is known to pass, else the large model's.
+
+        A final answer can only be validated once it is complete, so its events
+        are buffered and replayed afterwards: the caller sees no tokens until
+        the small model has finished. That is cheap for the short, structured
+        outputs the cascade is used for. A tool call or handoff is never
+        checked, so as soon as one starts the buffer is flushed and the rest of
+        the stream passes straight through.
+        """
+        args = (system_instructions, input, model_settings, tools, output_schema, handoffs, tracing)
+        start = time.perf_counter()
+        events: List[Any] = []
+        reason: Optional[str] = "no output"
+        passthrough = False
+        try:
+            async for event in self._resolve(self._small).stream_response(*args, **kwargs):
+                if passthrough:
+                    yield event
+                    continue
+                events.append(event)
+                kind = getattr(event, "type", None)
+                if kind == "response.output_item.added" and getattr(event.item, "type", None) in PASSTHROUGH_ITEMS:
+                    passthrough = True
+                    for buffered in events:
+                        yield buffered
+                    events.clear()
+                elif kind == "response.completed":
+                    reason = self.validate(event.response.output, output_schema)
+        except Exception as e:
+            if passthrough:
+                # Part of the response has been sent; it can no longer be replaced
+                raise
+            logger.warning(f"Cascade {self.agent_name} small model failed: {str(e)}")
+            reason = "error"
+        small_ms = (time.perf_counter() - start) * 1000
+        if passthrough or reason is None:
+            self.metrics.record(self.agent_name, small_ms)
+            for event in events:
+                yield event
+            return
+
+        logger.info(f"Cascade {self.agent_name}: escalating ({reason})")
+        start = time.perf_counter()
+        async for event in self._resolve(self._large).stream_response(*args, **kwargs):
+            yield event
+        self.metrics.record(self.agent_name, small_ms, True, reason, (time.perf_counter() - start) * 1000)
+
+
+def cascade_model(agent_name: str, large: Optional[str] = None, checks: Sequence[Check] = (),
+                  config: Optional[CascadeConfig] = None) -> Union[str, Model]:
+    """Model for an agent: a cascade when enabled, otherwise just the large model name"""
+    config = config or CascadeConfig.from_env()
+    large = large or config.large_model
+    if not config.enabled or config.small_model == large:
+        return large
+    return CascadeModel(agent_name, config.small_model, large, checks)
@@ -0,0 +1,338 @@
+"""
+Record/replay of HTTP traffic at the client level.
+
+While a cassette is active, every request made through httpx (OpenAI,
+Agents SDK, litellm, crew_common), requests (Serper) or urllib (SendGrid) is
+intercepted. In record mode it goes out live, and the response and its
+latency are saved. In replay mode it is answered from the cassette without
+touching the network, optionally after sleeping for the recorded (or scaled)
+latency.
+
+Requests are matched on method, URL and a hash of the body. If nothing
+matches exactly, the next unused response for the same method and URL is
+used, so prompts that embed timestamps still replay.
+"""
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import asyncio
+import base64
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+RECORD = "record"
+REPLAY = "replay"
+AUTO = "auto"
+
+# Headers that no longer describe the stored body (it is kept decoded)
+DROP_RESPONSE_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "set-cookie"}
+SECRET_PARAMS = {"api_key", "apikey", "key", "token", "access_token"}
+
+
+@dataclass
+class CassetteConfig:
+    """Record/replay mode and how replayed latency is reproduced"""
+    mode: str = AUTO
+    timing: str = "none"
+
+    @classmethod
+    def from_env(cls) -> 'CassetteConfig':
+        """Create config from environment variables"""
+        return cls(
+            mode=os.getenv("AI_LAB_CASSETTE_MODE", AUTO).lower(),
+            # "none", "recorded", or a scale factor such as "0.5"
+            timing=os.getenv("AI_LAB_REPLAY_TIMING", "none").lower(),
+        )
+
+    def latency_scale(self) -> float:
+        if self.timing == "none":
+            return 0.0
+        if self.timing == "recorded":
+            return 1.0
+        return float(self.timing)
+
+
+class CassetteMiss(Exception):
+    """A request in replay mode that the cassette has no response for"""
+
+
+def _clean_url(url: str) -> str:
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k.lower() not in SECRET_PARAMS]
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(sorted(query)), ""))
+
+
+def _body_hash(body: Any) -> str:
+    if body is None:
+        body = b""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    if not isinstance(body, (bytes, bytearray)):
+        # Streamed request bodies can't be hashed without consuming them
+        return "stream"
+    try:
+        body = json.dumps(json.loads(body), sort_keys=True).encode("utf-8")
+    except (ValueError, UnicodeDecodeError):
+        pass
+    return hashlib.sha256(body).hexdigest()
+
+
+def _encode_body(content: bytes) -> Dict[str, str]:
+    try:
+        return {"body": content.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"body_b64": base64.b64encode(content).decode("ascii")}
+
+
+def _decode_body(interaction: Dict[str, Any]) -> bytes:
+    if "body_b64" in interaction:
+        return base64.b64decode(interaction["body_b64"])
+    return interaction.get("body", "").encode("utf-8")
+
+
+def _headers(items: Any, drop: bool = True) -> List[Tuple[str, str]]:
+    return [(k, v) for k, v in items if not (drop and k.lower() in DROP_RESPONSE_HEADERS)]
+
+
+class Cassette:
+    """Recorded interactions for one pipeline run"""
+
+    def __init__(self, path: str, config: Optional[CassetteConfig] = None):
+        self.path = Path(path)
+        self.config = config or CassetteConfig.from_env()
+        if self.config.mode == AUTO:
+            self.mode = REPLAY if self.path.exists() else RECORD
+        else:
+            self.mode = self.config.mode
+        self.scale = self.config.latency_scale()
+        self._lock = threading.Lock()
+        self.interactions: List[Dict[str, Any]] = []
+        if self.mode == REPLAY:
+            self.interactions = json.loads(self.path.read_text())["interactions"]
+        self._used: set = set()
+        self.stats = {"replayed": 0, "recorded": 0, "missed": 0}
+
+    def _match(self, method: str, url: str, body_hash: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            fallback = None
+            for index, interaction in enumerate(self.interactions):
+                if index in self._used or interaction["method"] != method or interaction["url"] != url:
+                    continue
+                if interaction["body_hash"] == body_hash:
+                    self._used.add(index)
+                    return interaction
+                if fallback is None:
+                    fallback = index
+            if fallback is not None:
+                self._used.add(fallback)
+                return self.interactions[fallback]
+            return None
+
+    def lookup(self, method: str, url: str, body: Any) -> Optional[Dict[str, Any]]:
+        """Response to replay for a request, None to send it live"""
+        if self.mode != REPLAY:
+            return None
+        interaction = self._match(method.upper(), _clean_url(url), _body_hash(body))
+        if interaction is None:
+            with self._lock:
+                self.stats["missed"] += 1
+            raise CassetteMiss(f"No recorded response for {method.upper()} {_clean_url(url)} in {self.path}")
+        with self._lock:
+            self.stats["replayed"] += 1
+        return interaction
+
+    def delay(self, interaction: Dict[str, Any]) -> float:
+        return interaction.get("elapsed", 0.0) * self.scale
+
+    def record(self, method: str, url: str, body: Any, status: int, headers: List[Tuple[str, str]],
+               content: bytes, elapsed: float):
+        interaction = {
+            "method": method.upper(),
+            "url": _clean_url(url),
+            "body_hash": _body_hash(body),
+            "status": status,
+            "headers": _headers(headers),
+            "elapsed": round(elapsed, 4),
+            **_encode_body(content),
+        }
+        with self._lock:
+            self.interactions.append(interaction)
+            self.stats["recorded"] += 1
+
+    def save(self):
+        if self.mode != RECORD:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with self._lock:
+            tmp.write_text(json.dumps({"version": 1, "interactions": self.interactions}, indent=1))
+        os.replace(tmp, self.path)
+
+
+_active: Optional[Cassette] = None
+
+
+def _patch_httpx(cassette: Cassette) -> Optional[Callable[[], None]]:
+    try:
+        import httpx
+    except ImportError:
+        return None
+    sync_send = httpx.HTTPTransport.handle_request
+    async_send = httpx.AsyncHTTPTransport.handle_async_request
+
+    def build(request, status, headers, content):
+        return httpx.Response(status, headers=headers, content=content, request=request)
+
+    def handle_request(transport, request):
+        body = request.read()
+        interaction = cassette.lookup(request.method, str(request.url), body)
+        if interaction is not None:
+            time.sleep(cassette.delay(interaction))
+            return build(request, interaction["status"], interaction["headers"], _decode_body(interaction))
+        started = time.perf_counter()
+        response = sync_send(transport, request)
+        content = response.read()
+        headers = _headers(response.headers.multi_items())
+        cassette.record(request.method, str(request.url), body, response.status_code, headers,
+                        content, time.perf_counter() - started)
+        return build(request, response.status_code, headers, content)
+
+    async def handle_async_request(transport, request):
+        body = await request.aread()
+        interaction = cassette.lookup(request.method, str(request.url), body)
+        if interaction is not None:
+            await asyncio.sleep(cassette.delay(interaction))
+            return build(request, interaction["status"], interaction["headers"], _decode_body(interaction))
+        started = time.perf_counter()
+        response = await async_send(transport, request)
+        content = await response.aread()
+        headers = _headers(response.headers.multi_items())
+        cassette.record(request.method, str(request.url), body, response.status_code, headers,
+                        content, time.perf_counter() - started)
+        return build(request, response.status_code, headers, content)
+
+    httpx.HTTPTransport.handle_request = handle_request
+    httpx.AsyncHTTPTransport.handle_async_request = handle_async_request
+
+    def restore():
+        httpx.HTTPTransport.handle_request = sync_send
+        httpx.AsyncHTTPTransport.handle_async_request = async_send
+    return restore
+
+
+def _patch_requests(cassette: Cassette) -> Optional[Callable[[], None]]:
+    try:
+        from requests.adapters import HTTPAdapter
+        from requests.models import Response
+        from requests.structures import CaseInsensitiveDict
+        from requests.utils import get_encoding_from_headers
+    except ImportError:
+        return None
+    original = HTTPAdapter.send
+
+    def build(request, status, headers, content):
+        response = Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers)
+        response._content = content
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        return response
+
+    def send(adapter, request, **kwargs):
+        interaction = cassette.lookup(request.method, request.url, request.body)
+        if interaction is not None:
+            time.sleep(cassette.delay(interaction))
+            return build(request, interaction["status"], interaction["headers"], _decode_body(interaction))
+        started = time.perf_counter()
+        response = original(adapter, request, **kwargs)
+        content = response.content
+        headers = _headers(response.headers.items())
+        cassette.record(request.method, request.url, request.body, response.status_code, headers,
+                        content, time.perf_counter() - started)
+        return build(request, response.status_code, headers, content)
+
+    HTTPAdapter.send = send
+
+    def restore():
+        HTTPAdapter.send = original
+    return restore
+
+
+def _patch_urllib(cassette: Cassette) -> Callable[[], None]:
+    import http.client
+    import urllib.error
+    import urllib.request
+    import urllib.response
+    original = urllib.request.OpenerDirector.open
+
+    def build(url, status, headers, content):
+        message = http.client.HTTPMessage()
+        for name, value in headers:
+            message.add_header(name, value)
+        if status >= 400:
+            raise urllib.error.HTTPError(url, status, http.client.responses.get(status, ""),
+                                         message, io.BytesIO(content))
+        return urllib.response.addinfourl(io.BytesIO(content), message, url, status)
+
+    def open_url(opener, fullurl, data=None, *args, **kwargs):
+        request = fullurl if isinstance(fullurl, urllib.request.Request) else urllib.request.Request(fullurl, data)
+        if data is not None:
+            request.data = data
+        url, method = request.full_url, request.get_method()
+        interaction = cassette.lookup(method, url, request.data)
+        if interaction is not None:
+            time.sleep(cassette.delay(interaction))
+            return build(url, interaction["status"], interaction["headers"], _decode_body(interaction))
+        started = time.perf_counter()
+        try:
+            response = original(opener, request, None, *args, **kwargs)
+            status, raw_headers, content = response.status, response.headers.items(), response.read()
+        except urllib.error.HTTPError as e:
+            status, raw_headers, content = e.code, e.headers.items(), e.read()
+        # urllib doesn't decode bodies, so its headers are kept as sent
+        headers = _headers(raw_headers, drop=False)
+        cassette.record(method, url, request.data, status, headers, content, time.perf_counter() - started)
+        return build(url, status, headers, content)
+
+    urllib.request.OpenerDirector.open = open_url
+
+    def restore():
+        urllib.request.OpenerDirector.open = original
+    return restore
+
+
+@contextmanager
+def use_cassette(path: str, config: Optional[CassetteConfig] = None) -> Iterator[Cassette]:
+    """Intercept HTTP traffic in every thread for the duration of the block"""
+    global _active
+    if _active is not None:
+        raise RuntimeError(f"A cassette is already active: {_active.path}")
+    cassette = Cassette(path, config)
+    restores = [r for r in (_patch_httpx(cassette), _patch_requests(cassette), _patch_urllib(cassette)) if r]
+    _active = cassette
+    logger.info(f"{cassette.mode.capitalize()}ing HTTP traffic with {cassette.path}")
+    completed = False
+    try:
+        yield cassette
+        completed = True
+    finally:
+        for restore in restores:
+            restore()
+        _active = None
+        # A partial recording would replay as a different run
+        if completed:
+            cassette.save()
+        elif cassette.mode == RECORD:
+            logger.error(f"Run failed; not saving {cassette.path}")
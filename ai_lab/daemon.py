@@ -0,0 +1,453 @@
+"""
+Long-lived worker daemon for the lab's pipelines.
+
+The daemon keeps pipelines constructed (see ai_lab.warm) and serves jobs over
+a small local HTTP API, so a job pays only for its own work and skips the
+interpreter start, imports, agent setup and connection handshakes:
+
+    POST /jobs          {"pipeline": "...", "input": {...}, "wait": true}
+    GET  /jobs/<id>     status, result and timings of a job
+    GET  /jobs          recent jobs
+    GET  /health        uptime and which pipelines are warm
+    POST /shutdown
+
+Pipelines from the root environment run on the daemon's own event loop.
+Crews run in one warm worker process per crew, started in the crew's uv
+environment, and exchange JSON lines with the daemon over stdin/stdout.
+`DaemonClient` is the thin client behind `python main.py submit`.
+"""
+
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+import asyncio
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+from ai_lab.bench import REPO_ROOT
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+READY = "ready"
+
+
+@dataclass
+class DaemonConfig:
+    """Address, warm-up and job limits for the daemon"""
+    host: str = "127.0.0.1"
+    port: int = 8777
+    preload: List[str] = field(default_factory=list)
+    max_concurrent_jobs: int = 4
+    job_history: int = 500
+    worker_start_timeout: float = 300.0
+
+    @classmethod
+    def from_env(cls) -> 'DaemonConfig':
+        """Create config from environment variables"""
+        preload = os.getenv("AI_LAB_DAEMON_PRELOAD", "")
+        return cls(
+            host=os.getenv("AI_LAB_DAEMON_HOST", "127.0.0.1"),
+            port=int(os.getenv("AI_LAB_DAEMON_PORT", "8777")),
+            preload=[name.strip() for name in preload.split(",") if name.strip()],
+            max_concurrent_jobs=int(os.getenv("AI_LAB_DAEMON_MAX_JOBS", "4")),
+            job_history=int(os.getenv("AI_LAB_DAEMON_JOB_HISTORY", "500")),
+            worker_start_timeout=float(os.getenv("AI_LAB_DAEMON_WORKER_TIMEOUT", "300")),
+        )
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+
+@dataclass
+class Job:
+    """One submitted pipeline run"""
+    id: str
+    pipeline: str
+    inputs: Dict[str, Any]
+    status: str = QUEUED
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Any = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        if self.started_at:
+            data["queue_ms"] = round((self.started_at - self.submitted_at) * 1000, 1)
+        if self.started_at and self.finished_at:
+            data["run_ms"] = round((self.finished_at - self.started_at) * 1000, 1)
+        return data
+
+
+class InProcessWorker:
+    """Runs a root-environment pipeline on the daemon's event loop"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pipeline = None
+        self._lock = asyncio.Lock()
+
+    async def start(self):
+        async with self._lock:
+            if self.pipeline is None:
+                from ai_lab.warm import load_pipeline
+                started = time.perf_counter()
+                self.pipeline = await asyncio.to_thread(load_pipeline, self.name)
+                logger.info(f"Loaded {self.name} in {time.perf_counter() - started:.2f}s")
+
+    @property
+    def warm(self) -> bool:
+        return self.pipeline is not None
+
+    async def run(self, inputs: Dict[str, Any]) -> Any:
+        await self.start()
+        return await self.pipeline.run(inputs)
+
+    async def stop(self):
+        pass
+
+
+class ProcessWorker:
+    """A warm worker process in a crew's uv environment; one job at a time"""
+
+    def __init__(self, name: str, project: str, start_timeout: float):
+        self.name = name
+        self.project = project
+        self.start_timeout = start_timeout
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def warm(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+    async def start(self):
+        if self.warm:
+            return
+        env = {**os.environ}
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(REPO_ROOT), env.get("PYTHONPATH")]))
+        started = time.perf_counter()
+        # Crews resolve ./memory, knowledge/ and output/ against their project
+        # directory, as they do under `crewai run`
+        project = str(REPO_ROOT / self.project)
+        self.process = await asyncio.create_subprocess_exec(
+            "uv", "run", "--project", project,
+            "python", "-m", "ai_lab.daemon", "worker", self.name,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            cwd=project,
+            env=env,
+            limit=64 * 1024 * 1024,
+        )
+        try:
+            reply = await asyncio.wait_for(self._read(), self.start_timeout)
+            if reply.get("status") != READY:
+                raise RuntimeError(f"{self.name} worker failed to start: {reply.get('error')}")
+        except BaseException:
+            # A late "ready" line would otherwise be read as the next job's reply
+            await self._discard()
+            raise
+        logger.info(f"Started {self.name} worker in {time.perf_counter() - started:.2f}s")
+
+    async def _discard(self):
+        """Kill the process and forget it, so the next run starts a fresh one"""
+        process, self.process = self.process, None
+        if process is not None and process.returncode is None:
+            process.kill()
+            await process.wait()
+
+    async def _read(self) -> Dict[str, Any]:
+        line = await self.process.stdout.readline()
+        if not line:
+            raise RuntimeError(f"{self.name} worker exited with code {await self.process.wait()}")
+        return json.loads(line)
+
+    async def run(self, inputs: Dict[str, Any]) -> Any:
+        async with self._lock:
+            await self.start()
+            try:
+                self.process.stdin.write((json.dumps(inputs) + "\n").encode("utf-8"))
+                await self.process.stdin.drain()
+                reply = await self._read()
+            except BaseException:
+                # The process may still answer this job; never let that reply reach the next one
+                await self._discard()
+                raise
+        if reply.get("status") == FAILED:
+            raise RuntimeError(reply.get("error"))
+        return reply.get("result")
+
+    async def stop(self):
+        if self.warm:
+            self.process.stdin.close()
+            try:
+                await asyncio.wait_for(self.process.wait(), 10)
+            except asyncio.TimeoutError:
+                self.process.kill()
+
+
+def create_worker(name: str, config: DaemonConfig):
+    """In-process worker for root-environment pipelines, a worker process for crews"""
+    from ai_lab.warm import WARM_PIPELINES
+    project = WARM_PIPELINES[name].project
+    if project:
+        return ProcessWorker(name, project, config.worker_start_timeout)
+    return InProcessWorker(name)
+
+
+class Daemon:
+    """Owns the event loop, the warm workers and the job table"""
+
+    def __init__(self, config: Optional[DaemonConfig] = None):
+        self.config = config or DaemonConfig.from_env()
+        self.started_at = time.time()
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="daemon-loop", daemon=True)
+        self._lock = threading.Lock()
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._futures: Dict[str, Future] = {}
+        self.workers: Dict[str, Any] = {}
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def start(self):
+        self._thread.start()
+        self._call(self._init()).result()
+        for name in self.config.preload:
+            self._call(self._worker(name).start()).result()
+
+    def _call(self, coro) -> Future:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    async def _init(self):
+        self._slots = asyncio.Semaphore(self.config.max_concurrent_jobs)
+
+    def _worker(self, name: str):
+        if name not in self.workers:
+            self.workers[name] = create_worker(name, self.config)
+        return self.workers[name]
+
+    def pipelines(self) -> Dict[str, bool]:
+        from ai_lab.warm import WARM_PIPELINES
+        return {name: name in self.workers and self.workers[name].warm for name in WARM_PIPELINES}
+
+    def submit(self, pipeline: str, inputs: Dict[str, Any]) -> Job:
+        if pipeline not in self.pipelines():
+            raise KeyError(f"Unknown pipeline '{pipeline}'")
+        job = Job(id=uuid.uuid4().hex[:12], pipeline=pipeline, inputs=inputs)
+        with self._lock:
+            self.jobs[job.id] = job
+            while len(self.jobs) > self.config.job_history:
+                old_id, _ = self.jobs.popitem(last=False)
+                self._futures.pop(old_id, None)
+            self._futures[job.id] = self._call(self._run(job))
+        return job
+
+    async def _run(self, job: Job):
+        async with self._slots:
+            job.status = RUNNING
+            job.started_at = time.time()
+            try:
+                job.result = await self._worker(job.pipeline).run(job.inputs)
+                if isinstance(job.result, dict) and job.result.get("status") == "error":
+                    job.status, job.error = FAILED, job.result.get("message")
+                else:
+                    job.status = SUCCEEDED
+            except Exception as e:
+                logger.error(f"Job {job.id} ({job.pipeline}) failed: {str(e)}")
+                job.status, job.error = FAILED, str(e)
+            job.finished_at = time.time()
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Job]:
+        future = self._futures.get(job_id)
+        if future is not None:
+            try:
+                future.result(timeout)
+            except FutureTimeoutError:
+                pass
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def recent(self, limit: int = 50) -> List[Job]:
+        with self._lock:
+            return list(self.jobs.values())[-limit:]
+
+    def health(self) -> Dict[str, Any]:
+        counts: Dict[str, int] = {}
+        for job in self.recent(self.config.job_history):
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {
+            "status": "ok",
+            "pid": os.getpid(),
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "pipelines": self.pipelines(),
+            "jobs": counts,
+        }
+
+    def stop(self):
+        async def stop_workers():
+            await asyncio.gather(*(w.stop() for w in self.workers.values()), return_exceptions=True)
+        try:
+            self._call(stop_workers()).result(15)
+        finally:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    daemon: Daemon
+    server_version = "ai-lab-daemon"
+
+    def _send(self, status: int, payload: Any):
+        body = json.dumps(payload, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send(200, self.daemon.health())
+        elif self.path == "/jobs":
+            self._send(200, [job.to_dict() for job in self.daemon.recent()])
+        elif self.path.startswith("/jobs/"):
+            job = self.daemon.get(self.path.rsplit("/", 1)[-1])
+            if job:
+                self._send(200, job.to_dict())
+            else:
+                self._send(404, {"status": "error", "message": "no such job"})
+        else:
+            self._send(404, {"status": "error", "message": f"unknown path {self.path}"})
+
+    def do_POST(self):
+        if self.path == "/shutdown":
+            self._send(200, {"status": "ok"})
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+            return
+        if self.path != "/jobs":
+            self._send(404, {"status": "error", "message": f"unknown path {self.path}"})
+            return
+        try:
+            body = self._body()
+            if not body.get("pipeline"):
+                raise ValueError("missing 'pipeline'")
+            job = self.daemon.submit(body["pipeline"], body.get("input") or {})
+        except (KeyError, ValueError) as e:
+            self._send(400, {"status": "error", "message": e.args[0] if e.args else str(e)})
+            return
+        if body.get("wait", True):
+            job = self.daemon.wait(job.id, body.get("timeout"))
+        self._send(200, job.to_dict())
+
+    def log_message(self, format: str, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+
+def serve(config: Optional[DaemonConfig] = None):
+    """Run the daemon until /shutdown or Ctrl-C"""
+    daemon = Daemon(config)
+    daemon.start()
+    handler = type("Handler", (_Handler,), {"daemon": daemon})
+    server = ThreadingHTTPServer((daemon.config.host, daemon.config.port), handler)
+    logger.info(f"ai-lab daemon listening on {daemon.config.url}")
+    print(f"ai-lab daemon listening on {daemon.config.url}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        daemon.stop()
+
+
+class DaemonClient:
+    """Thin stdlib client for the daemon's HTTP API"""
+
+    def __init__(self, url: Optional[str] = None, timeout: Optional[float] = None):
+        self.url = (url or DaemonConfig.from_env().url).rstrip("/")
+        self.timeout = timeout
+
+    def _request(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None) -> Any:
+        data = json.dumps(payload).encode("utf-8") if payload is not None else None
+        request = urllib.request.Request(
+            f"{self.url}{path}", data=data, method=method, headers={"Content-Type": "application/json"},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return json.loads(e.read() or b"{}")
+
+    def submit(self, pipeline: str, inputs: Optional[Dict[str, Any]] = None, wait: bool = True) -> Dict[str, Any]:
+        return self._request("POST", "/jobs", {"pipeline": pipeline, "input": inputs or {}, "wait": wait})
+
+    def job(self, job_id: str) -> Dict[str, Any]:
+        return self._request("GET", f"/jobs/{job_id}")
+
+    def jobs(self) -> List[Dict[str, Any]]:
+        return self._request("GET", "/jobs")
+
+    def health(self) -> Dict[str, Any]:
+        return self._request("GET", "/health")
+
+    def shutdown(self) -> Dict[str, Any]:
+        return self._request("POST", "/shutdown", {})
+
+
+def worker_main(name: str):
+    """Worker process loop: load once, then one JSON job per stdin line"""
+    # Pipelines print freely; keep fd 1 for the protocol and send the rest to stderr
+    protocol = os.fdopen(os.dup(1), "w", buffering=1)
+    os.dup2(2, 1)
+    sys.stdout = sys.stderr
+
+    def reply(payload: Dict[str, Any]):
+        protocol.write(json.dumps(payload, default=str) + "\n")
+
+    from ai_lab.warm import load_pipeline
+    try:
+        pipeline = load_pipeline(name)
+    except Exception as e:
+        reply({"status": FAILED, "error": f"{type(e).__name__}: {str(e)}"})
+        return
+    reply({"status": READY})
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    for line in sys.stdin:
+        try:
+            result = loop.run_until_complete(pipeline.run(json.loads(line)))
+            reply({"status": SUCCEEDED, "result": result})
+        except Exception as e:
+            logger.error(f"{name} job failed: {str(e)}")
+            reply({"status": FAILED, "error": f"{type(e).__name__}: {str(e)}"})
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "worker":
+        worker_main(sys.argv[2])
+    else:
+        logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
+        serve()
@@ -0,0 +1,393 @@
+"""
+Durable, prioritized job queue shared by every pipeline.
+
+Jobs live in SQLite, so any process can enqueue and any number of workers can
+drain the queue. Scheduling works like this:
+
+- The highest priority goes first. Within a priority it is first in, first
+  out.
+- Each pipeline has a concurrency limit, so research, sales and crew jobs
+  share provider rate limits instead of racing for them.
+- Claimed jobs hold a lease that the worker renews while running. A crashed
+  worker's jobs are picked up again once the lease expires.
+- Failures are retried with exponential backoff. Past max_attempts a job is
+  moved to the dead-letter state, where it can be inspected and requeued.
+- Some of a worker's slots are held back for interactive jobs, so a burst
+  of batch work never makes an interactive query wait for a free slot.
+
+Workers run jobs through the same warm pipelines as the daemon (ai_lab.warm).
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import asyncio
+import json
+import logging
+import os
+import random
+import socket
+import sqlite3
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = 100
+NORMAL = 50
+BATCH = 10
+PRIORITIES = {"interactive": INTERACTIVE, "normal": NORMAL, "batch": BATCH}
+
+QUEUED = "queued"
+LEASED = "leased"
+SUCCEEDED = "succeeded"
+DEAD = "dead"
+
+
+def _parse_limits(value: str) -> Dict[str, int]:
+    limits = {}
+    for item in value.split(","):
+        if "=" in item:
+            name, limit = item.split("=", 1)
+            limits[name.strip()] = int(limit)
+    return limits
+
+
+@dataclass
+class QueueConfig:
+    """Queue location, leases, retry policy and concurrency limits"""
+    db_path: str = "~/.cache/ai-lab/jobs.db"
+    lease_seconds: float = 300.0
+    max_attempts: int = 3
+    backoff_base: float = 5.0
+    backoff_max: float = 600.0
+    workers: int = 4
+    interactive_reserve: int = 1
+    interactive_burst: int = 1
+    poll_interval: float = 0.25
+    pipeline_limits: Dict[str, int] = field(default_factory=lambda: {
+        "deep_research": 2, "sales_agent": 1, "stock_picker": 1, "financial_researcher": 2,
+    })
+
+    @classmethod
+    def from_env(cls) -> 'QueueConfig':
+        """Create config from environment variables"""
+        limits = cls().pipeline_limits
+        limits.update(_parse_limits(os.getenv("AI_LAB_QUEUE_LIMITS", "")))
+        return cls(
+            db_path=os.getenv("AI_LAB_QUEUE_DB", "~/.cache/ai-lab/jobs.db"),
+            lease_seconds=float(os.getenv("AI_LAB_QUEUE_LEASE_SECONDS", "300")),
+            max_attempts=int(os.getenv("AI_LAB_QUEUE_MAX_ATTEMPTS", "3")),
+            backoff_base=float(os.getenv("AI_LAB_QUEUE_BACKOFF", "5")),
+            backoff_max=float(os.getenv("AI_LAB_QUEUE_BACKOFF_MAX", "600")),
+            workers=int(os.getenv("AI_LAB_QUEUE_WORKERS", "4")),
+            interactive_reserve=int(os.getenv("AI_LAB_QUEUE_INTERACTIVE_RESERVE", "1")),
+            interactive_burst=int(os.getenv("AI_LAB_QUEUE_INTERACTIVE_BURST", "1")),
+            poll_interval=float(os.getenv("AI_LAB_QUEUE_POLL_INTERVAL", "0.25")),
+            pipeline_limits=limits,
+        )
+
+
+class JobQueue:
+    """SQLite job table with claim/lease/complete/fail transitions"""
+
+    def __init__(self, config: Optional[QueueConfig] = None):
+        self.config = config or QueueConfig.from_env()
+        self.db_path = os.path.expanduser(self.config.db_path)
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    pipeline TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    priority INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    max_attempts INTEGER NOT NULL,
+                    run_after REAL NOT NULL,
+                    lease_owner TEXT,
+                    lease_expires REAL,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    result TEXT,
+                    last_error TEXT
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs (status, priority DESC, created_at)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_lease ON jobs (status, lease_expires)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _row(row: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def enqueue(self, pipeline: str, payload: Optional[Dict[str, Any]] = None, priority: int = NORMAL,
+                max_attempts: Optional[int] = None, delay: float = 0.0) -> str:
+        from ai_lab.warm import WARM_PIPELINES
+        if pipeline not in WARM_PIPELINES:
+            raise ValueError(f"Unknown pipeline '{pipeline}' (expected one of: {', '.join(WARM_PIPELINES)})")
+        job_id = uuid.uuid4().hex[:16]
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, pipeline, payload, priority, status, max_attempts, run_after, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, pipeline, json.dumps(payload or {}), priority, QUEUED,
+                 max_attempts or self.config.max_attempts, now + delay, now),
+            )
+        return job_id
+
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.config.backoff_base * (2 ** max(attempts - 1, 0)), self.config.backoff_max)
+        return delay * (0.5 + random.random() / 2)
+
+    def _expire_leases(self, conn: sqlite3.Connection, now: float):
+        """Return jobs whose worker stopped renewing the lease"""
+        expired = conn.execute(
+            "SELECT id, attempts, max_attempts FROM jobs WHERE status = ? AND lease_expires < ?",
+            (LEASED, now),
+        ).fetchall()
+        for job in expired:
+            if job["attempts"] >= job["max_attempts"]:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, lease_owner = NULL, finished_at = ?, last_error = ? WHERE id = ?",
+                    (DEAD, now, "lease expired", job["id"]),
+                )
+            else:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, lease_owner = NULL, run_after = ?, last_error = ? WHERE id = ?",
+                    (QUEUED, now + self._backoff(job["attempts"]), "lease expired", job["id"]),
+                )
+
+    def claim(self, owner: str, min_priority: int = 0,
+              pipelines: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """Lease the most urgent ready job whose pipeline is under its limit"""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            self._expire_leases(conn, now)
+            running = dict(conn.execute(
+                "SELECT pipeline, COUNT(*) FROM jobs WHERE status = ? GROUP BY pipeline", (LEASED,)
+            ).fetchall())
+            # At its limit a pipeline only admits interactive jobs, up to the burst allowance
+            full = [p for p, limit in self.config.pipeline_limits.items() if running.get(p, 0) >= limit]
+            closed = [p for p in full
+                      if running.get(p, 0) >= self.config.pipeline_limits[p] + self.config.interactive_burst]
+            query = "SELECT * FROM jobs WHERE status = ? AND run_after <= ? AND priority >= ?"
+            params: List[Any] = [QUEUED, now, min_priority]
+            if full:
+                query += f" AND (pipeline NOT IN ({', '.join('?' * len(full))}) OR priority >= ?)"
+                params += full + [INTERACTIVE]
+            if closed:
+                query += f" AND pipeline NOT IN ({', '.join('?' * len(closed))})"
+                params += closed
+            if pipelines is not None:
+                query += f" AND pipeline IN ({', '.join('?' * len(pipelines))})"
+                params += pipelines
+            row = conn.execute(query + " ORDER BY priority DESC, created_at LIMIT 1", params).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, lease_owner = ?, lease_expires = ?, "
+                "started_at = ? WHERE id = ?",
+                (LEASED, owner, now + self.config.lease_seconds, now, row["id"]),
+            )
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        job = self._row(row)
+        job.update(status=LEASED, attempts=job["attempts"] + 1, lease_owner=owner)
+        return job
+
+    def heartbeat(self, job_id: str, owner: str) -> bool:
+        """Extend a lease; False if the job is no longer ours"""
+        with self._connect() as conn:
+            return conn.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE id = ? AND status = ? AND lease_owner = ?",
+                (time.time() + self.config.lease_seconds, job_id, LEASED, owner),
+            ).rowcount == 1
+
+    def complete(self, job_id: str, owner: str, result: Any) -> bool:
+        with self._connect() as conn:
+            return conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, finished_at = ?, lease_owner = NULL "
+                "WHERE id = ? AND status = ? AND lease_owner = ?",
+                (SUCCEEDED, json.dumps(result, default=str), time.time(), job_id, LEASED, owner),
+            ).rowcount == 1
+
+    def fail(self, job_id: str, owner: str, error: str, retryable: bool = True) -> str:
+        """Schedule a retry with backoff, or dead-letter the job; returns the new status"""
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND status = ? AND lease_owner = ?",
+                (job_id, LEASED, owner),
+            ).fetchone()
+            if row is None:
+                return ""
+            if retryable and row["attempts"] < row["max_attempts"]:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, run_after = ?, last_error = ?, lease_owner = NULL WHERE id = ?",
+                    (QUEUED, now + self._backoff(row["attempts"]), error, job_id),
+                )
+                return QUEUED
+            conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, last_error = ?, lease_owner = NULL WHERE id = ?",
+                (DEAD, now, error, job_id),
+            )
+            return DEAD
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            return self._row(conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def dead_letters(self, limit: int = 50) -> List[Dict[str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY finished_at DESC LIMIT ?", (DEAD, limit)
+            ).fetchall()
+        return [self._row(r) for r in rows]
+
+    def requeue(self, job_id: str) -> bool:
+        """Give a dead-lettered job a fresh set of attempts"""
+        with self._connect() as conn:
+            return conn.execute(
+                "UPDATE jobs SET status = ?, attempts = 0, run_after = ?, finished_at = NULL "
+                "WHERE id = ? AND status = ?",
+                (QUEUED, time.time(), job_id, DEAD),
+            ).rowcount == 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Job counts per pipeline and status, and the oldest waiting job's age"""
+        now = time.time()
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT pipeline, status, COUNT(*) AS n, MIN(created_at) AS oldest FROM jobs "
+                "GROUP BY pipeline, status"
+            ).fetchall()
+        stats: Dict[str, Any] = {}
+        for row in rows:
+            entry = stats.setdefault(row["pipeline"], {"limit": self.config.pipeline_limits.get(row["pipeline"])})
+            entry[row["status"]] = row["n"]
+            if row["status"] == QUEUED:
+                entry["oldest_queued_s"] = round(now - row["oldest"], 1)
+        return stats
+
+
+class QueueWorker:
+    """Drains the queue with a fixed number of slots over warm pipelines"""
+
+    def __init__(self, queue: Optional[JobQueue] = None, pipelines: Optional[List[str]] = None):
+        self.queue = queue or JobQueue()
+        self.config = self.queue.config
+        self.pipelines = pipelines
+        self.owner = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self._workers: Dict[str, List[Any]] = {}
+        self._busy: set = set()
+        self._running = 0
+        self._stopping = False
+
+    def _acquire(self, pipeline: str):
+        """A warm worker for the pipeline; process workers run one job each"""
+        from ai_lab.daemon import DaemonConfig, InProcessWorker, create_worker
+        pool = self._workers.setdefault(pipeline, [])
+        for worker in pool:
+            if isinstance(worker, InProcessWorker) or id(worker) not in self._busy:
+                self._busy.add(id(worker))
+                return worker
+        worker = create_worker(pipeline, DaemonConfig.from_env())
+        pool.append(worker)
+        self._busy.add(id(worker))
+        return worker
+
+    async def _heartbeat(self, job_id: str):
+        while True:
+            await asyncio.sleep(self.config.lease_seconds / 3)
+            if not await asyncio.to_thread(self.queue.heartbeat, job_id, self.owner):
+                logger.error(f"Lost the lease on job {job_id}")
+                return
+
+    async def _execute(self, job: Dict[str, Any]):
+        worker = None
+        heartbeat = asyncio.create_task(self._heartbeat(job["id"]))
+        started = time.perf_counter()
+        try:
+            # An unknown pipeline raises KeyError here and is dead-lettered below
+            worker = self._acquire(job["pipeline"])
+            result = await worker.run(job["payload"])
+            if isinstance(result, dict) and result.get("status") == "error":
+                raise RuntimeError(result.get("message", "pipeline returned an error"))
+            await asyncio.to_thread(self.queue.complete, job["id"], self.owner, result)
+            logger.info(f"Job {job['id']} ({job['pipeline']}) done in {time.perf_counter() - started:.1f}s")
+        except Exception as e:
+            # Bad input won't get better on retry
+            retryable = not isinstance(e, (ValueError, KeyError))
+            status = await asyncio.to_thread(self.queue.fail, job["id"], self.owner, str(e), retryable)
+            logger.error(f"Job {job['id']} ({job['pipeline']}) failed, now {status}: {str(e)}")
+        finally:
+            heartbeat.cancel()
+            if worker is not None:
+                self._busy.discard(id(worker))
+            self._running -= 1
+
+    async def run(self, stop_when_idle: bool = False):
+        """Claim and run jobs until stopped (or the queue is empty)"""
+        tasks: set = set()
+        while not self._stopping:
+            free = self.config.workers - self._running
+            job = None
+            # A job that fails while the claim runs is requeued after it; claim again before stopping
+            was_busy = bool(tasks)
+            if free > 0:
+                # The last reserved slots only take interactive work
+                min_priority = INTERACTIVE if free <= self.config.interactive_reserve else 0
+                job = await asyncio.to_thread(self.queue.claim, self.owner, min_priority, self.pipelines)
+            if job is None:
+                if stop_when_idle and not was_busy and not tasks:
+                    break
+                await asyncio.sleep(self.config.poll_interval)
+                continue
+            self._running += 1
+            task = asyncio.create_task(self._execute(job))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        for pool in self._workers.values():
+            for worker in pool:
+                await worker.stop()
+
+    def stop(self):
+        self._stopping = True
+
+
+def wait_for(queue: JobQueue, job_id: str, timeout: Optional[float] = None,
+             interval: float = 0.25) -> Optional[Dict[str, Any]]:
+    """Poll until a job succeeds or is dead-lettered"""
+    deadline = time.time() + timeout if timeout else None
+    while True:
+        job = queue.get(job_id)
+        if job is None or job["status"] in (SUCCEEDED, DEAD):
+            return job
+        if deadline and time.time() > deadline:
+            return job
+        time.sleep(interval)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for the pipeline benchmarks.
+Checks that replay runs get a placeholder for every credential the pipelines
+read, and replays the stock_picker cassette with no real keys set when a
+cassette and uv are available. Run with `python -m ai_lab.test_bench` from
+the repo root, or with pytest.
+"""
+
+import os
+import re
+import shutil
+import sys
+from pathlib import Path
+
+from ai_lab.bench import PIPELINES, REPLAY_ENV, REPO_ROOT, BenchConfig, child_env, measure
+
+CREDENTIAL = re.compile(r"""(?:getenv|environ\.get|environ\[)\(?\s*['"]([A-Z0-9_]+_(?:KEY|TOKEN|USER))['"]""")
+
+
+def credentials_read(root: Path):
+    names = set()
+    for path in root.rglob("*.py"):
+        if ".venv" in path.parts or path.name.startswith("test_"):
+            continue
+        names.update(CREDENTIAL.findall(path.read_text(encoding="utf-8", errors="replace")))
+    return names
+
+
+def without_credentials():
+    """os.environ minus every key replay would fill in, restored by the caller"""
+    return {key: os.environ.pop(key) for key in list(REPLAY_ENV) if key in os.environ}
+
+
+def test_replay_env_covers_crew_credentials():
+    for name in ("stock_picker", "financial_researcher"):
+        pipeline = PIPELINES[name]
+        read = credentials_read(REPO_ROOT / pipeline.path)
+        missing = read - set(REPLAY_ENV)
+        assert not missing, f"{name} reads {sorted(missing)} with no replay placeholder"
+    assert "POLYGON_DATA_TOKEN" in REPLAY_ENV
+
+
+def test_replay_child_env_has_placeholders_without_real_keys():
+    saved = without_credentials()
+    try:
+        env = child_env(record=False)
+        assert all(env[key] == value for key, value in REPLAY_ENV.items())
+        assert env["AI_LAB_CASSETTE_MODE"] == "replay"
+        recording = child_env(record=True)
+        assert not any(key in recording for key in REPLAY_ENV)
+    finally:
+        os.environ.update(saved)
+
+
+def test_stock_picker_replays_with_no_real_keys():
+    config = BenchConfig.from_env()
+    cassette = Path(config.cassette_dir) / "stock_picker.json"
+    if not cassette.exists() or shutil.which("uv") is None:
+        print(f"   (skipped: needs uv and {cassette}; record it with `python main.py bench --record stock_picker`)")
+        return
+    saved = without_credentials()
+    try:
+        result = measure("stock_picker", config, allocs=False)
+    finally:
+        os.environ.update(saved)
+    assert result.status == "ok", result.error
+    assert result.requests.get("missed", 0) == 0 and result.requests.get("recorded", 0) == 0
+
+
+def main():
+    """Run all tests"""
+    print("🧪 Bench Test Suite")
+    print("=" * 50)
+    tests = [(name, fn) for name, fn in globals().items() if name.startswith("test_") and callable(fn)]
+    failed = 0
+    for name, fn in tests:
+        try:
+            fn()
+            print(f"✅ {name}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {name}: {e!r}")
+    print("=" * 50)
+    print(f"📊 {len(tests) - failed}/{len(tests)} passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
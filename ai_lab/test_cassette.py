@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Tests for HTTP record/replay.
+Records against a local server, then replays with the server's request
+count unchanged. Run with `python -m ai_lab.test_cassette` from the repo
+root, or with pytest.
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import asyncio
+import json
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import httpx
+
+from ai_lab.cassette import RECORD, REPLAY, CassetteConfig, CassetteMiss, use_cassette
+
+
+class EchoServer:
+    """Answers every request with its method, path and body, counting requests"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def respond(self):
+                server.requests += 1
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length).decode("utf-8")
+                if server.delay:
+                    time.sleep(server.delay)
+                status = 404 if self.path.startswith("/missing") else 200
+                data = json.dumps({"method": self.command, "path": self.path, "body": body,
+                                   "count": server.requests}).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = respond
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def cassette_path(tmp: str) -> str:
+    return str(Path(tmp) / "run.json")
+
+
+def test_replay_serves_recorded_responses_offline():
+    server = EchoServer()
+    with tempfile.TemporaryDirectory() as tmp:
+        with use_cassette(cassette_path(tmp), CassetteConfig(mode=RECORD)) as cassette:
+            recorded = httpx.get(f"{server.url}/quote?ticker=AAPL").json()
+        assert cassette.stats["recorded"] == 1
+        server.stop()
+
+        with use_cassette(cassette_path(tmp), CassetteConfig(mode=REPLAY)) as cassette:
+            replayed = httpx.get(f"{server.url}/quote?ticker=AAPL").json()
+        assert replayed == recorded
+        assert cassette.stats == {"replayed": 1, "recorded": 0, "missed": 0}
+        assert server.requests == 1
+
+
+def test_auto_mode_records_then_replays():
+    server = EchoServer()
+    with tempfile.TemporaryDirectory() as tmp:
+        with use_cassette(cassette_path(tmp), CassetteConfig()) as cassette:
+            assert cassette.mode == RECORD
+            httpx.get(f"{server.url}/a")
+        with use_cassette(cassette_path(tmp), CassetteConfig()) as cassette:
+            assert cassette.mode == REPLAY
+            httpx.get(f"{server.url}/a")
+        assert server.requests == 1
+    server.stop()
+
+
+def test_bodies_match_by_hash_regardless_of_order():
+    server = EchoServer()
+    with tempfile.TemporaryDirectory() as tmp:
+        with use_cassette(cassette_path(tmp), CassetteConfig(mode=RECORD)):
+            httpx.post(f"{server.url}/chat", json={"prompt": "first", "n": 1})
+            httpx.post(f"{server.url}/chat", json={"prompt": "second", "n": 2})
+        with use_cassette(cassette_path(tmp), CassetteConfig(mode=REPLAY)):
+            # Key order does not change the hash of a JSON body
+            second = httpx.post(f"{server.url}/chat", content=b'{"n": 2, "prompt": "second"}').json()
+            first = httpx.post(f"{server.url}/chat", json={"prompt": "first", "n": 1}).json()
+        assert json.loads(first["body"])["prompt"] == "first"
+        assert json.loads(second["body"])["prompt"] == "second"
+    server.stop()
+
+
+def test_unmatched_body_falls_back_to_next_unused_response():
+    server = EchoServer()
+    with tempfile.TemporaryDirectory() as tmp:
+        with use_cassette(cassette_path(tmp), CassetteConfig(mode=RECORD)):
+            httpx.post(f"{server.url}/chat", json={"prompt": "at 10:00"})
+            httpx.post(f"{server.url}/chat", json={"prompt": "at 10:01"})
+        with use_cassette(cassette_path(tmp), CassetteConfig(mode=REPLAY)):
+            first = httpx.post(f"{server.url}/chat", json={"prompt": "at 11:00"}).json()
+            second = httpx.post(f"{server.url}/chat", json={"prompt": "at 11:01"}).json()
+            try:
+                httpx.post(f"{server.url}/chat", json={"prompt": "at 11:02"})
+            except CassetteMiss:
+                pass
+            else:
+                raise AssertionError("a third request replayed from two recordings")
+        assert [first["count"], second["count"]] == [1, 2]
+    server.stop()
+
+
+def test_unknown_request_is_a_miss():
+    server = EchoServer()
+    with tempfile.TemporaryDirectory() as tmp:
+        with use_cassette(cassette_path(tmp), CassetteConfig(mode=RECORD)):
+            httpx.get(f"{server.url}/a")
+        with use_cassette(cassette_path(tmp), CassetteConfig(mode=REPLAY)) as cassette:
+            try:
+                httpx.get(f"{server.url}/b")
+            except CassetteMiss:
+                pass
+            else:
+                raise AssertionError("request for an unrecorded URL was answered")
+        assert cassette.stats["missed"] == 1
+        assert server.requests == 1
+    server.stop()
+
+
+def test_secret_query_params_are_stripped_from_urls():
+    server = EchoServer()
+    with tempfile.TemporaryDirectory() as tmp:
+        with use_cassette(cassette_path(tmp), CassetteConfig(mode=RECORD)):
+            httpx.get(f"{server.url}/v2/aggs?ticker=AAPL&apiKey=secret-one")
+        stored = json.loads(Path(cassette_path(tmp)).read_text())["interactions"]
+        assert stored[0]["url"] == f"{server.url}/v2/aggs?ticker=AAPL"
+        with use_cassette(cassette_path(tmp), CassetteConfig(mode=REPLAY)) as cassette:
+            httpx.get(f"{server.url}/v2/aggs?apiKey=secret-two&ticker=AAPL")
+        assert cassette.stats["replayed"] == 1
+    server.stop()
+
+
+def test_async_client_replays():
+    server = EchoServer()
+
+    async def fetch():
+        async with httpx.AsyncClient() as client:
+            return (await client.get(f"{server.url}/async")).json()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with use_cassette(cassette_path(tmp), CassetteConfig(mode=RECORD)):
+            recorded = asyncio.run(fetch())
+        with use_cassette(cassette_path(tmp), CassetteConfig(mode=REPLAY)):
+            replayed = asyncio.run(fetch())
+        assert replayed == recorded
+        assert server.requests == 1
+    server.stop()
+
+
+def test_urllib_replays_errors_as_http_errors():
+    server = EchoServer()
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in (RECORD, REPLAY):
+            with use_cassette(cassette_path(tmp), CassetteConfig(mode=mode)):
+                with urllib.request.urlopen(f"{server.url}/mail", data=b"hello") as response:
+                    assert json.loads(response.read())["body"] == "hello"
+                try:
+                    urllib.request.urlopen(f"{server.url}/missing")
+                except urllib.error.HTTPError as e:
+                    assert e.code == 404
+                else:
+                    raise AssertionError("404 was not raised")
+        assert server.requests == 2
+    server.stop()
+
+
+def test_replay_timing_follows_recorded_latency():
+    server = EchoServer(delay=0.2)
+    with tempfile.TemporaryDirectory() as tmp:
+        with use_cassette(cassette_path(tmp), CassetteConfig(mode=RECORD)):
+            httpx.get(f"{server.url}/slow")
+        for timing, low, high in (("none", 0.0, 0.1), ("recorded", 0.2, 1.0), ("0.5", 0.1, 0.2)):
+            with use_cassette(cassette_path(tmp), CassetteConfig(mode=REPLAY, timing=timing)):
+                started = time.perf_counter()
+                httpx.get(f"{server.url}/slow")
+                elapsed = time.perf_counter() - started
+            assert low <= elapsed < high, f"{timing}: {elapsed:.3f}s"
+    server.stop()
+
+
+def test_failed_run_is_not_saved_and_patches_are_removed():
+    server = EchoServer()
+    original = httpx.HTTPTransport.handle_request
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            with use_cassette(cassette_path(tmp), CassetteConfig(mode=RECORD)):
+                httpx.get(f"{server.url}/a")
+                raise RuntimeError("pipeline failed")
+        except RuntimeError:
+            pass
+        assert not Path(cassette_path(tmp)).exists()
+    assert httpx.HTTPTransport.handle_request is original
+    server.stop()
+
+
+def test_cassettes_do_not_nest():
+    with tempfile.TemporaryDirectory() as tmp:
+        with use_cassette(cassette_path(tmp), CassetteConfig(mode=RECORD)):
+            try:
+                with use_cassette(str(Path(tmp) / "other.json"), CassetteConfig(mode=RECORD)):
+                    pass
+            except RuntimeError:
+                pass
+            else:
+                raise AssertionError("nested cassette was allowed")
+
+
+def main():
+    """Run all tests"""
+    print("🧪 Cassette Test Suite")
+    print("=" * 50)
+    tests = [(name, fn) for name, fn in globals().items() if name.startswith("test_") and callable(fn)]
+    failed = 0
+    for name, fn in tests:
+        try:
+            fn()
+            print(f"✅ {name}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {name}: {e!r}")
+    print("=" * 50)
+    print(f"📊 {len(tests) - failed}/{len(tests)} passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
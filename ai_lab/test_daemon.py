@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for the daemon's crew worker processes.
+A stand-in `uv` on PATH answers like a worker, so no crew environment is
+needed. Run with `python -m ai_lab.test_daemon` from the repo root, or with
+pytest.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+from ai_lab.bench import REPO_ROOT
+from ai_lab.daemon import ProcessWorker
+
+FAKE_UV = f"""#!{sys.executable}
+import json, os, sys
+print(json.dumps({{"status": "ready"}}), flush=True)
+for line in sys.stdin:
+    print(json.dumps({{"status": "succeeded", "result": {{"cwd": os.getcwd(), "input": json.loads(line)}}}}), flush=True)
+"""
+
+
+def run_with_fake_uv(coro_fn):
+    with tempfile.TemporaryDirectory() as tmp:
+        uv = Path(tmp) / "uv"
+        uv.write_text(FAKE_UV)
+        uv.chmod(0o755)
+        path = os.environ.get("PATH", "")
+        os.environ["PATH"] = os.pathsep.join([tmp, path])
+        try:
+            return asyncio.run(coro_fn())
+        finally:
+            os.environ["PATH"] = path
+
+
+def test_worker_runs_in_the_crew_project_directory():
+    async def scenario():
+        worker = ProcessWorker("stock_picker", "src/crewExp/stock_picker", start_timeout=10)
+        try:
+            return await worker.run({"sector": "Energy"})
+        finally:
+            await worker.stop()
+
+    result = run_with_fake_uv(scenario)
+    assert Path(result["cwd"]).resolve() == (REPO_ROOT / "src/crewExp/stock_picker").resolve()
+    assert result["input"] == {"sector": "Energy"}
+
+
+def test_worker_stays_warm_between_jobs():
+    async def scenario():
+        worker = ProcessWorker("stock_picker", "src/crewExp/stock_picker", start_timeout=10)
+        try:
+            await worker.run({"n": 1})
+            pid = worker.process.pid
+            await worker.run({"n": 2})
+            return pid, worker.process.pid
+        finally:
+            await worker.stop()
+
+    first, second = run_with_fake_uv(scenario)
+    assert first == second
+
+
+def main():
+    """Run all tests"""
+    print("🧪 Daemon Test Suite")
+    print("=" * 50)
+    tests = [(name, fn) for name, fn in globals().items() if name.startswith("test_") and callable(fn)]
+    failed = 0
+    for name, fn in tests:
+        try:
+            fn()
+            print(f"✅ {name}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {name}: {e!r}")
+    print("=" * 50)
+    print(f"📊 {len(tests) - failed}/{len(tests)} passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
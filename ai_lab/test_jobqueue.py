@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Tests for the durable job queue.
+Covers claim order, pipeline limits, leases, retries with backoff and the
+worker's handling of failing jobs. Run with `python -m ai_lab.test_jobqueue`
+from the repo root, or with pytest.
+"""
+
+import asyncio
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+from ai_lab.jobqueue import (
+    BATCH,
+    DEAD,
+    INTERACTIVE,
+    LEASED,
+    NORMAL,
+    QUEUED,
+    SUCCEEDED,
+    JobQueue,
+    QueueConfig,
+    QueueWorker,
+)
+
+
+def make_queue(tmp: str, **overrides) -> JobQueue:
+    settings = {"db_path": str(Path(tmp) / "jobs.db"), "backoff_base": 0.0, "poll_interval": 0.01}
+    settings.update(overrides)
+    return JobQueue(QueueConfig(**settings))
+
+
+class FakeWorker:
+    """Stands in for a warm pipeline worker"""
+
+    def __init__(self, outcome):
+        self.outcome = outcome
+        self.warm = True
+        self.runs = 0
+
+    async def run(self, inputs):
+        self.runs += 1
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return self.outcome
+
+    async def stop(self):
+        pass
+
+
+class FakeQueueWorker(QueueWorker):
+    def __init__(self, queue: JobQueue, outcome):
+        super().__init__(queue)
+        self.fake = FakeWorker(outcome)
+
+    def _acquire(self, pipeline: str):
+        return self.fake
+
+
+def test_claim_order_is_priority_then_fifo():
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = make_queue(tmp, pipeline_limits={"deep_research": 10})
+        batch = queue.enqueue("deep_research", {"n": 1}, priority=BATCH)
+        first = queue.enqueue("deep_research", {"n": 2}, priority=NORMAL)
+        second = queue.enqueue("deep_research", {"n": 3}, priority=NORMAL)
+        urgent = queue.enqueue("deep_research", {"n": 4}, priority=INTERACTIVE)
+        order = [queue.claim("w")["id"] for _ in range(4)]
+        assert order == [urgent, first, second, batch]
+        assert queue.claim("w") is None
+
+
+def test_claim_leases_the_job():
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = make_queue(tmp)
+        job_id = queue.enqueue("sales_agent", {"message": "hi"})
+        job = queue.claim("worker-a")
+        assert job["id"] == job_id and job["payload"] == {"message": "hi"}
+        stored = queue.get(job_id)
+        assert stored["status"] == LEASED and stored["lease_owner"] == "worker-a" and stored["attempts"] == 1
+
+
+def test_delayed_jobs_wait_until_due():
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = make_queue(tmp)
+        queue.enqueue("sales_agent", delay=0.3)
+        assert queue.claim("w") is None
+        time.sleep(0.35)
+        assert queue.claim("w") is not None
+
+
+def test_pipeline_limit_admits_only_interactive_burst():
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = make_queue(tmp, pipeline_limits={"stock_picker": 1}, interactive_burst=1)
+        for _ in range(2):
+            queue.enqueue("stock_picker", priority=NORMAL)
+        queue.enqueue("stock_picker", priority=INTERACTIVE)
+        queue.enqueue("stock_picker", priority=INTERACTIVE)
+        assert queue.claim("w")["priority"] == INTERACTIVE
+        # At the limit: only interactive work gets in, up to the burst allowance
+        assert queue.claim("w")["priority"] == INTERACTIVE
+        assert queue.claim("w") is None
+
+
+def test_claim_filters_by_pipeline_and_priority():
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = make_queue(tmp)
+        queue.enqueue("sales_agent", priority=NORMAL)
+        research = queue.enqueue("deep_research", priority=NORMAL)
+        assert queue.claim("w", min_priority=INTERACTIVE) is None
+        assert queue.claim("w", pipelines=["deep_research"])["id"] == research
+
+
+def test_only_the_owner_can_renew_or_finish():
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = make_queue(tmp)
+        job_id = queue.enqueue("sales_agent")
+        queue.claim("owner")
+        assert not queue.heartbeat(job_id, "someone-else")
+        assert not queue.complete(job_id, "someone-else", {})
+        assert queue.heartbeat(job_id, "owner")
+        assert queue.complete(job_id, "owner", {"status": "ok"})
+        job = queue.get(job_id)
+        assert job["status"] == SUCCEEDED and job["result"] == {"status": "ok"}
+
+
+def test_expired_lease_is_requeued_then_dead_lettered():
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = make_queue(tmp, lease_seconds=0.05)
+        job_id = queue.enqueue("sales_agent", max_attempts=2)
+        assert queue.claim("crashed")["id"] == job_id
+        time.sleep(0.1)
+        job = queue.claim("rescuer")
+        assert job["id"] == job_id and job["attempts"] == 2
+        assert queue.get(job_id)["last_error"] == "lease expired"
+        time.sleep(0.1)
+        assert queue.claim("rescuer") is None
+        assert queue.get(job_id)["status"] == DEAD
+
+
+def test_failures_back_off_exponentially():
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = make_queue(tmp, backoff_base=10.0, backoff_max=15.0)
+        delays = [queue._backoff(attempt) for attempt in range(1, 5) for _ in range(20)]
+        first, second, capped = delays[:20], delays[20:40], delays[40:]
+        assert all(5.0 <= d <= 10.0 for d in first)
+        assert all(7.5 <= d <= 15.0 for d in second)
+        assert all(d <= 15.0 for d in capped)
+
+        job_id = queue.enqueue("sales_agent", max_attempts=3)
+        queue.claim("w")
+        before = time.time()
+        assert queue.fail(job_id, "w", "timeout") == QUEUED
+        job = queue.get(job_id)
+        assert 5.0 <= job["run_after"] - before <= 10.5
+        assert job["last_error"] == "timeout" and job["lease_owner"] is None
+        assert queue.claim("w") is None
+
+
+def test_attempts_exhausted_or_non_retryable_is_dead():
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = make_queue(tmp)
+        job_id = queue.enqueue("sales_agent", max_attempts=2)
+        queue.claim("w")
+        assert queue.fail(job_id, "w", "boom") == QUEUED
+        queue.claim("w")
+        assert queue.fail(job_id, "w", "boom") == DEAD
+
+        bad_input = queue.enqueue("sales_agent", max_attempts=5)
+        queue.claim("w")
+        assert queue.fail(bad_input, "w", "bad input", retryable=False) == DEAD
+        assert {j["id"] for j in queue.dead_letters()} == {job_id, bad_input}
+
+        assert queue.requeue(job_id)
+        job = queue.get(job_id)
+        assert job["status"] == QUEUED and job["attempts"] == 0
+        assert not queue.requeue(job_id)
+
+
+def test_enqueue_rejects_unknown_pipelines():
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = make_queue(tmp)
+        try:
+            queue.enqueue("deep_reserch")
+        except ValueError as e:
+            assert "deep_reserch" in str(e)
+        else:
+            raise AssertionError("unknown pipeline was queued")
+        assert queue.stats() == {}
+
+
+def test_worker_completes_and_retries_jobs():
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = make_queue(tmp)
+        done = queue.enqueue("sales_agent")
+        worker = FakeQueueWorker(queue, {"status": "ok"})
+        asyncio.run(worker.run(stop_when_idle=True))
+        assert queue.get(done)["status"] == SUCCEEDED
+
+        failing = queue.enqueue("sales_agent", max_attempts=2)
+        worker = FakeQueueWorker(queue, {"status": "error", "message": "provider down"})
+        asyncio.run(worker.run(stop_when_idle=True))
+        job = queue.get(failing)
+        assert job["status"] == DEAD and job["attempts"] == 2 and job["last_error"] == "provider down"
+        assert worker.fake.runs == 2 and worker._running == 0
+
+
+def test_worker_dead_letters_unknown_pipeline_and_keeps_its_slot():
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = make_queue(tmp, workers=1, interactive_reserve=0)
+        # Written by an older client that did not validate pipeline names
+        with sqlite3.connect(queue.db_path) as conn:
+            for _ in range(2):
+                conn.execute(
+                    "INSERT INTO jobs (id, pipeline, payload, priority, status, max_attempts, run_after, created_at) "
+                    "VALUES (?, 'deep_reserch', '{}', ?, ?, 3, 0, ?)",
+                    (uuid.uuid4().hex[:16], NORMAL, QUEUED, time.time()),
+                )
+        worker = QueueWorker(queue)
+        # With its only slot leaked by the first job, the worker would never claim the second
+        asyncio.run(asyncio.wait_for(worker.run(stop_when_idle=True), 10))
+        dead = queue.dead_letters()
+        assert len(dead) == 2 and all(job["attempts"] == 1 for job in dead)
+        assert worker._running == 0
+
+
+def main():
+    """Run all tests"""
+    print("🧪 Job Queue Test Suite")
+    print("=" * 50)
+    tests = [(name, fn) for name, fn in globals().items() if name.startswith("test_") and callable(fn)]
+    failed = 0
+    for name, fn in tests:
+        try:
+            fn()
+            print(f"✅ {name}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {name}: {e!r}")
+    print("=" * 50)
+    print(f"📊 {len(tests) - failed}/{len(tests)} passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,21 @@
+from typing import Optional
+
+from ai_lab.tracing.sink import SpanWriter, TraceConfig, get_writer, span_record
+from ai_lab.tracing.store import PathStep, TraceStore
+
+
+def install_local_tracing(config: Optional[TraceConfig] = None):
+    """Mirror Agents SDK traces into the local sink (imports the SDK lazily)"""
+    from ai_lab.tracing.agents_processor import install_local_tracing as install
+    return install(config)
+
+
+__all__ = [
+    "PathStep",
+    "SpanWriter",
+    "TraceConfig",
+    "TraceStore",
+    "get_writer",
+    "install_local_tracing",
+    "span_record",
+]
@@ -0,0 +1,3 @@
+from ai_lab.tracing.cli import main
+
+main()
@@ -0,0 +1,149 @@
+"""
+Agents SDK trace processor that mirrors every trace into the local span sink.
+
+Agent turns, function tool calls, handoffs, guardrails and model requests all
+arrive as SDK spans; each is written when it ends. The trace itself becomes a
+root span so spans without a parent still hang off one tree.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Optional
+import logging
+import threading
+import time
+
+from agents import add_trace_processor, set_trace_processors
+from agents.tracing import Span, Trace, TracingProcessor
+
+from ai_lab.tracing.sink import (
+    AGENT,
+    CUSTOM,
+    GUARDRAIL,
+    HANDOFF,
+    LLM,
+    TOOL,
+    TRACE,
+    SpanWriter,
+    TraceConfig,
+    get_writer,
+    span_record,
+)
+
+logger = logging.getLogger(__name__)
+
+RUNTIME = "agents"
+
+SPAN_KINDS = {
+    "agent": AGENT,
+    "function": TOOL,
+    "mcp_tools": TOOL,
+    "generation": LLM,
+    "response": LLM,
+    "handoff": HANDOFF,
+    "guardrail": GUARDRAIL,
+}
+
+
+def _epoch(value: Optional[str], default: float) -> float:
+    if not value:
+        return default
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        return default
+
+
+def _usage(span_data: Any) -> Dict[str, Any]:
+    usage = getattr(span_data, "usage", None)
+    response = getattr(span_data, "response", None)
+    if usage is None and response is not None:
+        usage = getattr(response, "usage", None)
+    if usage is None:
+        return {}
+    if isinstance(usage, dict):
+        return usage
+    return {
+        "input_tokens": getattr(usage, "input_tokens", None),
+        "output_tokens": getattr(usage, "output_tokens", None),
+    }
+
+
+class LocalTracingProcessor(TracingProcessor):
+    """Writes finished SDK traces and spans to the local JSONL sink"""
+
+    def __init__(self, writer: Optional[SpanWriter] = None):
+        self.writer = writer or get_writer(RUNTIME)
+        self._lock = threading.Lock()
+        self._trace_starts: Dict[str, float] = {}
+
+    def on_trace_start(self, trace: Trace) -> None:
+        with self._lock:
+            self._trace_starts[trace.trace_id] = time.time()
+
+    def on_trace_end(self, trace: Trace) -> None:
+        ended = time.time()
+        with self._lock:
+            started = self._trace_starts.pop(trace.trace_id, ended)
+        exported = trace.export() or {}
+        self._write(span_record(
+            trace.trace_id, trace.trace_id, None, RUNTIME, TRACE, trace.name, started, ended,
+            attrs={"group_id": exported.get("group_id"), "metadata": exported.get("metadata")},
+        ))
+
+    def on_span_start(self, span: Span[Any]) -> None:
+        pass
+
+    def on_span_end(self, span: Span[Any]) -> None:
+        ended = time.time()
+        data = span.span_data
+        exported = data.export() or {}
+        span_type = exported.pop("type", data.type)
+        if span_type == "handoff":
+            name = f"{exported.get('from_agent')} -> {exported.get('to_agent')}"
+        else:
+            name = exported.pop("name", None) or exported.get("model") or span_type
+        error = span.error.get("message") if span.error else None
+        attrs = {"span_type": span_type, **exported, **_usage(data)}
+        self._write(span_record(
+            span.trace_id,
+            span.span_id,
+            span.parent_id or span.trace_id,
+            RUNTIME,
+            SPAN_KINDS.get(span_type, CUSTOM),
+            name,
+            _epoch(span.started_at, ended),
+            _epoch(span.ended_at, ended),
+            error=error,
+            attrs=attrs,
+        ))
+
+    def _write(self, record: Dict[str, Any]):
+        try:
+            self.writer.write(record)
+        except OSError as e:
+            logger.error(f"Failed to write local span: {str(e)}")
+
+    def shutdown(self) -> None:
+        self.writer.close()
+
+    def force_flush(self) -> None:
+        pass
+
+
+_installed: Optional[LocalTracingProcessor] = None
+
+
+def install_local_tracing(config: Optional[TraceConfig] = None) -> Optional[LocalTracingProcessor]:
+    """Register the local processor once; returns None if tracing is disabled"""
+    global _installed
+    config = config or TraceConfig.from_env()
+    if not config.enabled:
+        return None
+    if _installed is None:
+        _installed = LocalTracingProcessor(get_writer(RUNTIME, config))
+        if config.export == "local":
+            set_trace_processors([_installed])
+        else:
+            add_trace_processor(_installed)
+        logger.info(f"Writing local traces to {_installed.writer.path}")
+    return _installed
@@ -0,0 +1,105 @@
+"""
+Command line view over local traces.
+
+    python -m ai_lab.tracing runs
+    python -m ai_lab.tracing slowest --kind tool
+    python -m ai_lab.tracing top --kind llm
+    python -m ai_lab.tracing critical-path latest
+
+Every command ingests new span files first.
+"""
+
+from datetime import datetime
+import argparse
+import json
+import sys
+
+from ai_lab.tracing.store import TraceStore
+
+
+def _ms(value: float) -> str:
+    return f"{value / 1000:.2f}s" if value >= 1000 else f"{value:.0f}ms"
+
+
+def _when(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def show_runs(store: TraceStore, args: argparse.Namespace):
+    for run in store.runs(limit=args.limit):
+        errors = f"  errors={run['errors']}" if run["errors"] else ""
+        print(f"{run['trace_id']}  {_when(run['started_at'])}  {run['runtime']:<7} "
+              f"{_ms(run['duration_ms']):>9}  spans={run['spans']:<4} {run['name'] or ''}{errors}")
+
+
+def show_slowest(store: TraceStore, args: argparse.Namespace):
+    for span in store.slowest(kind=args.kind, name=args.name, limit=args.limit):
+        error = "  ERROR" if span["error"] else ""
+        print(f"{_ms(span['duration_ms']):>9}  {span['kind']:<9} {span['name'][:60]:<60} "
+              f"{_when(span['started_at'])}  {span['trace_id']}{error}")
+
+
+def show_top(store: TraceStore, args: argparse.Namespace):
+    print(f"{'total':>9} {'count':>6} {'avg':>9} {'p95':>9} {'max':>9}  kind      name")
+    for row in store.top(kind=args.kind, limit=args.limit):
+        print(f"{_ms(row['total_ms']):>9} {row['count']:>6} {_ms(row['avg_ms']):>9} "
+              f"{_ms(row['p95_ms']):>9} {_ms(row['max_ms']):>9}  {row['kind']:<9} {row['name'][:60]}")
+
+
+def show_critical_path(store: TraceStore, args: argparse.Namespace):
+    trace_id = store.latest_trace() if args.trace_id == "latest" else args.trace_id
+    steps = store.critical_path(trace_id) if trace_id else []
+    if not steps:
+        print(f"No spans found for trace {args.trace_id}")
+        sys.exit(1)
+    total = steps[0].span["duration_ms"] or 1.0
+    print(f"Critical path for {trace_id} ({_ms(total)} wall)\n")
+    for step in steps:
+        span = step.span
+        error = "  ERROR" if span.get("error") else ""
+        print(f"{'  ' * step.depth}{span['kind']}: {span['name'][:70]}  "
+              f"{_ms(span['duration_ms'])} (self {_ms(step.self_ms)}){error}")
+    print("\nBy kind:")
+    for kind, ms in store.breakdown(steps).items():
+        print(f"  {kind:<10} {_ms(ms):>9}  {ms / total * 100:5.1f}%")
+    if args.json:
+        print(json.dumps([{"depth": s.depth, "self_ms": s.self_ms, **s.span} for s in steps], indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="ai-trace", description="Inspect local agent traces")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("ingest", help="index new span files")
+
+    runs = sub.add_parser("runs", help="recent traces")
+    runs.add_argument("--limit", type=int, default=20)
+
+    slowest = sub.add_parser("slowest", help="slowest individual spans across runs")
+    top = sub.add_parser("top", help="span names ranked by total time across runs")
+    for command in (slowest, top):
+        command.add_argument("--kind", help="agent, tool, llm, handoff, memory, task, crew, ...")
+        command.add_argument("--limit", type=int, default=20)
+    slowest.add_argument("--name", help="substring of the span name")
+
+    critical = sub.add_parser("critical-path", help="what a trace's wall time was spent on")
+    critical.add_argument("trace_id", nargs="?", default="latest")
+    critical.add_argument("--json", action="store_true", help="also dump the path as JSON")
+
+    args = parser.parse_args()
+    store = TraceStore()
+    added = store.ingest()
+    if args.command == "ingest":
+        print(f"Indexed {added} new spans into {store.db_path}")
+    elif args.command == "runs":
+        show_runs(store, args)
+    elif args.command == "slowest":
+        show_slowest(store, args)
+    elif args.command == "top":
+        show_top(store, args)
+    elif args.command == "critical-path":
+        show_critical_path(store, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+JSONL span sink shared by every runtime in the lab.
+
+Each process appends finished spans to its own file under the trace directory,
+one JSON object per line, so concurrent runs never contend for a file. The
+record format is the same for the Agents SDK and crewAI, which lets the trace
+CLI put both on one timeline.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+import atexit
+import json
+import logging
+import os
+import threading
+import uuid
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTR_CHARS = 2000
+
+AGENT = "agent"
+TOOL = "tool"
+HANDOFF = "handoff"
+LLM = "llm"
+MEMORY = "memory"
+TASK = "task"
+CREW = "crew"
+GUARDRAIL = "guardrail"
+TRACE = "trace"
+CUSTOM = "custom"
+
+
+@dataclass
+class TraceConfig:
+    """Where local spans go and whether the OpenAI exporter stays on"""
+    trace_dir: str = "~/.cache/ai-lab/traces"
+    enabled: bool = True
+    export: str = "both"
+
+    @classmethod
+    def from_env(cls) -> 'TraceConfig':
+        """Create config from environment variables"""
+        return cls(
+            trace_dir=os.getenv("AI_LAB_TRACE_DIR", "~/.cache/ai-lab/traces"),
+            enabled=os.getenv("AI_LAB_TRACING", "true").lower() in ("1", "true", "yes"),
+            # "local" drops the OpenAI exporter, "both" keeps it
+            export=os.getenv("AI_LAB_TRACE_EXPORT", "both").lower(),
+        )
+
+
+def new_id() -> str:
+    return uuid.uuid4().hex
+
+
+def clip(value: Any) -> Any:
+    """JSON-safe attribute value, with long strings truncated"""
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, (dict, list, tuple)):
+        try:
+            value = json.dumps(value, default=str)
+        except (TypeError, ValueError):
+            value = str(value)
+    else:
+        value = str(value)
+    return value if len(value) <= MAX_ATTR_CHARS else value[:MAX_ATTR_CHARS] + "..."
+
+
+def span_record(trace_id: str, span_id: str, parent_id: Optional[str], runtime: str, kind: str,
+                name: str, started_at: float, ended_at: float, error: Optional[str] = None,
+                attrs: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    return {
+        "trace_id": trace_id,
+        "span_id": span_id,
+        "parent_id": parent_id,
+        "runtime": runtime,
+        "kind": kind,
+        "name": name,
+        "started_at": started_at,
+        "ended_at": ended_at,
+        "duration_ms": round((ended_at - started_at) * 1000, 3),
+        "error": clip(error) if error else None,
+        "attrs": {k: clip(v) for k, v in (attrs or {}).items() if v is not None},
+    }
+
+
+class SpanWriter:
+    """Appends span records to this process's JSONL file"""
+
+    def __init__(self, config: Optional[TraceConfig] = None, runtime: str = "agents"):
+        self.config = config or TraceConfig.from_env()
+        self.trace_dir = Path(os.path.expanduser(self.config.trace_dir))
+        self.trace_dir.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        self.path = self.trace_dir / f"{stamp}-{runtime}-{os.getpid()}.jsonl"
+        self._lock = threading.Lock()
+        self._file = None
+
+    def write(self, record: Dict[str, Any]):
+        line = json.dumps(record, default=str) + "\n"
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+_writer_lock = threading.Lock()
+_writers: Dict[str, SpanWriter] = {}
+
+
+def get_writer(runtime: str = "agents", config: Optional[TraceConfig] = None) -> SpanWriter:
+    """Return the process-wide writer for a runtime"""
+    with _writer_lock:
+        if runtime not in _writers:
+            _writers[runtime] = SpanWriter(config, runtime=runtime)
+            atexit.register(_writers[runtime].close)
+        return _writers[runtime]
@@ -0,0 +1,224 @@
+"""
+SQLite index over the JSONL span files, with the queries behind the trace CLI.
+
+Ingest is incremental: each file's read offset is remembered and only whole
+lines are consumed, so files still being written by a live process can be
+ingested again later without duplicates.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import json
+import logging
+import os
+import sqlite3
+
+from ai_lab.tracing.sink import TraceConfig
+
+logger = logging.getLogger(__name__)
+
+# Children that end within this many seconds of the cursor still count as
+# sequential; span timestamps come from different clocks in each runtime
+EPSILON = 0.001
+
+
+@dataclass
+class PathStep:
+    """One span on a critical path and the time it alone accounts for"""
+    depth: int
+    span: Dict[str, Any]
+    self_ms: float
+
+
+class TraceStore:
+    """Ingests span files and answers run, slowest-span and critical-path queries"""
+
+    def __init__(self, config: Optional[TraceConfig] = None, db_path: Optional[str] = None):
+        self.config = config or TraceConfig.from_env()
+        self.trace_dir = Path(os.path.expanduser(self.config.trace_dir))
+        self.trace_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path or str(self.trace_dir / "index.db")
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS spans (
+                    span_id TEXT PRIMARY KEY,
+                    trace_id TEXT NOT NULL,
+                    parent_id TEXT,
+                    runtime TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    started_at REAL NOT NULL,
+                    ended_at REAL NOT NULL,
+                    duration_ms REAL NOT NULL,
+                    error TEXT,
+                    attrs TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_spans_trace ON spans (trace_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_spans_kind ON spans (kind, duration_ms)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS span_files (
+                    path TEXT PRIMARY KEY,
+                    offset INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def ingest(self) -> int:
+        """Load new lines from every span file; returns the number of spans added"""
+        added = 0
+        with self._connect() as conn:
+            offsets = {r["path"]: r["offset"] for r in conn.execute("SELECT path, offset FROM span_files")}
+            for path in sorted(self.trace_dir.glob("*.jsonl")):
+                offset = offsets.get(str(path), 0)
+                if path.stat().st_size <= offset:
+                    continue
+                with open(path, "rb") as f:
+                    f.seek(offset)
+                    chunk = f.read()
+                # Leave a partially written last line for the next ingest
+                complete = chunk[:chunk.rfind(b"\n") + 1]
+                rows = []
+                for line in complete.decode("utf-8", errors="replace").splitlines():
+                    try:
+                        rows.append(json.loads(line))
+                    except json.JSONDecodeError as e:
+                        logger.warning(f"Skipping bad span line in {path.name}: {str(e)}")
+                conn.executemany(
+                    "INSERT OR REPLACE INTO spans (span_id, trace_id, parent_id, runtime, kind, name, "
+                    "started_at, ended_at, duration_ms, error, attrs) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(r["span_id"], r["trace_id"], r.get("parent_id"), r["runtime"], r["kind"], r["name"],
+                      r["started_at"], r["ended_at"], r["duration_ms"], r.get("error"),
+                      json.dumps(r.get("attrs") or {})) for r in rows],
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO span_files (path, offset) VALUES (?, ?)",
+                    (str(path), offset + len(complete)),
+                )
+                added += len(rows)
+        return added
+
+    def runs(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Most recent traces with their root name, wall time and error count"""
+        with self._connect() as conn:
+            rows = conn.execute("""
+                SELECT trace_id, MIN(runtime) AS runtime, MIN(started_at) AS started_at,
+                       (MAX(ended_at) - MIN(started_at)) * 1000 AS duration_ms,
+                       COUNT(*) AS spans, SUM(error IS NOT NULL) AS errors,
+                       (SELECT name FROM spans r WHERE r.trace_id = s.trace_id AND r.parent_id IS NULL
+                        ORDER BY r.started_at LIMIT 1) AS name
+                FROM spans s GROUP BY trace_id ORDER BY started_at DESC LIMIT ?
+            """, (limit,)).fetchall()
+        return [dict(r) for r in rows]
+
+    def latest_trace(self) -> Optional[str]:
+        runs = self.runs(limit=1)
+        return runs[0]["trace_id"] if runs else None
+
+    def slowest(self, kind: Optional[str] = None, name: Optional[str] = None,
+                limit: int = 20) -> List[Dict[str, Any]]:
+        """Individual spans across all runs, slowest first"""
+        query, params = "SELECT * FROM spans WHERE 1 = 1", []
+        if kind:
+            query += " AND kind = ?"
+            params.append(kind)
+        if name:
+            query += " AND name LIKE ?"
+            params.append(f"%{name}%")
+        query += " ORDER BY duration_ms DESC LIMIT ?"
+        params.append(limit)
+        with self._connect() as conn:
+            return [dict(r) for r in conn.execute(query, params).fetchall()]
+
+    def top(self, kind: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """Span names across all runs ranked by total time, with avg/p95/max"""
+        query = "SELECT kind, name, duration_ms FROM spans WHERE kind != 'trace'"
+        params: List[Any] = []
+        if kind:
+            query += " AND kind = ?"
+            params.append(kind)
+        groups: Dict[tuple, List[float]] = {}
+        with self._connect() as conn:
+            for r in conn.execute(query, params):
+                groups.setdefault((r["kind"], r["name"]), []).append(r["duration_ms"])
+        stats = []
+        for (span_kind, span_name), values in groups.items():
+            values.sort()
+            stats.append({
+                "kind": span_kind,
+                "name": span_name,
+                "count": len(values),
+                "total_ms": round(sum(values), 1),
+                "avg_ms": round(sum(values) / len(values), 1),
+                "p95_ms": round(values[min(len(values) - 1, int(len(values) * 0.95))], 1),
+                "max_ms": round(values[-1], 1),
+            })
+        return sorted(stats, key=lambda s: s["total_ms"], reverse=True)[:limit]
+
+    def spans(self, trace_id: str) -> List[Dict[str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM spans WHERE trace_id = ? ORDER BY started_at", (trace_id,)
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    def critical_path(self, trace_id: str) -> List[PathStep]:
+        """The chain of spans that determined the trace's wall time.
+
+        Walking back from each span's end, the child that finished last is on
+        the path, then the last child to finish before that one started, and
+        so on. A span's self time is whatever its path children don't cover.
+        """
+        spans = self.spans(trace_id)
+        if not spans:
+            return []
+        by_id = {s["span_id"]: s for s in spans}
+        children: Dict[Optional[str], List[Dict[str, Any]]] = {}
+        for s in spans:
+            parent = s["parent_id"] if s["parent_id"] in by_id else None
+            children.setdefault(parent, []).append(s)
+        roots = children.get(None, [])
+        if len(roots) == 1:
+            root = roots[0]
+        else:
+            # Several top-level spans (e.g. one per crew stage): join them under one root
+            root = {"span_id": None, "kind": "trace", "name": trace_id, "runtime": spans[0]["runtime"],
+                    "started_at": min(s["started_at"] for s in roots),
+                    "ended_at": max(s["ended_at"] for s in roots), "error": None}
+            root["duration_ms"] = (root["ended_at"] - root["started_at"]) * 1000
+            children[root["span_id"]] = roots
+
+        steps: List[PathStep] = []
+
+        def walk(span: Dict[str, Any], depth: int):
+            step = PathStep(depth, span, 0.0)
+            steps.append(step)
+            cursor = span["ended_at"]
+            chosen = []
+            for child in sorted(children.get(span["span_id"], []), key=lambda c: c["ended_at"], reverse=True):
+                if min(child["ended_at"], span["ended_at"]) <= cursor + EPSILON:
+                    chosen.append(child)
+                    cursor = max(child["started_at"], span["started_at"])
+            covered = sum(
+                max(0.0, min(c["ended_at"], span["ended_at"]) - max(c["started_at"], span["started_at"]))
+                for c in chosen
+            )
+            step.self_ms = round(max(0.0, span["duration_ms"] - covered * 1000), 1)
+            for child in reversed(chosen):
+                walk(child, depth + 1)
+
+        walk(root, 0)
+        return steps
+
+    @staticmethod
+    def breakdown(steps: List[PathStep]) -> Dict[str, float]:
+        """Critical-path time by span kind"""
+        totals: Dict[str, float] = {}
+        for step in steps:
+            totals[step.span["kind"]] = round(totals.get(step.span["kind"], 0.0) + step.self_ms, 1)
+        return dict(sorted(totals.items(), key=lambda kv: kv[1], reverse=True))
@@ -0,0 +1,147 @@
+"""
+Pipelines kept constructed inside the daemon between jobs.
+
+`load()` does the expensive part once: imports, agent and tool construction,
+crew YAML, and the clients whose connection pools should stay open. `run()`
+handles one job on the long-lived event loop, so async clients bound to that
+loop are reused across jobs.
+
+The crews live in their own uv environments. The daemon runs them in worker
+processes (see ai_lab.daemon) that load these same classes.
+"""
+
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import logging
+import re
+import runpy
+import sys
+
+from ai_lab.bench import REPO_ROOT
+
+logger = logging.getLogger(__name__)
+
+
+class WarmPipeline(ABC):
+    """A pipeline constructed once and reused for every job"""
+    name: str = ""
+    # uv project the pipeline must run in; None for the daemon's own environment
+    project: Optional[str] = None
+
+    @abstractmethod
+    def load(self):
+        """Build everything the pipeline reuses across jobs"""
+
+    @abstractmethod
+    async def run(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """Handle one job"""
+
+
+class SalesAgentPipeline(WarmPipeline):
+    """SalesAgentSystem with its agents and tool wrappers built once"""
+    name = "sales_agent"
+
+    def load(self):
+        script = runpy.run_path(str(REPO_ROOT / "src/salesAgent/openai-agents.py"), run_name="daemon")
+        self.system = script["SalesAgentSystem"](script["EmailConfig"].from_env())
+
+    async def run(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        message = inputs.get("message", "Send out a cold sales email addressed to Dear CEO from Alice")
+        return await self.system.generate_and_send_email(message)
+
+
+class DeepResearchPipeline(WarmPipeline):
+    """ResearchManager runs with their agents imported once, identical queries coalesced"""
+    name = "deep_research"
+
+    def load(self):
+        sys.path.insert(0, str(REPO_ROOT / "src/deep_research"))
+        from coalescer import ResearchCoalescer
+        self.coalescer = ResearchCoalescer()
+
+    async def run(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        if not inputs.get("query"):
+            raise ValueError("deep_research needs a 'query'")
+        # Each flight has its own ResearchManager, so concurrent jobs' metrics stay apart
+        subscription = self.coalescer.subscribe(inputs["query"])
+        updates: List[str] = []
+        async for chunk in subscription:
+            updates.append(chunk)
+        return {
+            "status": "success",
+            "report": updates[-1] if updates else "",
+            "updates": updates[:-1],
+            "report_data": subscription.report.model_dump() if subscription.report else None,
+            "metrics": subscription.metrics,
+        }
+
+
+class StockPickerPipeline(WarmPipeline):
+    """ParallelStockPicker over one StockPicker, its memory stores, pick index and run history"""
+    name = "stock_picker"
+    project = "src/crewExp/stock_picker"
+
+    def load(self):
+        from stock_picker.crew import StockPicker
+        from stock_picker.parallel import ParallelStockPicker
+        from stock_picker.storage.pick_index import PickIndex
+        self.runner = ParallelStockPicker(StockPicker(), pick_index=PickIndex())
+
+    async def run(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        result = await self.runner.run({
+            "sector": inputs.get("sector", "Technology"),
+            "current_date": str(datetime.now()),
+        })
+        return {
+            "status": "success",
+            "run_id": result.run_id,
+            "pick": result.pick.model_dump() if result.pick else None,
+            "trending": [c.ticker for c in result.trending.companies],
+            "skipped": result.skipped,
+            "failed": result.failed,
+            "timings": result.timings,
+        }
+
+
+class FinancialResearcherPipeline(WarmPipeline):
+    """ResearchCrew runs, full or incremental, with crew_common's pools kept open"""
+    name = "financial_researcher"
+    project = "src/crewExp/financial_researcher"
+
+    def load(self):
+        from crew_common import enable_crew_tracing, get_knowledge_index
+        from financial_researcher.crew import ResearchCrew
+        from financial_researcher.refresh import ReportRefresher
+        # Crews are built per job; set up what they share once here
+        enable_crew_tracing()
+        get_knowledge_index()
+        self.crew_class = ResearchCrew
+        self.refresher_class = ReportRefresher
+
+    async def run(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        company = inputs.get("company")
+        if not company:
+            raise ValueError("financial_researcher needs a 'company'")
+        slug = re.sub(r"[^a-z0-9]+", "-", company.lower()).strip("-") or "company"
+        report_path = str(Path(inputs.get("output_dir", "output/daemon")) / f"{slug}.md")
+        if inputs.get("incremental"):
+            outcome = await self.refresher_class(company, report_path=report_path).run()
+            return {"status": "success", **outcome}
+        result = await self.crew_class(report_path=report_path).crew().kickoff_async(inputs={"company": company})
+        return {"status": "success", "report": report_path, "raw": result.raw}
+
+
+WARM_PIPELINES: Dict[str, type] = {p.name: p for p in [
+    SalesAgentPipeline,
+    DeepResearchPipeline,
+    StockPickerPipeline,
+    FinancialResearcherPipeline,
+]}
+
+
+def load_pipeline(name: str) -> WarmPipeline:
+    pipeline = WARM_PIPELINES[name]()
+    pipeline.load()
+    return pipeline
@@ -1,4 +1,133 @@
+import argparse
+import json
+import logging
+import os
+import sys
+
+
+def run_queue_command(args: argparse.Namespace):
+    from ai_lab.jobqueue import DEAD, PRIORITIES, JobQueue, QueueWorker, wait_for
+    queue = JobQueue()
+    if args.command == "enqueue":
+        try:
+            job_id = queue.enqueue(
+                args.pipeline,
+                json.loads(args.input),
+                priority=PRIORITIES[args.priority],
+                max_attempts=args.max_attempts,
+            )
+        except ValueError as e:
+            print(json.dumps({"status": "error", "message": str(e)}, indent=2))
+            sys.exit(1)
+        job = wait_for(queue, job_id) if args.wait else queue.get(job_id)
+        print(json.dumps(job, indent=2, default=str))
+        if job["status"] == DEAD:
+            sys.exit(1)
+    elif args.command == "worker":
+        import asyncio
+        logging.basicConfig(
+            level=os.getenv('LOG_LEVEL', 'INFO'),
+            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        )
+        pipelines = [p.strip() for p in args.pipelines.split(",")] if args.pipelines else None
+        try:
+            asyncio.run(QueueWorker(queue, pipelines).run(stop_when_idle=args.until_empty))
+        except KeyboardInterrupt:
+            pass
+    elif args.command == "queue":
+        print(json.dumps(queue.stats(), indent=2))
+    elif args.command == "dead":
+        for job in queue.dead_letters():
+            print(f"{job['id']}  {job['pipeline']:<20} attempts={job['attempts']}  {job['last_error']}")
+    elif args.command == "requeue":
+        if not queue.requeue(args.job_id):
+            print(f"{args.job_id} is not in the dead-letter queue")
+            sys.exit(1)
+        print(f"Requeued {args.job_id}")
+
+
 def main():
+    parser = argparse.ArgumentParser(prog="ai-lab")
+    sub = parser.add_subparsers(dest="command")
+
+    from ai_lab import bench
+    bench.add_arguments(sub.add_parser("bench", help="benchmark pipelines from recorded cassettes"))
+
+    serve = sub.add_parser("serve", help="run the warm worker daemon")
+    serve.add_argument("--preload", help="comma-separated pipelines to load at startup")
+    serve.add_argument("--port", type=int)
+
+    submit = sub.add_parser("submit", help="run a job on the daemon")
+    submit.add_argument("pipeline")
+    submit.add_argument("--input", default="{}", help="job input as JSON")
+    submit.add_argument("--no-wait", action="store_true", help="return the job id without waiting")
+
+    job = sub.add_parser("job", help="show a daemon job")
+    job.add_argument("job_id")
+    sub.add_parser("jobs", help="list recent daemon jobs")
+    sub.add_parser("health", help="show daemon status")
+    sub.add_parser("stop", help="shut the daemon down")
+
+    enqueue = sub.add_parser("enqueue", help="add a job to the durable queue")
+    enqueue.add_argument("pipeline")
+    enqueue.add_argument("--input", default="{}", help="job input as JSON")
+    enqueue.add_argument("--priority", default="normal", choices=["interactive", "normal", "batch"])
+    enqueue.add_argument("--max-attempts", type=int)
+    enqueue.add_argument("--wait", action="store_true", help="wait for the job to finish")
+
+    worker = sub.add_parser("worker", help="run jobs from the durable queue")
+    worker.add_argument("--pipelines", help="comma-separated pipelines this worker takes (default: all)")
+    worker.add_argument("--until-empty", action="store_true", help="exit once the queue is drained")
+
+    sub.add_parser("queue", help="queue counts per pipeline")
+    sub.add_parser("dead", help="list dead-lettered jobs")
+    requeue = sub.add_parser("requeue", help="retry a dead-lettered job")
+    requeue.add_argument("job_id")
+
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        sys.exit(bench.run_bench(
+            args.pipelines,
+            record=args.record,
+            timing=args.timing,
+            repeat=args.repeat,
+            allocs=not args.no_allocs,
+            baseline=args.baseline,
+        ))
+    if args.command == "serve":
+        from ai_lab.daemon import DaemonConfig, serve as serve_daemon
+        logging.basicConfig(
+            level=os.getenv('LOG_LEVEL', 'INFO'),
+            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        )
+        config = DaemonConfig.from_env()
+        if args.preload:
+            config.preload = [name.strip() for name in args.preload.split(",") if name.strip()]
+        if args.port:
+            config.port = args.port
+        serve_daemon(config)
+        return
+    if args.command in ("enqueue", "worker", "queue", "dead", "requeue"):
+        run_queue_command(args)
+        return
+    if args.command in ("submit", "job", "jobs", "health", "stop"):
+        from ai_lab.daemon import DaemonClient
+        client = DaemonClient()
+        if args.command == "submit":
+            result = client.submit(args.pipeline, json.loads(args.input), wait=not args.no_wait)
+        elif args.command == "job":
+            result = client.job(args.job_id)
+        elif args.command == "jobs":
+            result = client.jobs()
+        elif args.command == "health":
+            result = client.health()
+        else:
+            result = client.shutdown()
+        print(json.dumps(result, indent=2, default=str))
+        if isinstance(result, dict) and result.get("status") in ("failed", "error"):
+            sys.exit(1)
+        return
     print("Hello from ai-lab!")
 
 
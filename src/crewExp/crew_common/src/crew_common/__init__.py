@@ -0,0 +1,43 @@
+from crew_common.async_tool import AsyncBaseTool, ToolMetrics, tool_metrics
+from crew_common.knowledge import (
+    KnowledgeIndex,
+    KnowledgeSearchTool,
+    build_knowledge_index,
+    get_knowledge_index,
+)
+from crew_common.runtime import (
+    HttpClientConfig,
+    HttpRequestError,
+    get_http_client,
+    get_loop,
+    on_tool_loop,
+    request,
+    request_json,
+    run_async,
+)
+from crew_common.serper_cache import CachedSerperDevTool, SerperCache, get_serper_cache
+from crew_common.tracing import CrewTraceListener, enable_crew_tracing, trace_span
+
+__all__ = [
+    "AsyncBaseTool",
+    "CachedSerperDevTool",
+    "CrewTraceListener",
+    "HttpClientConfig",
+    "HttpRequestError",
+    "KnowledgeIndex",
+    "KnowledgeSearchTool",
+    "SerperCache",
+    "ToolMetrics",
+    "build_knowledge_index",
+    "enable_crew_tracing",
+    "get_http_client",
+    "get_knowledge_index",
+    "get_loop",
+    "get_serper_cache",
+    "on_tool_loop",
+    "request",
+    "request_json",
+    "run_async",
+    "tool_metrics",
+    "trace_span",
+]
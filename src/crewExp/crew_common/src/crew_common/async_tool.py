@@ -0,0 +1,104 @@
+"""
+Async-capable base class for crewAI tools.
+
+Subclasses implement `async def _arun(...)`. The synchronous `_run` that crewAI
+calls schedules it on the shared tool loop, so the crew's thread only waits on
+a future while the I/O itself is multiplexed with every other tool call.
+Every call gets a timeout, retries on transient errors, and its latency
+recorded in `tool_metrics`. HTTP errors are retried in exactly one layer:
+`crew_common.request` retries 429/5xx and transport errors itself, so an
+`HttpRequestError` reaching the tool is final.
+"""
+
+from abc import abstractmethod
+from typing import Any, ClassVar, Dict, List, Tuple, Type
+import asyncio
+import logging
+import threading
+import time
+
+import httpx
+from crewai.tools import BaseTool
+
+from crew_common.runtime import run_async
+
+logger = logging.getLogger(__name__)
+
+
+class ToolMetrics:
+    """Per-tool call counts, failures and latency for this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples: Dict[str, List[float]] = {}
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def record(self, tool: str, seconds: float, outcome: str, retries: int = 0):
+        with self._lock:
+            self._samples.setdefault(tool, []).append(seconds)
+            counters = self._counters.setdefault(tool, {"ok": 0, "error": 0, "timeout": 0, "retries": 0})
+            counters[outcome] += 1
+            counters["retries"] += retries
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            samples = {tool: sorted(values) for tool, values in self._samples.items()}
+            counters = {tool: dict(c) for tool, c in self._counters.items()}
+        return {
+            tool: {
+                **counters[tool],
+                "avg_ms": round(sum(values) / len(values) * 1000, 1),
+                "p95_ms": round(values[min(len(values) - 1, int(len(values) * 0.95))] * 1000, 1),
+                "max_ms": round(values[-1] * 1000, 1),
+            }
+            for tool, values in samples.items()
+        }
+
+
+tool_metrics = ToolMetrics()
+
+
+def is_transient(error: BaseException) -> bool:
+    """Errors worth retrying at the tool level: timeouts and dropped connections.
+
+    HttpRequestError is not among them; request() already retried it.
+    """
+    return isinstance(error, (asyncio.TimeoutError, httpx.TransportError))
+
+
+class AsyncBaseTool(BaseTool):
+    """BaseTool whose work is a coroutine run on the shared tool loop"""
+
+    timeout: float = 60.0
+    max_retries: int = 1
+    retry_backoff: float = 0.5
+    retry_on: ClassVar[Tuple[Type[BaseException], ...]] = ()
+
+    @abstractmethod
+    async def _arun(self, *args: Any, **kwargs: Any) -> Any:
+        """Here goes the actual (async) implementation of the tool."""
+
+    def _should_retry(self, error: BaseException) -> bool:
+        return is_transient(error) or (bool(self.retry_on) and isinstance(error, self.retry_on))
+
+    async def arun(self, *args: Any, **kwargs: Any) -> Any:
+        """Run `_arun` with a per-attempt timeout, retries and timing"""
+        started = time.perf_counter()
+        attempt = 0
+        while True:
+            try:
+                result = await asyncio.wait_for(self._arun(*args, **kwargs), self.timeout)
+                tool_metrics.record(self.name, time.perf_counter() - started, "ok", attempt)
+                return result
+            except Exception as e:
+                if attempt < self.max_retries and self._should_retry(e):
+                    attempt += 1
+                    logger.info(f"Retrying tool '{self.name}' after {type(e).__name__} (attempt {attempt})")
+                    await asyncio.sleep(self.retry_backoff * (2 ** (attempt - 1)))
+                    continue
+                outcome = "timeout" if isinstance(e, asyncio.TimeoutError) else "error"
+                tool_metrics.record(self.name, time.perf_counter() - started, outcome, attempt)
+                raise
+
+    def _run(self, *args: Any, **kwargs: Any) -> Any:
+        return run_async(self.arun(*args, **kwargs))
@@ -0,0 +1,403 @@
+"""
+Prebuilt, memory-mapped vector index over a crew's knowledge/ files.
+
+`build_knowledge_index()` chunks and embeds the files once and writes:
+
+- `vectors.npy`: normalized float32 chunk embeddings
+- `texts.bin` and `offsets.npy`: the chunk texts
+- `manifest.json`: per-file content hashes and the chunk hashes of each file
+
+A rebuild embeds only chunks whose hash is not already in the index, so
+editing one document costs one document's embeddings. Loading maps the
+arrays instead of reading them, so startup cost does not grow with the
+knowledge base; queries embed the question and take a dot product locally.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Type
+import argparse
+import bisect
+import hashlib
+import json
+import logging
+import mmap
+import os
+import shutil
+import sys
+import threading
+import time
+
+import numpy as np
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+
+logger = logging.getLogger(__name__)
+
+OPENAI = "openai"
+LOCAL = "local"
+LOCAL_MODEL = "all-MiniLM-L6-v2"
+INDEX_VERSION = 1
+TEXT_SUFFIXES = {".txt", ".md", ".markdown", ".rst", ".csv", ".json", ".yaml", ".yml", ".html"}
+
+# OpenAI accepts up to 2048 inputs per embeddings request
+MAX_BATCH = 2048
+
+
+@dataclass
+class KnowledgeIndexConfig:
+    """Source directory, index location, embedder and chunking for the knowledge index"""
+    source_dir: str = "knowledge"
+    index_dir: str = "./memory/knowledge_index"
+    backend: str = OPENAI
+    model: str = "text-embedding-3-small"
+    chunk_size: int = 1000
+    chunk_overlap: int = 150
+
+    @classmethod
+    def from_env(cls) -> 'KnowledgeIndexConfig':
+        """Create config from environment variables"""
+        backend = os.getenv("CREW_KNOWLEDGE_BACKEND", os.getenv("MEMORY_EMBEDDING_BACKEND", OPENAI)).lower()
+        if backend not in (OPENAI, LOCAL):
+            raise ValueError(f"Invalid CREW_KNOWLEDGE_BACKEND: {backend} (expected openai or local)")
+        default_model = LOCAL_MODEL if backend == LOCAL else "text-embedding-3-small"
+        return cls(
+            source_dir=os.getenv("CREW_KNOWLEDGE_DIR", "knowledge"),
+            index_dir=os.getenv("CREW_KNOWLEDGE_INDEX", "./memory/knowledge_index"),
+            backend=backend,
+            model=os.getenv("CREW_KNOWLEDGE_MODEL", default_model),
+            chunk_size=int(os.getenv("CREW_KNOWLEDGE_CHUNK_SIZE", "1000")),
+            chunk_overlap=int(os.getenv("CREW_KNOWLEDGE_CHUNK_OVERLAP", "150")),
+        )
+
+    @property
+    def model_id(self) -> str:
+        return f"{self.backend}:{self.model}"
+
+
+class Embedder:
+    """Batched embeddings from OpenAI or Chroma's bundled local model"""
+
+    def __init__(self, config: KnowledgeIndexConfig):
+        self.config = config
+        self._backend = None
+        self.calls = 0
+
+    def __call__(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        if self.config.backend == LOCAL:
+            if self._backend is None:
+                from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+                self._backend = DefaultEmbeddingFunction()
+            self.calls += 1
+            return np.asarray(self._backend(texts), dtype=np.float32)
+
+        if self._backend is None:
+            from openai import OpenAI
+            self._backend = OpenAI()
+        vectors: List[List[float]] = []
+        for start in range(0, len(texts), MAX_BATCH):
+            response = self._backend.embeddings.create(model=self.config.model, input=texts[start:start + MAX_BATCH])
+            vectors.extend(item.embedding for item in sorted(response.data, key=lambda d: d.index))
+            self.calls += 1
+        return np.asarray(vectors, dtype=np.float32)
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def chunk_text(text: str, size: int, overlap: int) -> List[str]:
+    """Windows of about `size` characters, cut at whitespace, overlapping by `overlap`"""
+    text = text.strip()
+    if len(text) <= size:
+        return [text] if text else []
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + size, len(text))
+        if end < len(text):
+            cut = max(text.rfind("\n", start, end), text.rfind(" ", start, end))
+            if cut > start + size // 2:
+                end = cut
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        if end >= len(text):
+            break
+        start = max(end - overlap, start + 1)
+    return chunks
+
+
+def chunk_hash(model_id: str, text: str) -> str:
+    return hashlib.sha256(f"{model_id}\0{text}".encode("utf-8")).hexdigest()
+
+
+def source_files(source_dir: Path) -> List[Path]:
+    return sorted(
+        p for p in source_dir.rglob("*")
+        if p.is_file() and p.suffix.lower() in TEXT_SUFFIXES
+        and not any(part.startswith(".") for part in p.relative_to(source_dir).parts)
+    )
+
+
+class KnowledgeIndex:
+    """A built index, memory-mapped for querying"""
+
+    def __init__(self, index_dir: Path, manifest: Dict[str, Any]):
+        self.index_dir = index_dir
+        self.manifest = manifest
+        self.vectors = np.load(index_dir / "vectors.npy", mmap_mode="r")
+        self.offsets = np.load(index_dir / "offsets.npy", mmap_mode="r")
+        with open(index_dir / "texts.bin", "rb") as f:
+            self._texts = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b""
+        files = sorted(manifest["files"].items(), key=lambda item: item[1]["start"])
+        self._file_starts = [meta["start"] for _, meta in files]
+        self._file_names = [name for name, _ in files]
+        self._embedder: Optional[Embedder] = None
+        self._query_cache: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, index_dir: str) -> Optional['KnowledgeIndex']:
+        path = Path(index_dir)
+        manifest_path = path / "manifest.json"
+        if not manifest_path.exists():
+            return None
+        manifest = json.loads(manifest_path.read_text())
+        if manifest.get("version") != INDEX_VERSION:
+            return None
+        return cls(path, manifest)
+
+    def __len__(self) -> int:
+        return int(self.vectors.shape[0])
+
+    def text(self, row: int) -> str:
+        return bytes(self._texts[int(self.offsets[row]):int(self.offsets[row + 1])]).decode("utf-8")
+
+    def source(self, row: int) -> str:
+        return self._file_names[bisect.bisect_right(self._file_starts, row) - 1]
+
+    def chunk_rows(self) -> Dict[str, int]:
+        """chunk hash -> row, for reusing embeddings on rebuild"""
+        rows = {}
+        for meta in self.manifest["files"].values():
+            for i, digest in enumerate(meta["chunks"]):
+                rows[digest] = meta["start"] + i
+        return rows
+
+    def stale(self, source_dir: str) -> bool:
+        """Cheap check: has any source file's size or mtime changed, or files come and gone?"""
+        root = Path(source_dir)
+        current = {str(p.relative_to(root)): p.stat() for p in source_files(root)} if root.exists() else {}
+        if set(current) != set(self.manifest["files"]):
+            return True
+        return any(
+            stat.st_size != self.manifest["files"][name]["size"] or stat.st_mtime != self.manifest["files"][name]["mtime"]
+            for name, stat in current.items()
+        )
+
+    def search(self, query: str, k: int = 4, min_score: float = 0.0) -> List[Dict[str, Any]]:
+        """Top-k chunks by cosine similarity to the query"""
+        if not len(self) or not query.strip():
+            return []
+        with self._lock:
+            vector = self._query_cache.get(query)
+            if vector is None:
+                if self._embedder is None:
+                    config = KnowledgeIndexConfig.from_env()
+                    config.backend, config.model = self.manifest["model_id"].split(":", 1)
+                    self._embedder = Embedder(config)
+                vector = normalize(self._embedder([query]))[0]
+                if len(self._query_cache) >= 256:
+                    self._query_cache.pop(next(iter(self._query_cache)))
+                self._query_cache[query] = vector
+        scores = self.vectors @ vector
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [
+            {"source": self.source(int(row)), "score": round(float(scores[row]), 4), "text": self.text(int(row))}
+            for row in top if scores[row] >= min_score
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "files": len(self.manifest["files"]),
+            "chunks": len(self),
+            "dims": self.manifest["dims"],
+            "model": self.manifest["model_id"],
+            "built_at": self.manifest["built_at"],
+            "bytes": sum((self.index_dir / name).stat().st_size for name in ("vectors.npy", "texts.bin", "offsets.npy")),
+        }
+
+
+def build_knowledge_index(config: Optional[KnowledgeIndexConfig] = None, force: bool = False) -> Dict[str, Any]:
+    """Chunk and embed the source files, reusing every embedding the current index already has"""
+    config = config or KnowledgeIndexConfig.from_env()
+    started = time.perf_counter()
+    root = Path(config.source_dir)
+    index_dir = Path(config.index_dir)
+    if not root.is_dir():
+        raise FileNotFoundError(f"Knowledge directory not found: {root}")
+
+    old = None if force else KnowledgeIndex.load(str(index_dir))
+    settings = {"model_id": config.model_id, "chunk_size": config.chunk_size, "chunk_overlap": config.chunk_overlap}
+    if old is not None and any(old.manifest.get(key) != value for key, value in settings.items()):
+        logger.info("Knowledge index settings changed; rebuilding from scratch")
+        old = None
+    old_files = old.manifest["files"] if old is not None else {}
+    old_rows = old.chunk_rows() if old is not None else {}
+
+    files: Dict[str, Dict[str, Any]] = {}
+    chunks: List[Tuple[str, str]] = []
+    changed, unchanged = [], []
+    for path in source_files(root):
+        name = str(path.relative_to(root))
+        data = path.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        stat = path.stat()
+        previous = old_files.get(name)
+        if previous is not None and previous["sha256"] == digest:
+            texts = [old.text(previous["start"] + i) for i in range(len(previous["chunks"]))]
+            unchanged.append(name)
+        else:
+            texts = chunk_text(data.decode("utf-8", errors="replace"), config.chunk_size, config.chunk_overlap)
+            changed.append(name)
+        hashes = [chunk_hash(config.model_id, text) for text in texts]
+        files[name] = {"sha256": digest, "size": stat.st_size, "mtime": stat.st_mtime,
+                       "start": len(chunks), "chunks": hashes}
+        chunks.extend(zip(hashes, texts))
+    removed = sorted(set(old_files) - set(files))
+
+    report = {"files": len(files), "changed": changed, "removed": removed, "chunks": len(chunks)}
+    if old is not None and not changed and not removed:
+        if files != old_files:
+            # Same contents, new size/mtime (a checkout or touch): refresh the
+            # stat info so stale() stops flagging the index
+            manifest_path = index_dir / "manifest.json"
+            staged = manifest_path.with_name("manifest.json.tmp")
+            staged.write_text(json.dumps({**old.manifest, "files": files}))
+            os.replace(staged, manifest_path)
+            _indexes.pop(config.index_dir, None)
+        return {**report, "embedded": 0, "reused": len(chunks), "up_to_date": True,
+                "elapsed": round(time.perf_counter() - started, 2)}
+
+    # Embed each distinct new chunk once; everything else comes from the old index
+    missing: Dict[str, str] = {}
+    for digest, text in chunks:
+        if digest not in old_rows:
+            missing.setdefault(digest, text)
+    embedder = Embedder(config)
+    new_vectors = dict(zip(missing, normalize(embedder(list(missing.values()))))) if missing else {}
+    dims = old.manifest["dims"] if old is not None and len(old) else 0
+    if new_vectors:
+        dims = len(next(iter(new_vectors.values())))
+    matrix = np.zeros((len(chunks), dims), dtype=np.float32)
+    for row, (digest, _) in enumerate(chunks):
+        matrix[row] = new_vectors[digest] if digest in new_vectors else old.vectors[old_rows[digest]]
+
+    encoded = [text.encode("utf-8") for _, text in chunks]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(b) for b in encoded])
+    manifest = {"version": INDEX_VERSION, **settings, "dims": dims, "built_at": time.time(), "files": files}
+
+    # Write a complete new index beside the old one, then swap directories
+    staging = index_dir.with_name(index_dir.name + ".building")
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+    np.save(staging / "vectors.npy", matrix)
+    np.save(staging / "offsets.npy", offsets)
+    (staging / "texts.bin").write_bytes(b"".join(encoded))
+    (staging / "manifest.json").write_text(json.dumps(manifest))
+    retired = index_dir.with_name(index_dir.name + ".old")
+    shutil.rmtree(retired, ignore_errors=True)
+    if index_dir.exists():
+        index_dir.rename(retired)
+    staging.rename(index_dir)
+    shutil.rmtree(retired, ignore_errors=True)
+    _indexes.pop(config.index_dir, None)
+
+    return {**report, "embedded": len(missing), "reused": len(chunks) - sum(1 for d, _ in chunks if d in missing),
+            "provider_calls": embedder.calls, "up_to_date": False,
+            "elapsed": round(time.perf_counter() - started, 2)}
+
+
+_indexes: Dict[str, Optional[KnowledgeIndex]] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_knowledge_index(config: Optional[KnowledgeIndexConfig] = None) -> Optional[KnowledgeIndex]:
+    """The process-wide index for this project, or None if it has not been built.
+
+    Loaded once per index directory. Loading reads the manifest and maps the
+    arrays without reading them; the staleness check stats each file under
+    knowledge/. Crews call it when constructed so a missing or stale index is
+    reported before the first search.
+    """
+    config = config or KnowledgeIndexConfig.from_env()
+    with _indexes_lock:
+        if config.index_dir not in _indexes:
+            index = KnowledgeIndex.load(config.index_dir)
+            if index is None:
+                logger.info(f"No knowledge index at {config.index_dir}; run `knowledge build` to create it")
+            elif index.stale(config.source_dir):
+                logger.warning(f"Knowledge index at {config.index_dir} is older than {config.source_dir}; rebuild it")
+            _indexes[config.index_dir] = index
+        return _indexes[config.index_dir]
+
+
+class KnowledgeSearchInput(BaseModel):
+    """Input for KnowledgeSearchTool"""
+    query: str = Field(..., description="What to look up in the knowledge base.")
+
+
+class KnowledgeSearchTool(BaseTool):
+    name: str = "Search knowledge base"
+    description: str = (
+        "Looks up the project's knowledge documents (user preferences and reference notes) "
+        "and returns the most relevant passages."
+    )
+    args_schema: Type[BaseModel] = KnowledgeSearchInput
+    top_k: int = 4
+
+    def _run(self, query: str) -> str:
+        index = get_knowledge_index()
+        if index is None:
+            return json.dumps({"status": "error", "message": "knowledge index has not been built"})
+        try:
+            return json.dumps({"results": index.search(query, k=self.top_k)})
+        except Exception as e:
+            logger.error(f"Knowledge search failed: {str(e)}")
+            return json.dumps({"status": "error", "message": str(e)})
+
+
+def main(argv: Optional[List[str]] = None):
+    """knowledge build [--force] | knowledge query TEXT [-k N] | knowledge stats"""
+    parser = argparse.ArgumentParser(prog="knowledge")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="chunk and embed knowledge/ into the index")
+    build.add_argument("--force", action="store_true", help="re-embed everything")
+    query = sub.add_parser("query", help="search the index")
+    query.add_argument("text")
+    query.add_argument("-k", type=int, default=4)
+    sub.add_parser("stats", help="describe the index")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    if args.command == "build":
+        print(json.dumps(build_knowledge_index(force=args.force), indent=2))
+        return
+    index = get_knowledge_index()
+    if index is None:
+        print("No knowledge index; run `knowledge build` first")
+        sys.exit(1)
+    if args.command == "stats":
+        print(json.dumps(index.stats(), indent=2))
+    else:
+        print(json.dumps(index.search(args.text, k=args.k), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Shared async runtime for crew tools.
+
+crewAI calls tools synchronously from each crew's thread. Instead of each call
+holding a blocking socket on its own thread, tool coroutines are scheduled on
+one background event loop and share a single pooled httpx client, so many
+concurrent crews multiplex their HTTP traffic over a bounded set of
+connections.
+"""
+
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from typing import Any, Awaitable, Dict, Optional
+import asyncio
+import atexit
+import logging
+import os
+import random
+import threading
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+@dataclass
+class HttpClientConfig:
+    """Pool size and timeouts for the shared HTTP client"""
+    max_connections: int = 32
+    max_keepalive: int = 16
+    keepalive_expiry: float = 30.0
+    connect_timeout: float = 5.0
+    read_timeout: float = 20.0
+    retries: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 30.0
+
+    @classmethod
+    def from_env(cls) -> 'HttpClientConfig':
+        """Create config from environment variables"""
+        return cls(
+            max_connections=int(os.getenv("CREW_HTTP_MAX_CONNECTIONS", "32")),
+            max_keepalive=int(os.getenv("CREW_HTTP_MAX_KEEPALIVE", "16")),
+            keepalive_expiry=float(os.getenv("CREW_HTTP_KEEPALIVE_EXPIRY", "30")),
+            connect_timeout=float(os.getenv("CREW_HTTP_CONNECT_TIMEOUT", "5")),
+            read_timeout=float(os.getenv("CREW_HTTP_READ_TIMEOUT", "20")),
+            retries=int(os.getenv("CREW_HTTP_RETRIES", "3")),
+        )
+
+
+class HttpRequestError(Exception):
+    """A request that failed after all retries, or with a non-retryable status"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+_lock = threading.Lock()
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_thread: Optional[threading.Thread] = None
+_client: Optional[httpx.AsyncClient] = None
+_config: Optional[HttpClientConfig] = None
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """The process-wide background loop that runs tool coroutines"""
+    global _loop, _thread
+    with _lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            _thread = threading.Thread(target=_loop.run_forever, name="crew-tools-loop", daemon=True)
+            _thread.start()
+            atexit.register(shutdown)
+        return _loop
+
+
+def run_async(coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+    """Run a coroutine on the background loop and wait for its result.
+
+    Safe to call from any thread except the loop's own (await there instead).
+    """
+    loop = get_loop()
+    if threading.current_thread() is _thread:
+        raise RuntimeError("run_async called from the tool loop; await the coroutine instead")
+    future = asyncio.run_coroutine_threadsafe(coro, loop)
+    try:
+        return future.result(timeout)
+    except FutureTimeoutError:
+        future.cancel()
+        raise
+
+
+async def on_tool_loop(coro: Awaitable[Any]) -> Any:
+    """Await a coroutine on the background loop from a different event loop.
+
+    The shared client belongs to the background loop, so code running under
+    its own asyncio.run() must hop over to use it.
+    """
+    loop = get_loop()
+    if asyncio.get_running_loop() is loop:
+        return await coro
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+
+def get_http_config() -> HttpClientConfig:
+    global _config
+    if _config is None:
+        _config = HttpClientConfig.from_env()
+    return _config
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """The shared, pooled client; must be used from the background loop"""
+    global _client
+    if _client is None or _client.is_closed:
+        config = get_http_config()
+        _client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive,
+                keepalive_expiry=config.keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(config.read_timeout, connect=config.connect_timeout),
+        )
+    return _client
+
+
+def _retry_delay(attempt: int, response: Optional[httpx.Response]) -> float:
+    config = get_http_config()
+    if response is not None and response.headers.get("Retry-After"):
+        try:
+            return min(float(response.headers["Retry-After"]), config.backoff_max)
+        except ValueError:
+            pass
+    delay = min(config.backoff_base * (2 ** attempt), config.backoff_max)
+    return delay * (0.5 + random.random() / 2)
+
+
+async def request(method: str, url: str, retries: Optional[int] = None, **kwargs) -> httpx.Response:
+    """Send a request on the shared client, retrying 429/5xx and transport errors"""
+    retries = get_http_config().retries if retries is None else retries
+    client = get_http_client()
+    last_error = ""
+    for attempt in range(retries + 1):
+        response = None
+        try:
+            response = await client.request(method, url, **kwargs)
+            if response.status_code < 400:
+                return response
+            if response.status_code not in RETRY_STATUSES:
+                raise HttpRequestError(
+                    f"{method} {url} returned {response.status_code}: {response.text[:200]}",
+                    status_code=response.status_code,
+                )
+            last_error = f"status {response.status_code}"
+        except httpx.TransportError as e:
+            last_error = str(e) or type(e).__name__
+        if attempt < retries:
+            logger.debug(f"Retrying {method} {url} after {last_error} (attempt {attempt + 1})")
+            await asyncio.sleep(_retry_delay(attempt, response))
+    raise HttpRequestError(
+        f"{method} {url} failed after {retries + 1} attempts: {last_error}",
+        status_code=response.status_code if response is not None else None,
+    )
+
+
+async def request_json(method: str, url: str, **kwargs) -> Dict[str, Any]:
+    response = await request(method, url, **kwargs)
+    return response.json()
+
+
+def shutdown(timeout: float = 5.0):
+    """Close the shared client and stop the loop"""
+    global _client
+    if _loop is None or _loop.is_closed():
+        return
+    if _client is not None and not _client.is_closed:
+        try:
+            run_async(_client.aclose(), timeout)
+        except Exception as e:
+            logger.error(f"Failed to close shared HTTP client: {str(e)}")
+    _client = None
+    _loop.call_soon_threadsafe(_loop.stop)
+    if _thread is not None:
+        _thread.join(timeout)
@@ -0,0 +1,264 @@
+"""
+Cached, coalescing drop-in for crewai_tools.SerperDevTool.
+
+Raw Serper responses are stored in SQLite under a key built from the search
+type, result count, country/location/locale and a normalized query, so
+"Apple stock news" and "  apple   stock news " share one entry across agents,
+tasks, crews and runs. Hit/miss counts are kept in memory and added to the
+stored totals every `stats_flush_seconds`, on stats() and at exit.
+Concurrent identical queries in a process share one in-flight request.
+News results go stale faster than web results and get a shorter TTL.
+"""
+
+from concurrent.futures import Future
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+import atexit
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+from crewai_tools import SerperDevTool
+
+logger = logging.getLogger(__name__)
+
+HIT = "hits"
+MISS = "misses"
+COALESCED = "coalesced"
+ERROR = "errors"
+
+
+@dataclass
+class SerperCacheConfig:
+    """Location and expiry settings for the shared search cache"""
+    db_path: str = "~/.cache/crew_common/serper_cache.db"
+    search_ttl_hours: float = 24.0
+    news_ttl_hours: float = 1.0
+    stats_flush_seconds: float = 60.0
+    enabled: bool = True
+
+    @classmethod
+    def from_env(cls) -> 'SerperCacheConfig':
+        """Create config from environment variables"""
+        return cls(
+            db_path=os.getenv("SERPER_CACHE_PATH", "~/.cache/crew_common/serper_cache.db"),
+            search_ttl_hours=float(os.getenv("SERPER_CACHE_SEARCH_TTL_HOURS", "24")),
+            news_ttl_hours=float(os.getenv("SERPER_CACHE_NEWS_TTL_HOURS", "1")),
+            stats_flush_seconds=float(os.getenv("SERPER_CACHE_STATS_FLUSH_SECONDS", "60")),
+            enabled=os.getenv("SERPER_CACHE_DISABLED", "").lower() not in ("1", "true", "yes"),
+        )
+
+    def ttl_seconds(self, search_type: str) -> float:
+        hours = self.news_ttl_hours if search_type == "news" else self.search_ttl_hours
+        return hours * 3600
+
+
+def normalize_query(query: str) -> str:
+    """Case, width and whitespace-insensitive form of a search query"""
+    query = unicodedata.normalize("NFKC", query or "").casefold()
+    query = re.sub(r"\s+", " ", query).strip()
+    return query.strip(" \"'?!.,;:")
+
+
+class SerperCache:
+    """SQLite store of raw Serper responses plus hit/miss counters"""
+
+    def __init__(self, config: Optional[SerperCacheConfig] = None):
+        self.config = config or SerperCacheConfig.from_env()
+        self.db_path = os.path.expanduser(self.config.db_path)
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._session_stats = {HIT: 0, MISS: 0, COALESCED: 0, ERROR: 0}
+        self._unflushed: Dict[str, int] = {}
+        self._flushed_at = time.monotonic()
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS serper_results (
+                    key TEXT PRIMARY KEY,
+                    search_type TEXT NOT NULL,
+                    query TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_serper_expires ON serper_results (expires_at)"
+            )
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS serper_stats (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+        atexit.register(self.flush_stats)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @staticmethod
+    def key(query: str, search_type: str, n_results: int, region: str = "") -> str:
+        """`region` is the tool's country/location/locale, which change the results"""
+        raw = f"{search_type}\0{n_results}\0{region}\0{normalize_query(query)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _record(self, name: str):
+        with self._lock:
+            self._session_stats[name] += 1
+            self._unflushed[name] = self._unflushed.get(name, 0) + 1
+            due = time.monotonic() - self._flushed_at >= self.config.stats_flush_seconds
+        if due:
+            self.flush_stats()
+
+    def flush_stats(self):
+        """Add the counts gathered since the last flush to the all-time totals"""
+        with self._lock:
+            pending, self._unflushed = self._unflushed, {}
+            self._flushed_at = time.monotonic()
+        if not pending:
+            return
+        try:
+            with self._connect() as conn:
+                conn.executemany(
+                    "INSERT INTO serper_stats (name, value) VALUES (?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                    list(pending.items()),
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Failed to persist search cache stats: {str(e)}")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT payload FROM serper_results WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key: str, query: str, search_type: str, payload: Dict[str, Any]):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO serper_results "
+                "(key, search_type, query, payload, fetched_at, expires_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, search_type, normalize_query(query), json.dumps(payload),
+                 now, now + self.config.ttl_seconds(search_type)),
+            )
+
+    def fetch(self, query: str, search_type: str, n_results: int, request,
+              fresh: bool = False, region: str = "") -> Dict[str, Any]:
+        """Return a cached response, join an identical in-flight request, or make it.
+
+        `fresh` always makes the request (storing the result for later
+        lookups), for callers that need to see whether results changed.
+        """
+        if not self.config.enabled:
+            return request()
+        key = self.key(query, search_type, n_results, region)
+        if fresh:
+            self._record(MISS)
+            try:
+                payload = request()
+            except Exception:
+                self._record(ERROR)
+                raise
+            self.put(key, query, search_type, payload)
+            return payload
+        cached = self.get(key)
+        if cached is not None:
+            self._record(HIT)
+            return cached
+
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+        if not leader:
+            self._record(COALESCED)
+            return future.result()
+
+        try:
+            # A previous leader may have stored it since our lookup
+            payload = self.get(key)
+            if payload is not None:
+                self._record(HIT)
+                future.set_result(payload)
+                return payload
+            self._record(MISS)
+            payload = request()
+            self.put(key, query, search_type, payload)
+            future.set_result(payload)
+            return payload
+        except Exception as e:
+            self._record(ERROR)
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def purge_expired(self) -> int:
+        with self._connect() as conn:
+            return conn.execute(
+                "DELETE FROM serper_results WHERE expires_at <= ?", (time.time(),)
+            ).rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss/coalesced counts for this process and all time"""
+        self.flush_stats()
+        with self._connect() as conn:
+            totals = dict(conn.execute("SELECT name, value FROM serper_stats").fetchall())
+            entries = conn.execute("SELECT COUNT(*) FROM serper_results").fetchone()[0]
+
+        def _with_rate(counts: Dict[str, int]) -> Dict[str, Any]:
+            counts = {name: counts.get(name, 0) for name in (HIT, MISS, COALESCED, ERROR)}
+            lookups = counts[HIT] + counts[MISS] + counts[COALESCED]
+            saved = counts[HIT] + counts[COALESCED]
+            return {**counts, "hit_rate": round(saved / lookups, 3) if lookups else 0.0}
+
+        with self._lock:
+            session = dict(self._session_stats)
+        return {"session": _with_rate(session), "total": _with_rate(totals), "entries": entries}
+
+
+_cache_lock = threading.Lock()
+_cache: Optional[SerperCache] = None
+
+
+def get_serper_cache() -> SerperCache:
+    """Return the process-wide search cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SerperCache()
+        return _cache
+
+
+class CachedSerperDevTool(SerperDevTool):
+    """SerperDevTool whose API calls go through the shared search cache"""
+
+    def _region(self) -> str:
+        # Not every crewai_tools release has these fields
+        return "\0".join(str(getattr(self, name, None) or "") for name in ("country", "location", "locale"))
+
+    def _make_api_request(self, search_query: str, search_type: str, fresh: bool = False) -> dict:
+        return get_serper_cache().fetch(
+            search_query,
+            search_type.lower(),
+            self.n_results,
+            lambda: super(CachedSerperDevTool, self)._make_api_request(search_query, search_type),
+            fresh=fresh,
+            region=self._region(),
+        )
@@ -0,0 +1,229 @@
+"""
+Local span tracing for crewAI runs.
+
+A crewAI event listener turns crew, task, agent and LLM start/finish events
+into spans, plus one span per tool call, and `trace_span` times anything else
+(memory saves and searches). Spans go through the repo-level
+`ai_lab.tracing.sink`, the same writer and format as the Agents SDK traces,
+so one CLI reads both:
+
+    python -m ai_lab.tracing critical-path latest
+
+Open spans are tracked in a context variable, so spans nest per crew thread
+and a crew started under `trace_span` (or via kickoff_async from inside one)
+joins that trace.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+import logging
+import threading
+import time
+
+from crewai.utilities.events import (
+    AgentExecutionCompletedEvent,
+    AgentExecutionErrorEvent,
+    AgentExecutionStartedEvent,
+    CrewKickoffCompletedEvent,
+    CrewKickoffFailedEvent,
+    CrewKickoffStartedEvent,
+    LLMCallCompletedEvent,
+    LLMCallFailedEvent,
+    LLMCallStartedEvent,
+    TaskCompletedEvent,
+    TaskFailedEvent,
+    TaskStartedEvent,
+    ToolUsageErrorEvent,
+    ToolUsageFinishedEvent,
+)
+from crewai.utilities.events.base_event_listener import BaseEventListener
+
+try:
+    from ai_lab.tracing.sink import AGENT, CREW, LLM, TASK, TOOL, SpanWriter, TraceConfig, get_writer, new_id, span_record
+except ImportError:
+    # The daemon and bench put the repo root on PYTHONPATH; a bare
+    # `crewai run` outside the lab has no span sink and traces nothing
+    get_writer = None
+    AGENT, CREW, LLM, TASK, TOOL = "agent", "crew", "llm", "task", "tool"
+
+logger = logging.getLogger(__name__)
+
+RUNTIME = "crewai"
+
+
+def _write(span: Dict[str, Any], ended_at: float, error: Optional[str] = None):
+    record = span_record(
+        span["trace_id"], span["span_id"], span["parent_id"], RUNTIME, span["kind"], span["name"],
+        span["started_at"], ended_at, error=error, attrs=span["attrs"],
+    )
+    try:
+        _writer.write(record)
+    except OSError as e:
+        logger.error(f"Failed to write local span: {str(e)}")
+
+
+_writer: Optional["SpanWriter"] = None
+_open_spans: ContextVar[Tuple[Dict[str, Any], ...]] = ContextVar("crew_open_spans", default=())
+
+
+def _new_span(kind: str, name: str, started_at: Optional[float] = None, **attrs) -> Dict[str, Any]:
+    stack = _open_spans.get()
+    parent = stack[-1] if stack else None
+    return {
+        "trace_id": parent["trace_id"] if parent else new_id(),
+        "span_id": new_id(),
+        "parent_id": parent["span_id"] if parent else None,
+        "kind": kind,
+        "name": name,
+        "started_at": started_at or time.time(),
+        "attrs": attrs,
+    }
+
+
+def open_span(kind: str, name: str, **attrs) -> Optional[Dict[str, Any]]:
+    """Start a span under the current one; pair with close_span"""
+    if _writer is None:
+        return None
+    span = _new_span(kind, name, **attrs)
+    _open_spans.set(_open_spans.get() + (span,))
+    return span
+
+
+def close_span(kind: str, error: Optional[str] = None, **attrs):
+    """End the innermost open span of this kind, and any left open inside it"""
+    stack = _open_spans.get()
+    if _writer is None or not stack:
+        return
+    index = next((i for i in range(len(stack) - 1, -1, -1) if stack[i]["kind"] == kind), None)
+    if index is None:
+        return
+    ended = time.time()
+    for inner in reversed(stack[index + 1:]):
+        _write(inner, ended, error="not closed")
+    span = stack[index]
+    span["attrs"].update(attrs)
+    _write(span, ended, error=error)
+    _open_spans.set(stack[:index])
+
+
+def record_span(kind: str, name: str, started_at: float, ended_at: float,
+                error: Optional[str] = None, **attrs):
+    """Write an already finished span under the current one"""
+    if _writer is not None:
+        _write(_new_span(kind, name, started_at=started_at, **attrs), ended_at, error=error)
+
+
+@contextmanager
+def trace_span(kind: str, name: str, **attrs) -> Iterator[Optional[Dict[str, Any]]]:
+    """Time a block as a span; a no-op while tracing is disabled"""
+    span = open_span(kind, name, **attrs)
+    if span is None:
+        yield None
+        return
+    try:
+        yield span
+    except BaseException as e:
+        close_span(kind, error=str(e) or type(e).__name__)
+        raise
+    close_span(kind)
+
+
+def _llm_name(source: Any) -> str:
+    return str(getattr(source, "model", None) or type(source).__name__)
+
+
+def _task_name(task: Any) -> str:
+    name = getattr(task, "name", None) or getattr(task, "description", None) or "task"
+    return str(name).strip().splitlines()[0][:80]
+
+
+class CrewTraceListener(BaseEventListener):
+    """Maps crewAI execution events onto local spans"""
+
+    def setup_listeners(self, crewai_event_bus):
+        @crewai_event_bus.on(CrewKickoffStartedEvent)
+        def on_crew_started(source, event):
+            open_span(CREW, event.crew_name or "crew", inputs=event.inputs)
+
+        @crewai_event_bus.on(CrewKickoffCompletedEvent)
+        def on_crew_completed(source, event):
+            usage = getattr(source, "usage_metrics", None)
+            close_span(CREW, total_tokens=getattr(usage, "total_tokens", None))
+
+        @crewai_event_bus.on(CrewKickoffFailedEvent)
+        def on_crew_failed(source, event):
+            close_span(CREW, error=event.error)
+
+        @crewai_event_bus.on(TaskStartedEvent)
+        def on_task_started(source, event):
+            open_span(TASK, _task_name(source))
+
+        @crewai_event_bus.on(TaskCompletedEvent)
+        def on_task_completed(source, event):
+            close_span(TASK)
+
+        @crewai_event_bus.on(TaskFailedEvent)
+        def on_task_failed(source, event):
+            close_span(TASK, error=event.error)
+
+        @crewai_event_bus.on(AgentExecutionStartedEvent)
+        def on_agent_started(source, event):
+            tools = [getattr(t, "name", str(t)) for t in event.tools or []]
+            open_span(AGENT, event.agent.role, tools=tools)
+
+        @crewai_event_bus.on(AgentExecutionCompletedEvent)
+        def on_agent_completed(source, event):
+            close_span(AGENT)
+
+        @crewai_event_bus.on(AgentExecutionErrorEvent)
+        def on_agent_error(source, event):
+            close_span(AGENT, error=event.error)
+
+        @crewai_event_bus.on(LLMCallStartedEvent)
+        def on_llm_started(source, event):
+            messages = event.messages if isinstance(event.messages, list) else [event.messages]
+            open_span(LLM, _llm_name(source), messages=len(messages))
+
+        @crewai_event_bus.on(LLMCallCompletedEvent)
+        def on_llm_completed(source, event):
+            close_span(LLM, call_type=getattr(event.call_type, "value", event.call_type))
+
+        @crewai_event_bus.on(LLMCallFailedEvent)
+        def on_llm_failed(source, event):
+            close_span(LLM, error=event.error)
+
+        # Tool calls only report when they end, with their own start time
+        @crewai_event_bus.on(ToolUsageFinishedEvent)
+        def on_tool_finished(source, event):
+            record_span(
+                TOOL, event.tool_name, event.started_at.timestamp(), event.finished_at.timestamp(),
+                args=event.tool_args, from_cache=event.from_cache, agent=event.agent_role,
+            )
+
+        @crewai_event_bus.on(ToolUsageErrorEvent)
+        def on_tool_error(source, event):
+            ended = event.timestamp.timestamp()
+            record_span(TOOL, event.tool_name, ended, ended, error=str(event.error),
+                        args=event.tool_args, agent=event.agent_role)
+
+
+_listener_lock = threading.Lock()
+_listener: Optional[CrewTraceListener] = None
+
+
+def enable_crew_tracing(config: Optional["TraceConfig"] = None) -> Optional[Path]:
+    """Register the crewAI listener once; returns the span file, or None if disabled"""
+    global _writer, _listener
+    if get_writer is None:
+        logger.info("ai_lab is not importable; crew tracing is off")
+        return None
+    config = config or TraceConfig.from_env()
+    if not config.enabled:
+        return None
+    with _listener_lock:
+        if _listener is None:
+            _writer = get_writer(RUNTIME, config)
+            _listener = CrewTraceListener()
+    return _writer.path
@@ -0,0 +1,185 @@
+"""
+Batch runner for ResearchCrew over a watchlist of companies.
+
+Companies run concurrently (bounded), each writing its own report. A manifest
+records status, attempts, timings and errors per company and is rewritten
+after every completion, so an interrupted or partially failed batch can be
+resumed: succeeded companies are skipped, failed ones retried.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import asyncio
+import contextvars
+import functools
+import json
+import logging
+import os
+import re
+import time
+
+from crew_common import get_serper_cache
+
+from financial_researcher.crew import ResearchCrew
+from financial_researcher.refresh import ReportRefresher
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+@dataclass
+class BatchConfig:
+    """Concurrency, output location and retry limits for a batch run"""
+    output_dir: str = "output/batch"
+    concurrency: int = 4
+    max_attempts: int = 3
+
+    @classmethod
+    def from_env(cls) -> 'BatchConfig':
+        """Create config from environment variables"""
+        return cls(
+            output_dir=os.getenv("RESEARCH_BATCH_OUTPUT", "output/batch"),
+            concurrency=int(os.getenv("RESEARCH_BATCH_CONCURRENCY", "4")),
+            max_attempts=int(os.getenv("RESEARCH_BATCH_MAX_ATTEMPTS", "3")),
+        )
+
+
+def slugify(company: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", company.lower()).strip("-") or "company"
+
+
+def load_watchlist(path: str) -> List[str]:
+    """One company per line; blank lines and # comments are ignored"""
+    companies = []
+    for line in Path(path).read_text().splitlines():
+        line = line.split("#", 1)[0].strip()
+        if line:
+            companies.append(line)
+    return companies
+
+
+class BatchRunner:
+    """Runs ResearchCrew per company and tracks progress in manifest.json"""
+
+    def __init__(self, config: Optional[BatchConfig] = None, incremental: bool = False):
+        self.config = config or BatchConfig.from_env()
+        # Incremental runs refresh only the changed sections of each report
+        self.incremental = incremental
+        self.output_dir = Path(self.config.output_dir)
+        self.reports_dir = self.output_dir / "reports"
+        self.manifest_path = self.output_dir / "manifest.json"
+        self.reports_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        if self.manifest_path.exists():
+            manifest = json.loads(self.manifest_path.read_text())
+            # Anything left "running" was interrupted mid-flight
+            for entry in manifest["companies"].values():
+                if entry["status"] == RUNNING:
+                    entry["status"] = FAILED
+                    entry["error"] = "interrupted"
+            return manifest
+        return {"created_at": datetime.now().isoformat(), "companies": {}}
+
+    def _save_manifest(self):
+        self.manifest["updated_at"] = datetime.now().isoformat()
+        tmp = self.manifest_path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(self.manifest, indent=2))
+        os.replace(tmp, self.manifest_path)
+
+    def _entry(self, company: str) -> Dict[str, Any]:
+        entries = self.manifest["companies"]
+        if company not in entries:
+            slug = slugify(company)
+            taken = {e["report"] for e in entries.values()}
+            report = str(self.reports_dir / f"{slug}.md")
+            suffix = 2
+            while report in taken:
+                report = str(self.reports_dir / f"{slug}-{suffix}.md")
+                suffix += 1
+            entries[company] = {"status": PENDING, "attempts": 0, "report": report}
+        return entries[company]
+
+    def select(self, companies: List[str], retry_failed: bool = True,
+               ignore_attempts: bool = False) -> List[str]:
+        """Companies that still need a run: new, pending, or failed with attempts left"""
+        selected = []
+        for company in dict.fromkeys(companies):
+            entry = self._entry(company)
+            if entry["status"] == SUCCEEDED:
+                continue
+            if entry["status"] == FAILED:
+                if not retry_failed:
+                    continue
+                if not ignore_attempts and entry["attempts"] >= self.config.max_attempts:
+                    continue
+            selected.append(company)
+        return selected
+
+    async def _run_one(self, company: str, semaphore: asyncio.Semaphore, executor: ThreadPoolExecutor):
+        async with semaphore:
+            entry = self._entry(company)
+            entry.update(status=RUNNING, started_at=datetime.now().isoformat(), error=None)
+            entry["attempts"] += 1
+            self._save_manifest()
+            started = time.perf_counter()
+            try:
+                if self.incremental:
+                    outcome = await ReportRefresher(company, report_path=entry["report"]).run()
+                    entry.update(refreshed=outcome["refreshed"], reused=outcome["reused"])
+                    if outcome["failed"]:
+                        raise RuntimeError(f"sections failed: {', '.join(outcome['failed'])}")
+                else:
+                    crew = ResearchCrew(report_path=entry["report"]).crew()
+                    # Like kickoff_async, but on the batch's own pool; the copied
+                    # context keeps the crew's spans under the caller's trace
+                    kickoff = functools.partial(contextvars.copy_context().run, crew.kickoff, inputs={"company": company})
+                    result = await asyncio.get_running_loop().run_in_executor(executor, kickoff)
+                    if result.token_usage:
+                        entry["total_tokens"] = result.token_usage.total_tokens
+                    await ReportRefresher(company, report_path=entry["report"]).seed()
+                entry["status"] = SUCCEEDED
+            except Exception as e:
+                logger.error(f"Research failed for {company}: {str(e)}")
+                entry.update(status=FAILED, error=str(e))
+            entry["finished_at"] = datetime.now().isoformat()
+            entry["duration"] = round(time.perf_counter() - started, 2)
+            self._save_manifest()
+
+    async def run(self, companies: List[str], retry_failed: bool = True,
+                  ignore_attempts: bool = False) -> Dict[str, Any]:
+        selected = self.select(companies, retry_failed=retry_failed, ignore_attempts=ignore_attempts)
+        self._save_manifest()
+        logger.info(f"Running {len(selected)} of {len(companies)} companies")
+        semaphore = asyncio.Semaphore(self.config.concurrency)
+        started = time.perf_counter()
+        # Crews block a thread each; a pool sized to the batch limit keeps
+        # concurrency from being capped by (or taking over) the loop's default pool
+        with ThreadPoolExecutor(max_workers=self.config.concurrency, thread_name_prefix="research") as executor:
+            await asyncio.gather(*(self._run_one(company, semaphore, executor) for company in selected))
+        return self.summary(ran=len(selected), elapsed=time.perf_counter() - started)
+
+    def summary(self, ran: int = 0, elapsed: float = 0.0) -> Dict[str, Any]:
+        entries = self.manifest["companies"].values()
+        counts: Dict[str, int] = {}
+        for entry in entries:
+            counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+        return {
+            "ran": ran,
+            "elapsed": round(elapsed, 2),
+            "status": counts,
+            "failed": self.failed_companies(),
+            "manifest": str(self.manifest_path),
+            "search_cache": get_serper_cache().stats()["session"],
+        }
+
+    def failed_companies(self) -> List[str]:
+        return [c for c, e in self.manifest["companies"].items() if e["status"] == FAILED]
@@ -1,25 +1,44 @@
 # src/financial_researcher/crew.py
 from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
-from crewai_tools import SerperDevTool
+from crew_common import CachedSerperDevTool, KnowledgeSearchTool, enable_crew_tracing, get_knowledge_index
+from pydantic import BaseModel, Field
+from typing import List
+
+class SourceRef(BaseModel):
+    """ A source a fact was taken from """
+    url: str = Field(description="URL of the source")
+    title: str = Field(default="", description="Title of the source page or article")
+
+class SectionResearch(BaseModel):
+    """ Research behind one section of the report """
+    facts: List[str] = Field(description="Specific facts found for this section")
+    sources: List[SourceRef] = Field(description="Sources the facts came from")
 
 @CrewBase
 class ResearchCrew():
     """Research crew for comprehensive topic analysis and reporting"""
 
+    def __init__(self, report_path: str = 'output/report.md'):
+        enable_crew_tracing()
+        get_knowledge_index()
+        # Each batch run writes its own report instead of overwriting one file
+        self.report_path = report_path
+
     @agent
     def researcher(self) -> Agent:
         return Agent(
             config=self.agents_config['researcher'],
             verbose=True,
-            tools=[SerperDevTool()]
+            tools=[CachedSerperDevTool()]
         )
 
     @agent
     def analyst(self) -> Agent:
         return Agent(
             config=self.agents_config['analyst'],
-            verbose=True
+            verbose=True,
+            tools=[KnowledgeSearchTool()]
         )
 
     @task
@@ -32,9 +51,35 @@ class ResearchCrew():
     def analysis_task(self) -> Task:
         return Task(
             config=self.tasks_config['analysis_task'],
-            output_file='output/report.md'
+            output_file=self.report_path
         )
 
+    def build_section_crew(self) -> Crew:
+        """Research and rewrite a single report section (incremental refresh)"""
+        researcher = Agent(
+            config=self.agents_config['researcher'],
+            verbose=True,
+            tools=[CachedSerperDevTool()]
+        )
+        analyst = Agent(config=self.agents_config['analyst'], verbose=True)
+        research = Task(
+            config=self.tasks_config['research_section'],
+            agent=researcher,
+            output_pydantic=SectionResearch,
+        )
+        write = Task(
+            config=self.tasks_config['write_section'],
+            agent=analyst,
+            context=[research],
+        )
+        return Crew(agents=[researcher, analyst], tasks=[research, write], process=Process.sequential, verbose=True)
+
+    def build_summary_crew(self) -> Crew:
+        """Executive summary over the merged sections"""
+        analyst = Agent(config=self.agents_config['analyst'], verbose=True)
+        summary = Task(config=self.tasks_config['summarize_report'], agent=analyst)
+        return Crew(agents=[analyst], tasks=[summary], process=Process.sequential, verbose=True)
+
     @crew
     def crew(self) -> Crew:
         """Creates the research crew"""
@@ -1,7 +1,13 @@
 #!/usr/bin/env python
 # src/financial_researcher/main.py
+import asyncio
+import json
 import os
+import sys
+from datetime import date
+from financial_researcher.batch import BatchConfig, BatchRunner, load_watchlist
 from financial_researcher.crew import ResearchCrew
+from financial_researcher.refresh import ReportRefresher
 
 # Create output directory if it doesn't exist
 os.makedirs('output', exist_ok=True)
@@ -16,6 +22,8 @@ def run():
 
     # Create and run the crew
     result = ResearchCrew().crew().kickoff(inputs=inputs)
+    # Seed the section state so the next refresh only redoes what changed
+    asyncio.run(ReportRefresher(inputs['company']).seed())
 
     # Print the result
     print("\n\n=== FINAL REPORT ===\n\n")
@@ -23,5 +31,63 @@ def run():
 
     print("\n\nReport has been saved to output/report.md")
 
+def refresh():
+    """
+    Incrementally refresh output/report.md, re-running only changed sections.
+    """
+    company = sys.argv[1] if len(sys.argv) > 1 else 'Apple'
+    summary = asyncio.run(ReportRefresher(company).run())
+    print(json.dumps(summary, indent=2))
+
+
+def refresh_batch():
+    """
+    Incrementally refresh every company in a watchlist file.
+
+    Section state persists across days; each day's run gets its own manifest
+    and reports under output/refresh/<date>.
+    """
+    if len(sys.argv) < 2:
+        print("Usage: refresh_batch WATCHLIST_FILE | COMPANY [COMPANY ...]")
+        sys.exit(1)
+    args = sys.argv[1:]
+    companies = load_watchlist(args[0]) if len(args) == 1 and os.path.isfile(args[0]) else args
+    config = BatchConfig.from_env()
+    config.output_dir = os.path.join("output", "refresh", date.today().isoformat())
+
+    summary = asyncio.run(BatchRunner(config, incremental=True).run(companies))
+    print(json.dumps(summary, indent=2))
+
+
+def run_batch():
+    """
+    Research every company in a watchlist file (or given as arguments).
+
+    Usage: run_batch watchlist.txt | run_batch "Apple" "Microsoft" ...
+    Succeeded companies from earlier runs are skipped; failed ones are retried.
+    """
+    args = sys.argv[1:]
+    if not args:
+        print("Usage: run_batch WATCHLIST_FILE | COMPANY [COMPANY ...]")
+        sys.exit(1)
+    companies = load_watchlist(args[0]) if len(args) == 1 and os.path.isfile(args[0]) else args
+
+    summary = asyncio.run(BatchRunner().run(companies))
+    print(json.dumps(summary, indent=2))
+
+
+def retry_failed():
+    """
+    Re-run only the companies that failed in the batch manifest.
+    """
+    runner = BatchRunner()
+    failed = runner.failed_companies()
+    if not failed:
+        print("No failed companies in the manifest")
+        return
+    # An explicit retry ignores the per-company attempt limit
+    summary = asyncio.run(runner.run(failed, ignore_attempts=True))
+    print(json.dumps(summary, indent=2))
+
 if __name__ == "__main__":
     run()
\ No newline at end of file
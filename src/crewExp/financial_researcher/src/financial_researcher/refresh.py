@@ -0,0 +1,340 @@
+"""
+Incremental report refresh for ResearchCrew.
+
+The report is kept as a set of sections, each stored in a per-company state
+file together with the facts, sources and search results behind it. A
+refresh first runs cheap change checks per section, with no LLM calls:
+
+- the section's search query is repeated, bypassing the search cache, and
+  compared with the links it returned last time
+- the sources cited by the section are re-fetched with conditional requests
+  (ETag / Last-Modified, falling back to a hash of the page text)
+
+Only sections whose inputs changed, or that are older than the max age, are
+researched and rewritten; the rest are reused as-is. The executive summary is
+regenerated only if some section changed, then everything is merged into the
+report file. A full crew run seeds the state from its report (`seed_state`),
+so the first refresh after it only redoes what changed.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+
+import httpx
+from crew_common import CachedSerperDevTool, HttpRequestError, on_tool_loop, request, trace_span
+
+from financial_researcher.crew import ResearchCrew, SectionResearch
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Section:
+    """One report section and the search that tracks its inputs"""
+    key: str
+    title: str
+    focus: str
+    query: str
+    search_type: str = "search"
+
+
+SECTIONS = [
+    Section("status", "Current Status and Health",
+            "current company status and financial health", "{company} company financial health"),
+    Section("history", "Historical Performance",
+            "historical company performance", "{company} historical performance revenue earnings"),
+    Section("challenges", "Challenges and Opportunities",
+            "major challenges and opportunities", "{company} challenges opportunities"),
+    Section("news", "Recent News and Events",
+            "recent news and events", "{company}", search_type="news"),
+    Section("outlook", "Future Outlook",
+            "future outlook and potential developments", "{company} outlook forecast"),
+]
+
+
+@dataclass
+class RefreshConfig:
+    """Change-detection thresholds and state location for incremental refresh"""
+    state_dir: str = "output/state"
+    max_age_days: float = 7.0
+    link_overlap: float = 0.6
+    news_link_overlap: float = 0.8
+    check_sources: bool = True
+    max_sources_checked: int = 5
+    section_concurrency: int = 3
+
+    @classmethod
+    def from_env(cls) -> 'RefreshConfig':
+        """Create config from environment variables"""
+        return cls(
+            state_dir=os.getenv("REPORT_STATE_DIR", "output/state"),
+            max_age_days=float(os.getenv("REPORT_SECTION_MAX_AGE_DAYS", "7")),
+            link_overlap=float(os.getenv("REPORT_LINK_OVERLAP", "0.6")),
+            news_link_overlap=float(os.getenv("REPORT_NEWS_LINK_OVERLAP", "0.8")),
+            check_sources=os.getenv("REPORT_CHECK_SOURCES", "true").lower() in ("1", "true", "yes"),
+            max_sources_checked=int(os.getenv("REPORT_MAX_SOURCES_CHECKED", "5")),
+            section_concurrency=int(os.getenv("REPORT_SECTION_CONCURRENCY", "3")),
+        )
+
+
+def _slug(company: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", company.lower()).strip("-") or "company"
+
+
+def _links(results: Dict[str, Any]) -> List[str]:
+    items = results.get("news") or results.get("organic") or []
+    return [item["link"] for item in items if item.get("link")]
+
+
+def _overlap(previous: List[str], current: List[str]) -> float:
+    a, b = set(previous), set(current)
+    return len(a & b) / len(a | b) if a | b else 1.0
+
+
+def _heading_key(title: str) -> str:
+    """Heading text without numbering, punctuation or case"""
+    return re.sub(r"[^a-z]+", " ", title.lower().replace("&", " and ")).strip()
+
+
+def _split_sections(report: str) -> Dict[str, str]:
+    """Level-2 sections of a markdown report, keyed by _heading_key of their heading"""
+    parts = re.split(r"^##[ \t]+(.+?)[ \t]*$", report, flags=re.M)
+    return {_heading_key(title): body.strip() for title, body in zip(parts[1::2], parts[2::2])}
+
+
+def _text_hash(html: str) -> str:
+    text = re.sub(r"<(script|style)[^>]*>.*?</\1>", " ", html, flags=re.S | re.I)
+    text = re.sub(r"<[^>]+>", " ", text)
+    return hashlib.sha256(re.sub(r"\s+", " ", text).strip().encode("utf-8")).hexdigest()
+
+
+class ReportState:
+    """Per-company sections, with the facts, sources and links behind them"""
+
+    def __init__(self, company: str, state_dir: str):
+        self.company = company
+        self.path = Path(state_dir) / f"{_slug(company)}.json"
+        if self.path.exists():
+            self.data = json.loads(self.path.read_text())
+        else:
+            self.data = {"company": company, "summary": None, "sections": {}}
+
+    @property
+    def sections(self) -> Dict[str, Dict[str, Any]]:
+        return self.data["sections"]
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.data["updated_at"] = datetime.now().isoformat()
+        tmp = self.path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(self.data, indent=2))
+        os.replace(tmp, self.path)
+
+
+async def _check_source(source: Dict[str, Any]) -> bool:
+    """True if the source changed since it was last fetched"""
+    headers = {}
+    if source.get("etag"):
+        headers["If-None-Match"] = source["etag"]
+    if source.get("last_modified"):
+        headers["If-Modified-Since"] = source["last_modified"]
+    try:
+        response = await request("GET", source["url"], headers=headers, retries=1, follow_redirects=True)
+    except (HttpRequestError, httpx.HTTPError, httpx.InvalidURL, ValueError) as e:
+        # Unreachable sources don't force a rewrite on their own
+        logger.info(f"Could not check source {source['url']}: {str(e)}")
+        return False
+    if response.status_code == 304:
+        return False
+    previous_hash = source.get("content_hash")
+    source.update(
+        etag=response.headers.get("ETag"),
+        last_modified=response.headers.get("Last-Modified"),
+        content_hash=_text_hash(response.text),
+    )
+    return previous_hash is not None and previous_hash != source["content_hash"]
+
+
+class ReportRefresher:
+    """Refreshes one company's report, re-running only the changed sections"""
+
+    def __init__(self, company: str, report_path: str = "output/report.md",
+                 config: Optional[RefreshConfig] = None):
+        self.company = company
+        self.report_path = report_path
+        self.config = config or RefreshConfig.from_env()
+        self.state = ReportState(company, self.config.state_dir)
+        self.search = CachedSerperDevTool()
+
+    def _search(self, section: Section) -> List[str]:
+        query = section.query.format(company=self.company)
+        try:
+            # A cached answer is the one the stored links came from; only a live search shows change
+            return _links(self.search._make_api_request(query, section.search_type, fresh=True))
+        except Exception as e:
+            logger.error(f"Change check search failed for {self.company}/{section.key}: {str(e)}")
+            return []
+
+    async def _changed_sources(self, sources: List[Dict[str, Any]]) -> bool:
+        checked = sources[:self.config.max_sources_checked]
+
+        async def check_all() -> List[Any]:
+            return await asyncio.gather(*(_check_source(s) for s in checked), return_exceptions=True)
+
+        changed = False
+        for source, outcome in zip(checked, await on_tool_loop(check_all())):
+            if isinstance(outcome, BaseException):
+                logger.error(f"Checking source {source.get('url')} failed: {str(outcome)}")
+            elif outcome:
+                changed = True
+        return changed
+
+    async def _dirty_reason(self, section: Section) -> Optional[str]:
+        """Why a section needs refreshing, or None if it can be reused"""
+        stored = self.state.sections.get(section.key)
+        if not stored:
+            return "new"
+        if time.time() - stored.get("refreshed_at", 0) > self.config.max_age_days * 86400:
+            return "max age"
+        links = await asyncio.to_thread(self._search, section)
+        threshold = self.config.news_link_overlap if section.search_type == "news" else self.config.link_overlap
+        if links and _overlap(stored.get("links", []), links) < threshold:
+            stored["pending_links"] = links
+            return "search results changed"
+        if self.config.check_sources and await self._changed_sources(stored.get("sources", [])):
+            return "sources changed"
+        return None
+
+    async def seed(self) -> List[str]:
+        """Seed section state from a report written by a full crew run.
+
+        Sections are matched by heading; their current search links become
+        the baseline for the next change check. Returns the seeded keys.
+        """
+        try:
+            parsed = _split_sections(Path(self.report_path).read_text())
+        except OSError as e:
+            logger.error(f"Could not read {self.report_path} to seed refresh state: {str(e)}")
+            return []
+        found = [(s, parsed[_heading_key(s.title)]) for s in SECTIONS if parsed.get(_heading_key(s.title))]
+        links = await asyncio.gather(*(asyncio.to_thread(self._search, s) for s, _ in found))
+        now = time.time()
+        for (section, content), section_links in zip(found, links):
+            self.state.sections[section.key] = {
+                "title": section.title,
+                "content": content,
+                "facts": [],
+                "sources": [],
+                "links": section_links,
+                "refreshed_at": now,
+            }
+        if parsed.get("executive summary"):
+            self.state.data["summary"] = parsed["executive summary"]
+        self.state.save()
+        return [s.key for s, _ in found]
+
+    async def _refresh_section(self, section: Section, semaphore: asyncio.Semaphore):
+        async with semaphore:
+            stored = self.state.sections.get(section.key, {})
+            previous_facts = "\n".join(f"- {f}" for f in stored.get("facts", [])) or "None yet."
+            crew = ResearchCrew(report_path=self.report_path).build_section_crew()
+            result = await crew.kickoff_async(inputs={
+                "company": self.company,
+                "section_title": section.title,
+                "section_focus": section.focus,
+                "previous_facts": previous_facts,
+            })
+            research = result.tasks_output[0].pydantic
+            if not isinstance(research, SectionResearch):
+                research = SectionResearch(facts=[], sources=[])
+            links = stored.get("pending_links") or await asyncio.to_thread(self._search, section)
+            sources = [{"url": s.url, "title": s.title} for s in research.sources]
+            # Baseline validators/hashes so the next refresh can compare
+            await self._changed_sources(sources)
+            self.state.sections[section.key] = {
+                "title": section.title,
+                "content": result.raw,
+                "facts": research.facts,
+                "sources": sources,
+                "links": links,
+                "refreshed_at": time.time(),
+            }
+
+    async def _summarize(self):
+        sections = "\n\n".join(
+            f"## {s.title}\n{self.state.sections[s.key]['content']}"
+            for s in SECTIONS if s.key in self.state.sections
+        )
+        result = await ResearchCrew(report_path=self.report_path).build_summary_crew().kickoff_async(
+            inputs={"company": self.company, "sections": sections}
+        )
+        self.state.data["summary"] = result.raw
+
+    def _merge(self):
+        parts = [f"# {self.company} Report", "", "## Executive Summary", "", self.state.data["summary"] or ""]
+        for section in SECTIONS:
+            stored = self.state.sections.get(section.key)
+            if stored:
+                parts += ["", f"## {section.title}", "", stored["content"]]
+        parts += ["", f"_Last refreshed {datetime.now().strftime('%Y-%m-%d %H:%M')}_", ""]
+        Path(self.report_path).parent.mkdir(parents=True, exist_ok=True)
+        Path(self.report_path).write_text("\n".join(parts))
+
+    async def run(self) -> Dict[str, Any]:
+        # Section and summary crews share one trace per refresh
+        with trace_span("crew", "financial_researcher.refresh", company=self.company):
+            return await self._run()
+
+    async def _run(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        reasons = await asyncio.gather(*(self._dirty_reason(s) for s in SECTIONS), return_exceptions=True)
+        dirty: Dict[str, str] = {}
+        check_errors: Dict[str, str] = {}
+        for section, reason in zip(SECTIONS, reasons):
+            if isinstance(reason, BaseException):
+                # A broken check reuses the stored section rather than failing the refresh
+                logger.error(f"Change check failed for {self.company}/{section.key}: {str(reason)}")
+                check_errors[section.key] = str(reason)
+                if section.key not in self.state.sections:
+                    dirty[section.key] = "new"
+            elif reason:
+                dirty[section.key] = reason
+        check_seconds = time.perf_counter() - started
+
+        semaphore = asyncio.Semaphore(self.config.section_concurrency)
+        outcomes = await asyncio.gather(
+            *(self._refresh_section(s, semaphore) for s in SECTIONS if s.key in dirty),
+            return_exceptions=True,
+        )
+        failed: Dict[str, str] = {}
+        for key, outcome in zip(dirty, outcomes):
+            if isinstance(outcome, BaseException):
+                logger.error(f"Refreshing {self.company}/{key} failed: {str(outcome)}")
+                failed[key] = str(outcome)
+        for stored in self.state.sections.values():
+            stored.pop("pending_links", None)
+
+        refreshed = [k for k in dirty if k not in failed]
+        if refreshed or not self.state.data.get("summary"):
+            await self._summarize()
+        self.state.save()
+        self._merge()
+        return {
+            "company": self.company,
+            "refreshed": {k: dirty[k] for k in refreshed},
+            "reused": [s.key for s in SECTIONS if s.key not in dirty],
+            "failed": failed,
+            "check_errors": check_errors,
+            "check_seconds": round(check_seconds, 2),
+            "elapsed": round(time.perf_counter() - started, 2),
+            "report": self.report_path,
+        }
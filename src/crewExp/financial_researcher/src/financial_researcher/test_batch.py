@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Tests for the watchlist batch runner.
+Runs batches against stand-in crews to check the manifest, retries and the
+attempt limit without calling any model. Run with
+`python -m financial_researcher.test_batch` from the project, or with pytest.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+os.environ.setdefault("SERPER_CACHE_PATH", os.path.join(tempfile.mkdtemp(), "serper_cache.db"))
+
+from financial_researcher import batch
+from financial_researcher.batch import FAILED, PENDING, RUNNING, SUCCEEDED, BatchConfig, BatchRunner
+
+
+class FakeCrew:
+    """Stands in for ResearchCrew: writes the report, or fails for listed companies"""
+    failing = set()
+    threads = []
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def __init__(self, report_path):
+        self.report_path = report_path
+
+    def crew(self):
+        return self
+
+    def kickoff(self, inputs):
+        cls = FakeCrew
+        with cls.lock:
+            cls.threads.append(threading.current_thread().name)
+            cls.running += 1
+            cls.peak = max(cls.peak, cls.running)
+        try:
+            threading.Event().wait(0.05)
+            if inputs["company"] in cls.failing:
+                raise RuntimeError(f"{inputs['company']} failed")
+            Path(self.report_path).write_text(f"# {inputs['company']}\n")
+            return SimpleNamespace(token_usage=SimpleNamespace(total_tokens=10))
+        finally:
+            with cls.lock:
+                cls.running -= 1
+
+
+class FakeRefresher:
+    def __init__(self, company, report_path):
+        self.company = company
+
+    async def seed(self):
+        return []
+
+
+def runner_in(tmp, **options):
+    FakeCrew.failing, FakeCrew.threads, FakeCrew.running, FakeCrew.peak = set(), [], 0, 0
+    batch.ResearchCrew, batch.ReportRefresher = FakeCrew, FakeRefresher
+    return BatchRunner(BatchConfig(output_dir=tmp, **options))
+
+
+def test_manifest_records_each_company():
+    with tempfile.TemporaryDirectory() as tmp:
+        runner = runner_in(tmp, concurrency=2)
+        FakeCrew.failing = {"Beta"}
+        summary = asyncio.run(runner.run(["Apple Inc", "Beta", "Apple Inc"]))
+        manifest = json.loads(Path(tmp, "manifest.json").read_text())["companies"]
+        assert set(manifest) == {"Apple Inc", "Beta"}
+        apple, beta = manifest["Apple Inc"], manifest["Beta"]
+        assert apple["status"] == SUCCEEDED and apple["attempts"] == 1 and apple["total_tokens"] == 10
+        assert apple["report"].endswith("apple-inc.md") and Path(apple["report"]).exists()
+        assert beta["status"] == FAILED and beta["error"] == "Beta failed"
+        assert summary["ran"] == 2 and summary["failed"] == ["Beta"]
+
+
+def test_runs_on_a_dedicated_pool_within_the_limit():
+    with tempfile.TemporaryDirectory() as tmp:
+        runner = runner_in(tmp, concurrency=2)
+
+        async def run():
+            loop = asyncio.get_running_loop()
+            default = loop._default_executor
+            await runner.run([f"Company {i}" for i in range(5)])
+            return default, loop._default_executor
+
+        before, after = asyncio.run(run())
+        assert before is after, "the loop's default executor was replaced"
+        assert all(name.startswith("research") for name in FakeCrew.threads), FakeCrew.threads
+        assert FakeCrew.peak == 2, FakeCrew.peak
+
+
+def test_resume_retries_failed_and_skips_succeeded():
+    with tempfile.TemporaryDirectory() as tmp:
+        runner = runner_in(tmp)
+        FakeCrew.failing = {"Beta"}
+        asyncio.run(runner.run(["Alpha", "Beta"]))
+
+        resumed = runner_in(tmp)
+        assert resumed.select(["Alpha", "Beta", "Gamma"]) == ["Beta", "Gamma"]
+        assert resumed.select(["Alpha", "Beta"], retry_failed=False) == []
+        asyncio.run(resumed.run(["Alpha", "Beta"]))
+        beta = resumed.manifest["companies"]["Beta"]
+        assert beta["status"] == SUCCEEDED and beta["attempts"] == 2 and beta["error"] is None
+        assert resumed.manifest["companies"]["Alpha"]["attempts"] == 1
+
+
+def test_attempt_limit_stops_retries():
+    with tempfile.TemporaryDirectory() as tmp:
+        runner = runner_in(tmp, max_attempts=2)
+        FakeCrew.failing = {"Beta"}
+        for _ in range(3):
+            asyncio.run(runner.run(["Beta"]))
+        assert runner.manifest["companies"]["Beta"]["attempts"] == 2
+        assert runner.select(["Beta"]) == []
+        assert runner.select(["Beta"], ignore_attempts=True) == ["Beta"]
+
+
+def test_interrupted_runs_are_marked_failed():
+    with tempfile.TemporaryDirectory() as tmp:
+        runner = runner_in(tmp)
+        entry = runner._entry("Alpha")
+        entry.update(status=RUNNING, attempts=1)
+        runner._entry("Beta")
+        runner._save_manifest()
+
+        reloaded = runner_in(tmp)
+        companies = reloaded.manifest["companies"]
+        assert companies["Alpha"]["status"] == FAILED and companies["Alpha"]["error"] == "interrupted"
+        assert companies["Beta"]["status"] == PENDING
+        assert reloaded.select(["Alpha", "Beta"]) == ["Alpha", "Beta"]
+
+
+def test_report_names_do_not_collide():
+    with tempfile.TemporaryDirectory() as tmp:
+        runner = runner_in(tmp)
+        first, second = runner._entry("Apple, Inc."), runner._entry("Apple Inc")
+        assert first["report"] != second["report"]
+        assert second["report"].endswith("apple-inc-2.md")
+
+
+def main():
+    """Run all tests"""
+    print("🧪 Batch Test Suite")
+    print("=" * 50)
+    tests = [(name, fn) for name, fn in globals().items() if name.startswith("test_") and callable(fn)]
+    failed = 0
+    for name, fn in tests:
+        try:
+            fn()
+            print(f"✅ {name}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {name}: {e!r}")
+    print("=" * 50)
+    print(f"📊 {len(tests) - failed}/{len(tests)} passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -1,19 +1,29 @@
-from crewai.tools import BaseTool
 from typing import Type
 from pydantic import BaseModel, Field
+from crew_common import AsyncBaseTool, request_json
 
 
 class MyCustomToolInput(BaseModel):
     """Input schema for MyCustomTool."""
     argument: str = Field(..., description="Description of the argument.")
 
-class MyCustomTool(BaseTool):
+class MyCustomTool(AsyncBaseTool):
+    """Template for an async tool.
+
+    AsyncBaseTool runs `_arun` on the shared tool loop with a timeout,
+    a retry after a timeout and per-tool timings in crew_common.tool_metrics.
+    HTTP calls made with crew_common.request/request_json retry 429/5xx
+    themselves and share one connection pool across all tools and crews in
+    the process.
+    """
     name: str = "Name of my tool"
     description: str = (
         "Clear description for what this tool is useful for, your agent will need this information to use it."
     )
     args_schema: Type[BaseModel] = MyCustomToolInput
+    timeout: float = 30.0
 
-    def _run(self, argument: str) -> str:
-        # Implementation goes here
+    async def _arun(self, argument: str) -> str:
+        # Implementation goes here, e.g.
+        # data = await request_json("GET", "https://api.example.com/search", params={"q": argument})
         return "this is an example of a tool output, ignore it and move along."
@@ -1,13 +1,11 @@
 from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
-from crewai_tools import SerperDevTool
+from crew_common import CachedSerperDevTool, KnowledgeSearchTool, enable_crew_tracing, get_knowledge_index
 from pydantic import BaseModel, Field
 from typing import List
 from .tools.push_tool import PushNotificationTool
-from .tools.polygon_tool import PolygonStockTool
-from crewai.memory import LongTermMemory, ShortTermMemory, EntityMemory
-from crewai.memory.storage.rag_storage import RAGStorage
-from crewai.memory.storage.ltm_sqlite_storage import LTMSQLiteStorage
+from .tools.polygon_tool import PolygonBatchStockTool, PolygonStockTool
+from .storage.memory_store import MemoryStoreManager
 
 class TrendingCompany(BaseModel):
     """ A company that is in the news and attracting attention """
@@ -30,6 +28,13 @@ class TrendingCompanyResearchList(BaseModel):
     """ A list of detailed research on all the companies """
     research_list: List[TrendingCompanyResearch] = Field(description="Comprehensive research on all trending companies")
 
+class CompanyPick(BaseModel):
+    """ The company picked for investment and the reasoning behind it """
+    name: str = Field(description="Name of the chosen company")
+    ticker: str = Field(description="Stock ticker symbol of the chosen company")
+    rationale: str = Field(description="One sentence rationale for the choice")
+    report: str = Field(description="Detailed report on why this company was chosen, and which companies were not selected and why")
+
 
 @CrewBase
 class StockPicker():
@@ -38,20 +43,30 @@ class StockPicker():
     agents_config = 'config/agents.yaml'
     tasks_config = 'config/tasks.yaml'
 
+    def __init__(self):
+        enable_crew_tracing()
+        get_knowledge_index()
+        self.memory_stores = MemoryStoreManager()
+
     @agent
     def trending_company_finder(self) -> Agent:
         return Agent(config=self.agents_config['trending_company_finder'],
-                     tools=[SerperDevTool()], memory=True)
+                     tools=[CachedSerperDevTool()], memory=True)
     
     @agent
     def financial_researcher(self) -> Agent:
         return Agent(config=self.agents_config['financial_researcher'], 
-                     tools=[SerperDevTool(),PolygonStockTool()])
+                     tools=[CachedSerperDevTool(), PolygonBatchStockTool(), PolygonStockTool()])
+
+    def build_financial_researcher(self) -> Agent:
+        """A fresh researcher, so concurrent research crews don't share agent state"""
+        return Agent(config=self.agents_config['financial_researcher'],
+                     tools=[CachedSerperDevTool(), PolygonStockTool()])
 
     @agent
     def stock_picker(self) -> Agent:
         return Agent(config=self.agents_config['stock_picker'], 
-                     tools=[PushNotificationTool()], memory=True)
+                     tools=[PushNotificationTool(), KnowledgeSearchTool()], memory=True)
     
     @task
     def find_trending_companies(self) -> Task:
@@ -67,6 +82,14 @@ class StockPicker():
             output_pydantic=TrendingCompanyResearchList,
         )
 
+    def build_company_research(self, agent: Agent) -> Task:
+        """Research task for a single company (not part of the hierarchical crew)"""
+        return Task(
+            config=self.tasks_config['research_company'],
+            agent=agent,
+            output_pydantic=TrendingCompanyResearch,
+        )
+
     @task
     def pick_best_company(self) -> Task:
         return Task(
@@ -93,34 +116,8 @@ class StockPicker():
             manager_agent=manager,
             memory=True,
             # Long-term memory for persistent storage across sessions
-            long_term_memory = LongTermMemory(
-                storage=LTMSQLiteStorage(
-                    db_path="./memory/long_term_memory_storage.db"
-                )
-            ),
-            # Short-term memory for current context using RAG
-            short_term_memory = ShortTermMemory(
-                storage = RAGStorage(
-                        embedder_config={
-                            "provider": "openai",
-                            "config": {
-                                "model": 'text-embedding-3-small'
-                            }
-                        },
-                        type="short_term",
-                        path="./memory/"
-                    )
-                ),            # Entity memory for tracking key information about entities
-            entity_memory = EntityMemory(
-                storage=RAGStorage(
-                    embedder_config={
-                        "provider": "openai",
-                        "config": {
-                            "model": 'text-embedding-3-small'
-                        }
-                    },
-                    type="short_term",
-                    path="./memory/"
-                )
-            ),
+            long_term_memory=self.memory_stores.long_term_memory(),
+            # Short-term and entity memory in separate, compacted RAG collections
+            short_term_memory=self.memory_stores.short_term_memory(),
+            entity_memory=self.memory_stores.entity_memory(),
         )
@@ -2,9 +2,23 @@
 import sys
 import warnings
 import os
+import json
+import asyncio
+import time
+import uuid
 from datetime import datetime
 
-from stock_picker.crew import StockPicker
+from crew_common import get_serper_cache, tool_metrics
+
+from stock_picker.crew import StockPicker, TrendingCompanyList, TrendingCompanyResearchList
+from stock_picker.parallel import ParallelStockPicker
+from stock_picker.sweep import run_sweep
+from stock_picker.tools.polygon_tool import PolygonStockTool
+from stock_picker.tools.market_cache import get_market_cache
+from stock_picker.storage.memory_store import MemoryStoreManager
+from stock_picker.storage.long_term import benchmark_lookup
+from stock_picker.storage.pick_index import PickIndex
+from stock_picker.storage.run_history import RunHistory
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
@@ -13,18 +27,144 @@ def run():
     """
     Run the research crew.
     """
+    history = RunHistory()
+    pick_index = PickIndex(history=history)
     inputs = {
         'sector': 'Technology',
-        "current_date": str(datetime.now())
+        "current_date": str(datetime.now()),
+        "excluded_tickers": ", ".join(sorted(pick_index.excluded_tickers())) or "none",
     }
 
     # Create and run the crew
-    result = StockPicker().crew().kickoff(inputs=inputs)
+    picker = StockPicker()
+    started_at = time.time()
+    result = picker.crew().kickoff(inputs=inputs)
+
+    # Record what was found so later runs can skip it
+    trending, research = None, None
+    for task_output in result.tasks_output:
+        if isinstance(task_output.pydantic, TrendingCompanyList):
+            trending = task_output.pydantic
+        elif isinstance(task_output.pydantic, TrendingCompanyResearchList):
+            research = task_output.pydantic
+    # The hierarchical crew researches every company in one task, so its output
+    # can only be matched back to a ticker by name; unmatched rows keep no ticker.
+    # Staged runs (run_parallel) know each research task's ticker.
+    tickers_by_name = {c.name.strip().lower(): c.ticker for c in trending.companies} if trending else {}
+    history.record_run(
+        uuid.uuid4().hex, inputs['sector'], started_at,
+        trending=trending,
+        research=[(tickers_by_name.get(r.name.strip().lower()), r) for r in research.research_list] if research else (),
+        decision_text=result.raw, mode="crew",
+    )
 
     # Print the result
     print("\n\n=== FINAL DECISION ===\n\n")
     print(result.raw)
 
+    picker.memory_stores.flush_metrics()
+
+
+def run_parallel():
+    """
+    Run the crew as find -> concurrent per-company research -> pick.
+    """
+    inputs = {
+        'sector': sys.argv[1] if len(sys.argv) > 1 else 'Technology',
+        "current_date": str(datetime.now())
+    }
+
+    result = asyncio.run(ParallelStockPicker(pick_index=PickIndex()).run(inputs))
+
+    print("\n\n=== FINAL DECISION ===\n\n")
+    print(result.decision.raw if result.decision else "No decision: no company was researched")
+    print(f"\nStage timings (s): {result.timings}")
+    print(f"Tool timings: {json.dumps(tool_metrics.summary(), indent=2)}")
+    if result.skipped:
+        print(f"Skipped (already covered): {', '.join(result.skipped)}")
+    if result.failed:
+        print(f"Research failed for: {', '.join(result.failed)}")
+
+
+def sweep():
+    """
+    Run the staged crew across many sectors in a bounded process pool.
+    """
+    summary = run_sweep(sys.argv[1:] or None)
+    print(json.dumps(summary, indent=2))
+
+
+def history():
+    """
+    Query past runs: history [picks|trending|runs] [--ticker T] [--sector S] [--since DATE] [--until DATE]
+    or history ticker TICKER for one company's record.
+    """
+    import argparse
+    parser = argparse.ArgumentParser(prog="history")
+    parser.add_argument("what", nargs="?", default="picks", choices=["picks", "trending", "runs", "ticker"])
+    parser.add_argument("value", nargs="?", help="ticker, for 'history ticker'")
+    parser.add_argument("--ticker")
+    parser.add_argument("--sector")
+    parser.add_argument("--since", help="ISO date or datetime")
+    parser.add_argument("--until", help="ISO date or datetime")
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args(sys.argv[1:])
+
+    store = RunHistory()
+    if args.what == "ticker":
+        if not (args.value or args.ticker):
+            print("Usage: history ticker TICKER")
+            sys.exit(1)
+        result = store.ticker_summary(args.value or args.ticker)
+    elif args.what == "runs":
+        result = store.runs(sector=args.sector, since=args.since, until=args.until, limit=args.limit)
+    else:
+        query = store.picks if args.what == "picks" else store.trending
+        result = query(ticker=args.ticker, sector=args.sector, since=args.since, until=args.until, limit=args.limit)
+    print(json.dumps(result, indent=2, default=str))
+
+
+def warm_cache():
+    """
+    Prefetch Polygon market data for the tickers given on the command line.
+    """
+    tickers = sys.argv[1:]
+    if not tickers:
+        print("Usage: warm_cache TICKER [TICKER ...]")
+        sys.exit(1)
+    print(json.dumps(PolygonStockTool().warm(tickers), indent=2))
+
+
+def cache_stats():
+    """
+    Print hit-rate statistics for the market data and search caches.
+    """
+    cache = get_market_cache()
+    purged = cache.purge_expired()
+    search = get_serper_cache()
+    search_purged = search.purge_expired()
+    print(json.dumps({
+        "market_data": {**cache.stats(), "purged_expired": purged},
+        "search": {**search.stats(), "purged_expired": search_purged},
+    }, indent=2))
+
+
+def maintain_memory():
+    """
+    Compact the crew memory collections, vacuum the store and print stats.
+    """
+    stores = MemoryStoreManager()
+    report = stores.vacuum()
+    print(json.dumps({**report, **stores.stats()}, indent=2))
+
+
+def benchmark_ltm():
+    """
+    Compare long-term memory lookups on the stock and tuned SQLite storage.
+    """
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    print(json.dumps(benchmark_lookup(rows=rows), indent=2))
+
 
 if __name__ == "__main__":
     run()
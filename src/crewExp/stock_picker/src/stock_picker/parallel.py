@@ -0,0 +1,220 @@
+"""
+Staged, parallel execution mode for the StockPicker crew.
+
+Instead of a hierarchical crew where a manager LLM routes every step and the
+trending companies are researched one after another, this runs three stages:
+
+1. find trending companies
+2. research each company in its own crew, concurrently (capped)
+3. pick the best company from the joined research
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import os
+import time
+import uuid
+
+from crewai import Crew, CrewOutput, Process, Task
+from crew_common import trace_span
+
+from stock_picker.crew import (
+    CompanyPick,
+    StockPicker,
+    TrendingCompany,
+    TrendingCompanyList,
+    TrendingCompanyResearch,
+    TrendingCompanyResearchList,
+)
+from stock_picker.storage.pick_index import PickIndex
+from stock_picker.storage.run_history import RunHistory
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ParallelRunResult:
+    """Outputs and per-stage timings of a staged run"""
+    run_id: str
+    trending: TrendingCompanyList
+    research: TrendingCompanyResearchList
+    decision: Optional[CrewOutput]
+    pick: Optional[CompanyPick] = None
+    skipped: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+    timings: Dict[str, float] = field(default_factory=dict)
+
+
+class ParallelStockPicker:
+    """Runs StockPicker as find -> concurrent research -> pick"""
+
+    def __init__(self, picker: Optional[StockPicker] = None, max_concurrency: Optional[int] = None,
+                 pick_index: Optional[PickIndex] = None, output_dir: str = "output",
+                 use_memory: bool = True, history: Optional[RunHistory] = None):
+        self.picker = picker or StockPicker()
+        self.max_concurrency = max_concurrency or int(os.getenv("STOCK_PICKER_RESEARCH_CONCURRENCY", "3"))
+        self.pick_index = pick_index
+        self.output_dir = Path(output_dir)
+        self.use_memory = use_memory
+        # The pick index dedups against the run history, so runs must be recorded
+        if history is None and pick_index is not None:
+            history = pick_index.history
+        self.history = history
+
+    def _memory_kwargs(self) -> Dict[str, Any]:
+        if not self.use_memory:
+            return {"memory": False}
+        stores = self.picker.memory_stores
+        return {
+            "memory": True,
+            "long_term_memory": stores.long_term_memory(),
+            "short_term_memory": stores.short_term_memory(),
+            "entity_memory": stores.entity_memory(),
+        }
+
+    async def find(self, inputs: Dict[str, Any]) -> TrendingCompanyList:
+        task = Task(
+            config=self.picker.tasks_config['find_trending_companies'],
+            output_pydantic=TrendingCompanyList,
+            output_file=str(self.output_dir / "trending_companies.json"),
+        )
+        crew = Crew(
+            agents=[self.picker.trending_company_finder()],
+            tasks=[task],
+            process=Process.sequential,
+            verbose=True,
+            **self._memory_kwargs(),
+        )
+        result = await crew.kickoff_async(inputs=inputs)
+        return result.pydantic or TrendingCompanyList.model_validate_json(result.raw)
+
+    async def research(self, inputs: Dict[str, Any],
+                       companies: List[TrendingCompany]) -> Dict[str, Any]:
+        """One research crew per company, at most max_concurrency at a time.
+
+        Returns the finished tasks as (ticker, task) pairs, plus failures by ticker.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def research_one(company: TrendingCompany) -> Task:
+            async with semaphore:
+                agent = self.picker.build_financial_researcher()
+                task = self.picker.build_company_research(agent)
+                crew = Crew(agents=[agent], tasks=[task], process=Process.sequential, verbose=True)
+                started = time.perf_counter()
+                await crew.kickoff_async(inputs={**inputs, **company.model_dump()})
+                logger.info(f"Researched {company.ticker} in {time.perf_counter() - started:.1f}s")
+                return task
+
+        outcomes = await asyncio.gather(
+            *(research_one(company) for company in companies),
+            return_exceptions=True,
+        )
+        tasks: List[Tuple[str, Task]] = []
+        failed: Dict[str, str] = {}
+        for company, outcome in zip(companies, outcomes):
+            if isinstance(outcome, BaseException):
+                logger.error(f"Research failed for {company.ticker}: {str(outcome)}")
+                failed[company.ticker] = str(outcome)
+            else:
+                tasks.append((company.ticker, outcome))
+        return {"tasks": tasks, "failed": failed}
+
+    async def pick(self, inputs: Dict[str, Any], research_tasks: List[Task]) -> CrewOutput:
+        # The research tasks already ran in their own crews; their outputs
+        # become this task's context.
+        task = Task(
+            config=self.picker.tasks_config['pick_best_company'],
+            context=research_tasks,
+            output_pydantic=CompanyPick,
+            output_file=str(self.output_dir / "decision.json"),
+        )
+        crew = Crew(
+            agents=[self.picker.stock_picker()],
+            tasks=[task],
+            process=Process.sequential,
+            verbose=True,
+            **self._memory_kwargs(),
+        )
+        return await crew.kickoff_async(inputs=inputs)
+
+    async def run(self, inputs: Dict[str, Any]) -> ParallelRunResult:
+        # One trace for the whole run, with each stage's crews nested under it
+        with trace_span("crew", "stock_picker.parallel", sector=inputs.get("sector")):
+            return await self._run(inputs)
+
+    async def _run(self, inputs: Dict[str, Any]) -> ParallelRunResult:
+        run_id = uuid.uuid4().hex
+        run_started_at = time.time()
+        sector = inputs.get("sector", "")
+        timings: Dict[str, float] = {}
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        if self.pick_index is not None:
+            inputs = {**inputs, "excluded_tickers": ", ".join(sorted(self.pick_index.excluded_tickers())) or "none"}
+        else:
+            inputs = {"excluded_tickers": "none", **inputs}
+
+        started = time.perf_counter()
+        trending = await self.find(inputs)
+        timings["find"] = time.perf_counter() - started
+
+        # Deterministic dedup against everything already covered
+        candidates, skipped = trending.companies, []
+        if self.pick_index is not None:
+            candidates, skipped = self.pick_index.filter(trending.companies)
+            if skipped:
+                logger.info(f"Skipping already covered: {', '.join(c.ticker for c in skipped)}")
+
+        started = time.perf_counter()
+        outcome = await self.research(inputs, candidates)
+        timings["research"] = time.perf_counter() - started
+        research_tasks = [task for _, task in outcome["tasks"]]
+        researched = [
+            (ticker, task.output.pydantic) for ticker, task in outcome["tasks"]
+            if task.output is not None and isinstance(task.output.pydantic, TrendingCompanyResearch)
+        ]
+        research = TrendingCompanyResearchList(research_list=[r for _, r in researched])
+        (self.output_dir / "research_report.json").write_text(research.model_dump_json())
+        if self.pick_index is not None:
+            self.pick_index.release(outcome["failed"])
+
+        decision, pick = None, None
+        if research_tasks:
+            started = time.perf_counter()
+            decision = await self.pick(inputs, research_tasks)
+            timings["pick"] = time.perf_counter() - started
+            if isinstance(decision.pydantic, CompanyPick):
+                pick = decision.pydantic
+                (self.output_dir / "decision.md").write_text(pick.report)
+        else:
+            logger.error("No company left to research; skipping the pick stage")
+
+        if self.use_memory:
+            self.picker.memory_stores.flush_metrics()
+        result = ParallelRunResult(
+            run_id=run_id,
+            trending=trending,
+            research=research,
+            decision=decision,
+            pick=pick,
+            skipped=[c.ticker for c in skipped],
+            failed=outcome["failed"],
+            timings={k: round(v, 2) for k, v in timings.items()},
+        )
+        if self.history is not None:
+            self.history.record_run(
+                run_id, sector, run_started_at,
+                trending=trending,
+                research=researched,
+                pick=pick,
+                skipped=result.skipped,
+                failed=result.failed,
+                timings=result.timings,
+            )
+        if self.pick_index is not None:
+            # Recorded research and picks now cover these tickers
+            self.pick_index.release(c.ticker for c in candidates)
+        return result
@@ -0,0 +1,180 @@
+"""
+Content-addressed embedding cache for crew RAG memory.
+
+Embeddings are keyed by sha256(model, text) and persisted in SQLite, so text
+that has been embedded before (repeated task outputs, company names, user
+preferences) never goes back to the provider. Within a call, duplicate texts
+are embedded once and all misses go out in a single batched request.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+
+logger = logging.getLogger(__name__)
+
+OPENAI = "openai"
+LOCAL = "local"
+LOCAL_MODEL = "all-MiniLM-L6-v2"
+
+# OpenAI accepts up to 2048 inputs per embeddings request
+MAX_BATCH = 2048
+
+
+@dataclass
+class EmbeddingCacheConfig:
+    """Backend, model and storage settings for cached embeddings"""
+    db_path: str = "./memory/embedding_cache.db"
+    backend: str = OPENAI
+    model: str = "text-embedding-3-small"
+    memory_items: int = 4096
+
+    @classmethod
+    def from_env(cls) -> 'EmbeddingCacheConfig':
+        """Create config from environment variables"""
+        backend = os.getenv("MEMORY_EMBEDDING_BACKEND", OPENAI).lower()
+        if backend not in (OPENAI, LOCAL):
+            raise ValueError(f"Invalid MEMORY_EMBEDDING_BACKEND: {backend} (expected openai or local)")
+        default_model = LOCAL_MODEL if backend == LOCAL else "text-embedding-3-small"
+        return cls(
+            db_path=os.getenv("MEMORY_EMBEDDING_CACHE", "./memory/embedding_cache.db"),
+            backend=backend,
+            model=os.getenv("MEMORY_EMBEDDING_MODEL", default_model),
+            memory_items=int(os.getenv("MEMORY_EMBEDDING_CACHE_ITEMS", "4096")),
+        )
+
+
+class CachedEmbeddingFunction(EmbeddingFunction[Documents]):
+    """Chroma embedding function backed by a persistent content-addressed cache.
+
+    Use with crewAI's custom embedder provider:
+    {"provider": "custom", "config": {"embedder": CachedEmbeddingFunction()}}
+    """
+
+    def __init__(self, config: Optional[EmbeddingCacheConfig] = None):
+        self.config = config or EmbeddingCacheConfig.from_env()
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._backend = None
+        self.stats = {"hits": 0, "misses": 0, "provider_calls": 0, "texts_embedded": 0}
+        Path(self.config.db_path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    dims INTEGER NOT NULL,
+                    vector BLOB NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+
+    @property
+    def model_id(self) -> str:
+        return f"{self.config.backend}:{self.config.model}"
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.config.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_id}\0{text}".encode("utf-8")).hexdigest()
+
+    def _embed_with_provider(self, texts: List[str]) -> List[List[float]]:
+        if self.config.backend == LOCAL:
+            if self._backend is None:
+                # Chroma ships an ONNX build of all-MiniLM-L6-v2; no API round trip
+                from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+                self._backend = DefaultEmbeddingFunction()
+            with self._lock:
+                self.stats["provider_calls"] += 1
+            return [list(map(float, v)) for v in self._backend(texts)]
+
+        if self._backend is None:
+            from openai import OpenAI
+            self._backend = OpenAI()
+        vectors: List[List[float]] = []
+        for start in range(0, len(texts), MAX_BATCH):
+            response = self._backend.embeddings.create(
+                model=self.config.model,
+                input=texts[start:start + MAX_BATCH],
+            )
+            vectors.extend(item.embedding for item in sorted(response.data, key=lambda d: d.index))
+            with self._lock:
+                self.stats["provider_calls"] += 1
+        return vectors
+
+    def _remember(self, key: str, vector: List[float]):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.config.memory_items:
+            self._memory.popitem(last=False)
+
+    def __call__(self, input: Documents) -> Embeddings:
+        texts = list(input)
+        keys = [self._key(t) for t in texts]
+        found: Dict[str, List[float]] = {}
+
+        with self._lock:
+            for key in set(keys):
+                if key in self._memory:
+                    found[key] = self._memory[key]
+                    self._memory.move_to_end(key)
+
+        lookup = [k for k in set(keys) if k not in found]
+        if lookup:
+            with self._connect() as conn:
+                for start in range(0, len(lookup), 500):
+                    chunk = lookup[start:start + 500]
+                    rows = conn.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})",
+                        chunk,
+                    ).fetchall()
+                    for key, blob in rows:
+                        found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+
+        # One provider call for all distinct misses
+        misses: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                misses.setdefault(key, text)
+        if misses:
+            vectors = self._embed_with_provider(list(misses.values()))
+            now = time.time()
+            with self._connect() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, model, dims, vector, created_at) VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (key, self.model_id, len(vector), np.asarray(vector, dtype=np.float32).tobytes(), now)
+                        for key, vector in zip(misses, vectors)
+                    ],
+                )
+            found.update(zip(misses, vectors))
+
+        with self._lock:
+            for key in set(keys):
+                self._remember(key, found[key])
+            self.stats["texts_embedded"] += len(misses)
+            self.stats["misses"] += sum(1 for k in keys if k in misses)
+            self.stats["hits"] += sum(1 for k in keys if k not in misses)
+
+        return [np.asarray(found[key], dtype=np.float32) for key in keys]
+
+    def summary(self) -> Dict[str, float]:
+        """Cache counters plus the hit rate for this process"""
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        return stats
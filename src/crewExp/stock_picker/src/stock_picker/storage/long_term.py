@@ -0,0 +1,268 @@
+"""
+Tuned SQLite backend for crewAI long-term memory.
+
+Drop-in replacement for LTMSQLiteStorage: same table, but in WAL mode with a
+busy timeout (so concurrent crews don't trip over each other's locks), an
+index matching the task-description lookup, buffered batch writes and
+retention by age, score and per-task history length.
+
+Buffered rows are written once `batch_size` accumulate, and at the latest
+`flush_interval` seconds after the oldest one was saved (a background thread
+checks), on load and at exit. A process killed without running atexit
+(os._exit, SIGKILL) loses at most the last `flush_interval` seconds of
+memories; set LTM_FLUSH_INTERVAL=0 to write every save straight through.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+import atexit
+import json
+import logging
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+from crewai.memory.storage.ltm_sqlite_storage import LTMSQLiteStorage
+from crew_common import trace_span
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LongTermMemoryConfig:
+    """Write batching and retention settings for long-term memory"""
+    batch_size: int = 16
+    flush_interval: float = 2.0
+    max_age_days: float = 365.0
+    min_score: float = 0.0
+    max_per_task: int = 200
+
+    @classmethod
+    def from_env(cls) -> 'LongTermMemoryConfig':
+        """Create config from environment variables"""
+        return cls(
+            batch_size=int(os.getenv("LTM_BATCH_SIZE", "16")),
+            flush_interval=float(os.getenv("LTM_FLUSH_INTERVAL", "2")),
+            max_age_days=float(os.getenv("LTM_MAX_AGE_DAYS", "365")),
+            min_score=float(os.getenv("LTM_MIN_SCORE", "0")),
+            max_per_task=int(os.getenv("LTM_MAX_PER_TASK", "200")),
+        )
+
+
+class TunedLTMSQLiteStorage(LTMSQLiteStorage):
+    """LTMSQLiteStorage with WAL, indexed lookups, batched writes and pruning"""
+
+    def __init__(self, db_path: Optional[str] = None, config: Optional[LongTermMemoryConfig] = None):
+        self.config = config or LongTermMemoryConfig.from_env()
+        self._local = threading.local()
+        self._pending: List[Tuple[str, str, str, float]] = []
+        self._pending_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._flusher: Optional[threading.Thread] = None
+        super().__init__(db_path=db_path)
+        atexit.register(self.flush)
+
+    def _connection(self) -> sqlite3.Connection:
+        """One long-lived connection per thread"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            self._local.conn = conn
+        return conn
+
+    def _initialize_db(self):
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS long_term_memories (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        task_description TEXT,
+                        metadata TEXT,
+                        datetime TEXT,
+                        score REAL
+                    )
+                """)
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_ltm_task_datetime "
+                    "ON long_term_memories (task_description, datetime DESC, score)"
+                )
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_ltm_datetime ON long_term_memories (datetime)"
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Failed to initialize long-term memory database: {str(e)}")
+
+    def save(self, task_description: str, metadata: Dict[str, Any], datetime: str,
+             score: Union[int, float]) -> None:
+        """Buffer a memory; rows are written in batches"""
+        with self._pending_lock:
+            self._pending.append((task_description, json.dumps(metadata), datetime, score))
+            if len(self._pending) == 1:
+                self._last_flush = time.monotonic()
+            due = (
+                len(self._pending) >= self.config.batch_size
+                or time.monotonic() - self._last_flush >= self.config.flush_interval
+            )
+            if not due and self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, name="ltm-flush", daemon=True)
+                self._flusher.start()
+        if due:
+            self.flush()
+
+    def _flush_loop(self):
+        """Write buffered rows once the oldest has waited flush_interval seconds"""
+        while True:
+            time.sleep(max(self.config.flush_interval / 4, 0.05))
+            with self._pending_lock:
+                due = self._pending and time.monotonic() - self._last_flush >= self.config.flush_interval
+            if due:
+                self.flush()
+
+    def flush(self) -> int:
+        """Write all buffered memories in one transaction"""
+        with self._pending_lock:
+            rows, self._pending = self._pending, []
+            self._last_flush = time.monotonic()
+        if not rows:
+            return 0
+        try:
+            conn = self._connection()
+            with conn:
+                conn.executemany(
+                    "INSERT INTO long_term_memories (task_description, metadata, datetime, score) "
+                    "VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Failed to write {len(rows)} long-term memories: {str(e)}")
+            with self._pending_lock:
+                self._pending = rows + self._pending
+            return 0
+        return len(rows)
+
+    def load(self, task_description: str, latest_n: int) -> Optional[List[Dict[str, Any]]]:
+        """Latest memories for a task, served from the (task, datetime) index"""
+        self.flush()
+        try:
+            with trace_span("memory", "long_term.load", latest_n=latest_n):
+                rows = self._connection().execute(
+                    """
+                    SELECT metadata, datetime, score
+                    FROM long_term_memories
+                    WHERE task_description = ?
+                    ORDER BY datetime DESC, score ASC
+                    LIMIT ?
+                    """,
+                    (task_description, int(latest_n)),
+                ).fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to load long-term memories: {str(e)}")
+            return None
+        if rows:
+            return [
+                {"metadata": json.loads(row[0]), "datetime": row[1], "score": row[2]}
+                for row in rows
+            ]
+        return None
+
+    def reset(self) -> None:
+        with self._pending_lock:
+            self._pending = []
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM long_term_memories")
+        except sqlite3.Error as e:
+            logger.error(f"Failed to reset long-term memory: {str(e)}")
+
+    def prune(self) -> Dict[str, int]:
+        """Apply retention: age limit, minimum score and per-task history cap"""
+        self.flush()
+        removed = {"aged_out": 0, "low_score": 0, "over_cap": 0}
+        try:
+            conn = self._connection()
+            with conn:
+                if self.config.max_age_days > 0:
+                    # datetime holds epoch seconds as text, which sorts correctly
+                    cutoff = str(time.time() - self.config.max_age_days * 86400)
+                    removed["aged_out"] = conn.execute(
+                        "DELETE FROM long_term_memories WHERE datetime < ?", (cutoff,)
+                    ).rowcount
+                if self.config.min_score > 0:
+                    removed["low_score"] = conn.execute(
+                        "DELETE FROM long_term_memories WHERE score < ?", (self.config.min_score,)
+                    ).rowcount
+                if self.config.max_per_task > 0:
+                    removed["over_cap"] = conn.execute(
+                        """
+                        DELETE FROM long_term_memories WHERE id IN (
+                            SELECT id FROM (
+                                SELECT id, ROW_NUMBER() OVER (
+                                    PARTITION BY task_description ORDER BY datetime DESC
+                                ) AS rank
+                                FROM long_term_memories
+                            ) WHERE rank > ?
+                        )
+                        """,
+                        (self.config.max_per_task,),
+                    ).rowcount
+        except sqlite3.Error as e:
+            logger.error(f"Failed to prune long-term memory: {str(e)}")
+        return removed
+
+    def vacuum(self) -> None:
+        """Checkpoint the WAL and rebuild the file after pruning"""
+        self.flush()
+        conn = self._connection()
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute("VACUUM")
+
+
+def _seed(storage: LTMSQLiteStorage, tasks: int, rows: int):
+    now = time.time()
+    batch = [
+        (f"Task description number {i % tasks}", json.dumps({"suggestions": ["x"], "quality": 7}),
+         str(now - random.random() * 86400 * 30), float(random.randint(1, 10)))
+        for i in range(rows)
+    ]
+    with sqlite3.connect(storage.db_path) as conn:
+        conn.executemany(
+            "INSERT INTO long_term_memories (task_description, metadata, datetime, score) VALUES (?, ?, ?, ?)",
+            batch,
+        )
+
+
+def benchmark_lookup(rows: int = 20000, tasks: int = 200, lookups: int = 500,
+                     latest_n: int = 3) -> Dict[str, Dict[str, float]]:
+    """Compare task lookups on the stock and tuned storage over the same data"""
+    results: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, factory in (
+            ("baseline", lambda p: LTMSQLiteStorage(db_path=p)),
+            ("tuned", lambda p: TunedLTMSQLiteStorage(db_path=p)),
+        ):
+            storage = factory(str(Path(tmp) / f"{name}.db"))
+            random.seed(0)
+            _seed(storage, tasks, rows)
+            timings = []
+            for i in range(lookups):
+                started = time.perf_counter()
+                storage.load(f"Task description number {i % tasks}", latest_n)
+                timings.append(time.perf_counter() - started)
+            timings.sort()
+            results[name] = {
+                "rows": rows,
+                "avg_ms": round(sum(timings) / len(timings) * 1000, 3),
+                "p95_ms": round(timings[int(len(timings) * 0.95)] * 1000, 3),
+            }
+    return results
@@ -0,0 +1,271 @@
+"""
+Managed crew memory stores for StockPicker.
+
+Each memory kind gets its own Chroma collection, every entry is stamped with
+the time it was saved, and collections are compacted against a TTL and a size
+cap so lookups don't slow down as runs accumulate. Embeddings go through the
+content-addressed cache in embedding_cache.py.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from crewai.memory import EntityMemory, LongTermMemory, ShortTermMemory
+from crewai.memory.storage.rag_storage import RAGStorage
+from crew_common import trace_span
+
+from .embedding_cache import OPENAI, CachedEmbeddingFunction, EmbeddingCacheConfig
+from .long_term import LongTermMemoryConfig, TunedLTMSQLiteStorage
+
+logger = logging.getLogger(__name__)
+
+SHORT_TERM = "short_term"
+ENTITIES = "entities"
+
+@dataclass
+class MemoryStoreConfig:
+    """Location, retention and size settings for the crew memory stores"""
+    path: str = "./memory/"
+    embedding: EmbeddingCacheConfig = field(default_factory=EmbeddingCacheConfig)
+    long_term: LongTermMemoryConfig = field(default_factory=LongTermMemoryConfig)
+    short_term_ttl_days: float = 7.0
+    entity_ttl_days: float = 90.0
+    short_term_max_items: int = 2000
+    entity_max_items: int = 5000
+    compact_on_start: bool = True
+
+    @classmethod
+    def from_env(cls) -> 'MemoryStoreConfig':
+        """Create config from environment variables"""
+        return cls(
+            path=os.getenv("STOCK_PICKER_MEMORY_PATH", "./memory/"),
+            embedding=EmbeddingCacheConfig.from_env(),
+            long_term=LongTermMemoryConfig.from_env(),
+            short_term_ttl_days=float(os.getenv("MEMORY_SHORT_TERM_TTL_DAYS", "7")),
+            entity_ttl_days=float(os.getenv("MEMORY_ENTITY_TTL_DAYS", "90")),
+            short_term_max_items=int(os.getenv("MEMORY_SHORT_TERM_MAX_ITEMS", "2000")),
+            entity_max_items=int(os.getenv("MEMORY_ENTITY_MAX_ITEMS", "5000")),
+            compact_on_start=os.getenv("MEMORY_COMPACT_ON_START", "true").lower() in ("1", "true", "yes"),
+        )
+
+    def retention(self, kind: str) -> Dict[str, float]:
+        if kind == ENTITIES:
+            return {"ttl_days": self.entity_ttl_days, "max_items": self.entity_max_items}
+        return {"ttl_days": self.short_term_ttl_days, "max_items": self.short_term_max_items}
+
+
+class MemoryMetrics:
+    """In-process latency samples per memory kind and operation"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Dict[str, List[float]]] = {}
+
+    def record(self, kind: str, operation: str, seconds: float):
+        with self._lock:
+            self._samples.setdefault(kind, {}).setdefault(operation, []).append(seconds)
+
+    def summary(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        with self._lock:
+            samples = {k: {op: sorted(v) for op, v in ops.items()} for k, ops in self._samples.items()}
+        result: Dict[str, Dict[str, Dict[str, float]]] = {}
+        for kind, ops in samples.items():
+            for operation, values in ops.items():
+                result.setdefault(kind, {})[operation] = {
+                    "count": len(values),
+                    "avg_ms": round(sum(values) / len(values) * 1000, 2),
+                    "p95_ms": round(values[min(len(values) - 1, int(len(values) * 0.95))] * 1000, 2),
+                    "max_ms": round(values[-1] * 1000, 2),
+                }
+        return result
+
+
+class ManagedRAGStorage(RAGStorage):
+    """RAGStorage that timestamps saved entries and times every operation"""
+
+    def __init__(self, type: str, metrics: MemoryMetrics, **kwargs):
+        self.metrics = metrics
+        super().__init__(type=type, **kwargs)
+
+    def save(self, value: Any, metadata: Dict[str, Any]) -> None:
+        metadata = {**(metadata or {}), "saved_at": time.time()}
+        started = time.perf_counter()
+        try:
+            with trace_span("memory", f"{self.type}.save"):
+                super().save(value, metadata)
+        finally:
+            self.metrics.record(self.type, "save", time.perf_counter() - started)
+
+    def search(self, query: str, limit: int = 3, filter: Optional[dict] = None,
+               score_threshold: float = 0.35) -> List[Any]:
+        started = time.perf_counter()
+        try:
+            with trace_span("memory", f"{self.type}.search", limit=limit):
+                return super().search(query, limit=limit, filter=filter, score_threshold=score_threshold)
+        finally:
+            self.metrics.record(self.type, "search", time.perf_counter() - started)
+
+
+class MemoryStoreManager:
+    """Builds the crew's memory objects and keeps their stores compact"""
+
+    def __init__(self, config: Optional[MemoryStoreConfig] = None):
+        self.config = config or MemoryStoreConfig.from_env()
+        self.metrics = MemoryMetrics()
+        self._storages: Dict[str, ManagedRAGStorage] = {}
+        self._long_term: Optional[TunedLTMSQLiteStorage] = None
+        Path(self.config.path).mkdir(parents=True, exist_ok=True)
+        self.embedder = CachedEmbeddingFunction(self.config.embedding)
+
+    def _collection_name(self, kind: str) -> str:
+        # Local and OpenAI vectors differ in size, so they can't share a collection
+        if self.config.embedding.backend == OPENAI:
+            return kind
+        return f"{kind}_{self.config.embedding.backend}"
+
+    def storage(self, kind: str) -> ManagedRAGStorage:
+        """Return the (single) managed storage for a memory kind"""
+        if kind not in self._storages:
+            storage = ManagedRAGStorage(
+                type=self._collection_name(kind),
+                metrics=self.metrics,
+                embedder_config={"provider": "custom", "config": {"embedder": self.embedder}},
+                path=self.config.path,
+            )
+            self._storages[kind] = storage
+            if self.config.compact_on_start:
+                self.compact(kind)
+        return self._storages[kind]
+
+    def short_term_memory(self) -> ShortTermMemory:
+        return ShortTermMemory(storage=self.storage(SHORT_TERM))
+
+    def entity_memory(self) -> EntityMemory:
+        return EntityMemory(storage=self.storage(ENTITIES))
+
+    def long_term_storage(self) -> TunedLTMSQLiteStorage:
+        if self._long_term is None:
+            self._long_term = TunedLTMSQLiteStorage(
+                db_path=str(Path(self.config.path) / "long_term_memory_storage.db"),
+                config=self.config.long_term,
+            )
+            if self.config.compact_on_start:
+                self._long_term.prune()
+        return self._long_term
+
+    def long_term_memory(self) -> LongTermMemory:
+        return LongTermMemory(storage=self.long_term_storage())
+
+    def _move_legacy_entities(self) -> int:
+        """Move entity rows left in the short-term collection into the entities one.
+
+        Before the kinds were split, EntityMemory wrote to the short_term
+        collection too; its rows are the ones carrying `relationships`.
+        """
+        source = self.storage(SHORT_TERM).collection
+        entries = source.get(include=["metadatas", "documents", "embeddings"])
+        rows = [
+            i for i, meta in enumerate(entries["metadatas"])
+            if meta and "relationships" in meta and "agent" not in meta
+        ]
+        if not rows:
+            return 0
+        target = self.storage(ENTITIES).collection
+        now = time.time()
+        for start in range(0, len(rows), 500):
+            batch = rows[start:start + 500]
+            target.upsert(
+                ids=[entries["ids"][i] for i in batch],
+                documents=[entries["documents"][i] for i in batch],
+                embeddings=[entries["embeddings"][i] for i in batch],
+                metadatas=[{"saved_at": now, **entries["metadatas"][i]} for i in batch],
+            )
+            source.delete(ids=[entries["ids"][i] for i in batch])
+        logger.info(f"Moved {len(rows)} legacy entity memories out of the short-term collection")
+        return len(rows)
+
+    def compact(self, kind: str) -> Dict[str, int]:
+        """Drop entries past the TTL, then the oldest entries beyond the size cap.
+
+        Entries written before timestamps were added are stamped with the
+        time they are first seen here, so their TTL runs from the upgrade.
+        """
+        moved = self._move_legacy_entities() if kind == SHORT_TERM else 0
+        collection = self.storage(kind).collection
+        retention = self.config.retention(kind)
+        now = time.time()
+        cutoff = now - retention["ttl_days"] * 86400
+
+        entries = collection.get(include=["metadatas"])
+        unstamped = [
+            (id_, meta or {}) for id_, meta in zip(entries["ids"], entries["metadatas"])
+            if "saved_at" not in (meta or {})
+        ]
+        for start in range(0, len(unstamped), 500):
+            batch = unstamped[start:start + 500]
+            collection.update(
+                ids=[id_ for id_, _ in batch],
+                metadatas=[{**meta, "saved_at": now} for _, meta in batch],
+            )
+        stamped = [
+            (id_, (meta or {}).get("saved_at", now))
+            for id_, meta in zip(entries["ids"], entries["metadatas"])
+        ]
+        expired = [id_ for id_, saved_at in stamped if saved_at < cutoff]
+        kept = sorted((s for s in stamped if s[1] >= cutoff), key=lambda s: s[1])
+        overflow = max(0, len(kept) - int(retention["max_items"]))
+        evicted = [id_ for id_, _ in kept[:overflow]]
+
+        to_delete = expired + evicted
+        for start in range(0, len(to_delete), 500):
+            collection.delete(ids=to_delete[start:start + 500])
+        if to_delete or unstamped:
+            logger.info(f"Compacted {kind} memory: {len(expired)} expired, {len(evicted)} evicted, "
+                        f"{len(unstamped)} legacy entries stamped")
+        return {
+            "expired": len(expired),
+            "evicted": len(evicted),
+            "stamped": len(unstamped),
+            "moved": moved,
+            "remaining": len(kept) - overflow,
+        }
+
+    def vacuum(self) -> Dict[str, Any]:
+        """Compact every collection and reclaim space in the Chroma database"""
+        results = {kind: self.compact(kind) for kind in (SHORT_TERM, ENTITIES)}
+        long_term = self.long_term_storage()
+        results["long_term"] = long_term.prune()
+        long_term.vacuum()
+        db_path = Path(self.config.path) / "chroma.sqlite3"
+        before = db_path.stat().st_size if db_path.exists() else 0
+        if db_path.exists():
+            with sqlite3.connect(db_path) as conn:
+                conn.execute("VACUUM")
+        after = db_path.stat().st_size if db_path.exists() else 0
+        return {"collections": results, "db_bytes_before": before, "db_bytes_after": after}
+
+    def stats(self) -> Dict[str, Any]:
+        """Collection sizes, on-disk footprint and retrieval latency"""
+        path = Path(self.config.path)
+        disk_bytes = sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+        return {
+            "collections": {kind: storage.collection.count() for kind, storage in self._storages.items()},
+            "disk_bytes": disk_bytes,
+            "latency": self.metrics.summary(),
+            "embedding_cache": self.embedder.summary(),
+        }
+
+    def flush_metrics(self) -> Dict[str, Any]:
+        """Append this process's stats to memory_metrics.jsonl and return them"""
+        stats = {"timestamp": datetime.now().isoformat(), **self.stats()}
+        with open(Path(self.config.path) / "memory_metrics.jsonl", "a") as f:
+            f.write(json.dumps(stats) + "\n")
+        return stats
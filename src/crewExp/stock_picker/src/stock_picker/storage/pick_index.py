@@ -0,0 +1,101 @@
+"""
+Ticker-level dedup of companies found, researched and picked.
+
+"Don't pick the same company twice" used to rely on the LLM recalling fuzzy
+RAG memory. This index answers it deterministically from the run history:
+a ticker is covered once it has been picked, or researched within the
+recheck window. The only state it adds is a claim per ticker, kept in the
+run history database, so concurrent sector runs don't research the same
+company while neither has recorded its run yet.
+"""
+
+from dataclasses import dataclass
+from typing import Any, ContextManager, Dict, Iterable, List, Optional, Set, Tuple
+import os
+import sqlite3
+import time
+
+from stock_picker.crew import TrendingCompany
+from stock_picker.storage.run_history import RunHistory
+
+
+@dataclass
+class PickIndexConfig:
+    """Exclusion rules for the pick index"""
+    recheck_days: float = 30.0
+    claim_seconds: float = 3600.0
+
+    @classmethod
+    def from_env(cls) -> 'PickIndexConfig':
+        """Create config from environment variables"""
+        return cls(
+            recheck_days=float(os.getenv("PICK_INDEX_RECHECK_DAYS", "30")),
+            claim_seconds=float(os.getenv("PICK_INDEX_CLAIM_SECONDS", "3600")),
+        )
+
+
+class PickIndex:
+    """Dedup of candidate tickers against the run history, plus in-flight claims"""
+
+    def __init__(self, config: Optional[PickIndexConfig] = None, history: Optional[RunHistory] = None):
+        self.config = config or PickIndexConfig.from_env()
+        self.history = history or RunHistory()
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS claims (
+                    ticker TEXT PRIMARY KEY,
+                    claimed_at REAL NOT NULL
+                )
+            """)
+
+    def _connect(self) -> ContextManager[sqlite3.Connection]:
+        return self.history._connect()
+
+    def release(self, tickers: Iterable[str]):
+        """Drop claims once their run is recorded, or its research failed, so the history decides"""
+        with self._connect() as conn:
+            conn.executemany("DELETE FROM claims WHERE ticker = ?", [(t.upper(),) for t in tickers])
+
+    def _excluded(self, conn: sqlite3.Connection, now: float) -> Set[str]:
+        covered = self.history.covered_tickers(now - self.config.recheck_days * 86400, conn=conn)
+        rows = conn.execute(
+            "SELECT ticker FROM claims WHERE claimed_at >= ?", (now - self.config.claim_seconds,),
+        ).fetchall()
+        return covered | {row[0] for row in rows}
+
+    def excluded_tickers(self) -> Set[str]:
+        """Tickers already picked, researched within the recheck window, or being researched"""
+        with self._connect() as conn:
+            return self._excluded(conn, time.time())
+
+    def filter(self, companies: List[TrendingCompany]) -> Tuple[List[TrendingCompany], List[TrendingCompany]]:
+        """Split candidates into (new, already covered), dropping duplicate tickers.
+
+        Kept tickers are claimed in the same transaction, so sector runs in
+        other processes skip them while this run researches them.
+        """
+        now = time.time()
+        kept: List[TrendingCompany] = []
+        dropped: List[TrendingCompany] = []
+        conn = self.history._open()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            excluded = self._excluded(conn, now)
+            for company in companies:
+                ticker = company.ticker.upper()
+                if ticker in excluded:
+                    dropped.append(company)
+                else:
+                    kept.append(company)
+                    excluded.add(ticker)
+            conn.executemany(
+                "INSERT OR REPLACE INTO claims (ticker, claimed_at) VALUES (?, ?)",
+                [(c.ticker.upper(), now) for c in kept],
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        return kept, dropped
+
+    def picks(self, limit: int = 100) -> List[Dict[str, Any]]:
+        return self.history.picks(limit=limit)
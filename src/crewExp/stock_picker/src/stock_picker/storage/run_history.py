@@ -0,0 +1,328 @@
+"""
+Append-only history of every StockPicker run.
+
+The crew overwrites output/trending_companies.json, research_report.json and
+decision.md on each run. This store keeps every run's trending list, research
+and decision with its sector and timestamps in indexed SQLite tables, so
+backtests and "have we seen this before" checks are local queries instead of
+file scans or memory recall. The pick index (pick_index.py) dedups candidates
+against it. Rows are only ever inserted.
+"""
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+import json
+import os
+import sqlite3
+import time
+
+from stock_picker.crew import (
+    CompanyPick,
+    TrendingCompanyList,
+    TrendingCompanyResearch,
+    TrendingCompanyResearchList,
+)
+
+# Epoch seconds, a datetime, or an ISO date/datetime string
+When = Union[float, int, datetime, str]
+
+
+@dataclass
+class RunHistoryConfig:
+    """Location of the run history database"""
+    db_path: str = "./memory/run_history.db"
+
+    @classmethod
+    def from_env(cls) -> 'RunHistoryConfig':
+        """Create config from environment variables"""
+        return cls(db_path=os.getenv("STOCK_PICKER_RUN_HISTORY", "./memory/run_history.db"))
+
+
+def to_timestamp(value: When) -> float:
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.timestamp()
+
+
+class RunHistory:
+    """SQLite store of every run's trending companies, research and decision"""
+
+    def __init__(self, config: Optional[RunHistoryConfig] = None):
+        self.config = config or RunHistoryConfig.from_env()
+        Path(self.config.db_path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS runs (
+                    run_id TEXT PRIMARY KEY,
+                    sector TEXT NOT NULL,
+                    mode TEXT NOT NULL,
+                    started_at REAL NOT NULL,
+                    finished_at REAL NOT NULL,
+                    pick_ticker TEXT,
+                    skipped TEXT,
+                    failed TEXT,
+                    timings TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_runs_sector ON runs (sector, finished_at);
+                CREATE INDEX IF NOT EXISTS idx_runs_finished ON runs (finished_at);
+                CREATE TABLE IF NOT EXISTS trending (
+                    run_id TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    ticker TEXT NOT NULL,
+                    name TEXT,
+                    reason TEXT,
+                    sector TEXT NOT NULL,
+                    found_at REAL NOT NULL,
+                    PRIMARY KEY (run_id, position)
+                );
+                CREATE INDEX IF NOT EXISTS idx_trending_ticker ON trending (ticker, found_at);
+                CREATE INDEX IF NOT EXISTS idx_trending_sector ON trending (sector, found_at);
+                CREATE TABLE IF NOT EXISTS research (
+                    run_id TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    ticker TEXT,
+                    name TEXT NOT NULL,
+                    market_position TEXT,
+                    future_outlook TEXT,
+                    investment_potential TEXT,
+                    sector TEXT NOT NULL,
+                    researched_at REAL NOT NULL,
+                    PRIMARY KEY (run_id, position)
+                );
+                CREATE INDEX IF NOT EXISTS idx_research_ticker ON research (ticker, researched_at);
+                CREATE TABLE IF NOT EXISTS decisions (
+                    run_id TEXT PRIMARY KEY,
+                    ticker TEXT,
+                    name TEXT,
+                    rationale TEXT,
+                    report TEXT NOT NULL,
+                    sector TEXT NOT NULL,
+                    decided_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_decisions_ticker ON decisions (ticker, decided_at);
+                CREATE INDEX IF NOT EXISTS idx_decisions_sector ON decisions (sector, decided_at);
+                CREATE INDEX IF NOT EXISTS idx_decisions_decided ON decisions (decided_at);
+            """)
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.config.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """One transaction on a fresh connection, closed on exit"""
+        conn = self._open()
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def record_run(self, run_id: str, sector: str, started_at: float,
+                   trending: Optional[TrendingCompanyList] = None,
+                   research: Iterable[Tuple[Optional[str], TrendingCompanyResearch]] = (),
+                   pick: Optional[CompanyPick] = None,
+                   decision_text: Optional[str] = None,
+                   mode: str = "parallel",
+                   skipped: Iterable[str] = (),
+                   failed: Optional[Dict[str, str]] = None,
+                   timings: Optional[Dict[str, float]] = None):
+        """Append one run and everything it produced, in a single transaction.
+
+        `research` is (ticker, research) pairs, since the research output itself
+        has no ticker; the caller knows which company each task was given.
+        `pick` is the structured decision of a staged run; `decision_text` is
+        the free-text decision of a hierarchical crew run, which has no ticker.
+        """
+        now = time.time()
+        companies = trending.companies if trending else []
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO runs (run_id, sector, mode, started_at, finished_at, pick_ticker, skipped, failed, timings)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (run_id, sector, mode, started_at, now, pick.ticker.upper() if pick else None,
+                 json.dumps(list(skipped)), json.dumps(failed or {}), json.dumps(timings or {})),
+            )
+            conn.executemany(
+                "INSERT INTO trending (run_id, position, ticker, name, reason, sector, found_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, i, c.ticker.upper(), c.name, c.reason, sector, now) for i, c in enumerate(companies)],
+            )
+            conn.executemany(
+                """
+                INSERT INTO research (run_id, position, ticker, name, market_position, future_outlook,
+                                      investment_potential, sector, researched_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (run_id, i, ticker.upper() if ticker else None, r.name, r.market_position,
+                     r.future_outlook, r.investment_potential, sector, now)
+                    for i, (ticker, r) in enumerate(research)
+                ],
+            )
+            if pick is not None or decision_text:
+                conn.execute(
+                    """
+                    INSERT INTO decisions (run_id, ticker, name, rationale, report, sector, decided_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (run_id, pick.ticker.upper() if pick else None, pick.name if pick else None,
+                     pick.rationale if pick else None, pick.report if pick else decision_text, sector, now),
+                )
+
+    @staticmethod
+    def _filters(column: str, ticker: Optional[str], sector: Optional[str],
+                 since: Optional[When], until: Optional[When]):
+        clauses, params = [], []
+        if ticker:
+            clauses.append("ticker = ?")
+            params.append(ticker.upper())
+        if sector:
+            clauses.append("sector = ?")
+            params.append(sector)
+        if since is not None:
+            clauses.append(f"{column} >= ?")
+            params.append(to_timestamp(since))
+        if until is not None:
+            clauses.append(f"{column} < ?")
+            params.append(to_timestamp(until))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def picks(self, ticker: Optional[str] = None, sector: Optional[str] = None,
+              since: Optional[When] = None, until: Optional[When] = None,
+              limit: int = 100, with_report: bool = False) -> List[Dict[str, Any]]:
+        """Decisions, newest first, filtered by ticker, sector and date range"""
+        where, params = self._filters("decided_at", ticker, sector, since, until)
+        columns = "run_id, ticker, name, rationale, sector, decided_at" + (", report" if with_report else "")
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT {columns} FROM decisions{where} ORDER BY decided_at DESC LIMIT ?",
+                (*params, limit),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def trending(self, ticker: Optional[str] = None, sector: Optional[str] = None,
+                 since: Optional[When] = None, until: Optional[When] = None,
+                 limit: int = 1000) -> List[Dict[str, Any]]:
+        """Trending-company findings, newest first"""
+        where, params = self._filters("found_at", ticker, sector, since, until)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT run_id, ticker, name, reason, sector, found_at FROM trending{where} "
+                "ORDER BY found_at DESC LIMIT ?",
+                (*params, limit),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def research(self, ticker: str, since: Optional[When] = None, until: Optional[When] = None,
+                 limit: int = 20) -> List[TrendingCompanyResearch]:
+        """Past research on a ticker, newest first"""
+        where, params = self._filters("researched_at", ticker, None, since, until)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT name, market_position, future_outlook, investment_potential FROM research{where} "
+                "ORDER BY researched_at DESC LIMIT ?",
+                (*params, limit),
+            ).fetchall()
+        return [TrendingCompanyResearch(**dict(row)) for row in rows]
+
+    def runs(self, sector: Optional[str] = None, since: Optional[When] = None,
+             until: Optional[When] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Run summaries, newest first"""
+        where, params = self._filters("finished_at", None, sector, since, until)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT * FROM runs{where} ORDER BY finished_at DESC LIMIT ?",
+                (*params, limit),
+            ).fetchall()
+        result = []
+        for row in rows:
+            run = dict(row)
+            for key in ("skipped", "failed", "timings"):
+                run[key] = json.loads(run[key]) if run[key] else None
+            result.append(run)
+        return result
+
+    def get_run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """One run with its outputs rebuilt as the crew's models"""
+        with self._connect() as conn:
+            run = conn.execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+            if run is None:
+                return None
+            trending = conn.execute(
+                "SELECT name, ticker, reason FROM trending WHERE run_id = ? ORDER BY position", (run_id,),
+            ).fetchall()
+            research = conn.execute(
+                "SELECT name, market_position, future_outlook, investment_potential FROM research "
+                "WHERE run_id = ? ORDER BY position", (run_id,),
+            ).fetchall()
+            decision = conn.execute("SELECT * FROM decisions WHERE run_id = ?", (run_id,)).fetchone()
+        pick = None
+        if decision is not None and decision["ticker"]:
+            pick = CompanyPick(name=decision["name"], ticker=decision["ticker"],
+                               rationale=decision["rationale"] or "", report=decision["report"])
+        return {
+            **dict(run),
+            "trending": TrendingCompanyList(companies=[dict(row) for row in trending]),
+            "research": TrendingCompanyResearchList(research_list=[dict(row) for row in research]),
+            "pick": pick,
+            "decision": decision["report"] if decision is not None else None,
+        }
+
+    def ticker_summary(self, ticker: str) -> Dict[str, Any]:
+        """How often a ticker was found, researched and picked, and when"""
+        ticker = ticker.upper()
+        with self._connect() as conn:
+            found = conn.execute(
+                "SELECT COUNT(*), MIN(found_at), MAX(found_at) FROM trending WHERE ticker = ?", (ticker,),
+            ).fetchone()
+            researched = conn.execute(
+                "SELECT COUNT(*), MAX(researched_at) FROM research WHERE ticker = ?", (ticker,),
+            ).fetchone()
+            picked = conn.execute(
+                "SELECT COUNT(*), MAX(decided_at) FROM decisions WHERE ticker = ?", (ticker,),
+            ).fetchone()
+        return {
+            "ticker": ticker,
+            "times_found": found[0],
+            "first_found_at": found[1],
+            "last_found_at": found[2],
+            "times_researched": researched[0],
+            "last_researched_at": researched[1],
+            "times_picked": picked[0],
+            "last_picked_at": picked[1],
+        }
+
+    def seen_since(self, tickers: Iterable[str], since: When) -> Set[str]:
+        """Which of these tickers were found in any run since a point in time"""
+        wanted = [t.upper() for t in tickers]
+        if not wanted:
+            return set()
+        placeholders = ", ".join("?" for _ in wanted)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT DISTINCT ticker FROM trending WHERE ticker IN ({placeholders}) AND found_at >= ?",
+                (*wanted, to_timestamp(since)),
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def covered_tickers(self, researched_since: When,
+                        conn: Optional[sqlite3.Connection] = None) -> Set[str]:
+        """Tickers ever picked, or researched since a point in time"""
+        query = (
+            "SELECT ticker FROM decisions WHERE ticker IS NOT NULL "
+            "UNION SELECT ticker FROM research WHERE ticker IS NOT NULL AND researched_at >= ?"
+        )
+        params = (to_timestamp(researched_since),)
+        if conn is not None:
+            return {row[0] for row in conn.execute(query, params).fetchall()}
+        with self._connect() as conn:
+            return {row[0] for row in conn.execute(query, params).fetchall()}
@@ -0,0 +1,120 @@
+"""
+Multi-sector sweep for the StockPicker crew.
+
+Each sector runs the staged crew (parallel.py) in its own worker process, with
+at most `max_workers` sectors at a time. Workers run without RAG memory (Chroma
+isn't safe to share across processes) and rely on the pick index instead to
+skip companies the run history shows were already researched or picked,
+including ones another sector claimed moments earlier.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+
+from stock_picker.parallel import ParallelStockPicker
+from stock_picker.storage.pick_index import PickIndex
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SECTORS = [
+    "Technology",
+    "Healthcare",
+    "Financials",
+    "Energy",
+    "Consumer Discretionary",
+    "Industrials",
+]
+
+
+@dataclass
+class SweepConfig:
+    """Sectors, pool size and output location for a sweep"""
+    sectors: List[str] = field(default_factory=lambda: list(DEFAULT_SECTORS))
+    max_workers: int = 4
+    research_concurrency: int = 3
+    output_dir: str = "output/sweep"
+
+    @classmethod
+    def from_env(cls) -> 'SweepConfig':
+        """Create config from environment variables"""
+        sectors = os.getenv("STOCK_PICKER_SECTORS")
+        return cls(
+            sectors=[s.strip() for s in sectors.split(",") if s.strip()] if sectors else list(DEFAULT_SECTORS),
+            max_workers=int(os.getenv("STOCK_PICKER_SWEEP_WORKERS", "4")),
+            research_concurrency=int(os.getenv("STOCK_PICKER_RESEARCH_CONCURRENCY", "3")),
+            output_dir=os.getenv("STOCK_PICKER_SWEEP_OUTPUT", "output/sweep"),
+        )
+
+
+def _slug(sector: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", sector.lower()).strip("_")
+
+
+def run_sector(sector: str, output_dir: str, research_concurrency: int) -> Dict[str, Any]:
+    """Run one sector end to end; executed in a worker process"""
+    started = time.perf_counter()
+    picker = ParallelStockPicker(
+        max_concurrency=research_concurrency,
+        pick_index=PickIndex(),
+        output_dir=output_dir,
+        use_memory=False,
+    )
+    result = asyncio.run(picker.run({"sector": sector, "current_date": str(datetime.now())}))
+    return {
+        "sector": sector,
+        "run_id": result.run_id,
+        "pick": result.pick.model_dump(exclude={"report"}) if result.pick else None,
+        "found": [c.ticker for c in result.trending.companies],
+        "skipped": result.skipped,
+        "failed": result.failed,
+        "timings": result.timings,
+        "elapsed": round(time.perf_counter() - started, 2),
+        "output_dir": output_dir,
+    }
+
+
+def run_sweep(sectors: Optional[List[str]] = None, config: Optional[SweepConfig] = None) -> Dict[str, Any]:
+    """Run every sector in a bounded process pool and write summary.json"""
+    config = config or SweepConfig.from_env()
+    sectors = sectors or config.sectors
+    workers = max(1, min(len(sectors), os.cpu_count() or 1, config.max_workers))
+    root = Path(config.output_dir)
+    root.mkdir(parents=True, exist_ok=True)
+    # Create the history and claim schemas once, before workers race to do it
+    PickIndex()
+
+    started = time.perf_counter()
+    results: List[Dict[str, Any]] = []
+    errors: Dict[str, str] = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(run_sector, sector, str(root / _slug(sector)), config.research_concurrency): sector
+            for sector in sectors
+        }
+        for future in as_completed(futures):
+            sector = futures[future]
+            try:
+                results.append(future.result())
+                logger.info(f"Sector {sector} finished")
+            except Exception as e:
+                logger.error(f"Sector {sector} failed: {str(e)}")
+                errors[sector] = str(e)
+
+    summary = {
+        "timestamp": datetime.now().isoformat(),
+        "workers": workers,
+        "elapsed": round(time.perf_counter() - started, 2),
+        "sectors": sorted(results, key=lambda r: sectors.index(r["sector"])),
+        "errors": errors,
+    }
+    (root / "summary.json").write_text(json.dumps(summary, indent=2))
+    return summary
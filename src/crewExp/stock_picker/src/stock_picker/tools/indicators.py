@@ -0,0 +1,149 @@
+"""
+Vectorized technical indicators computed locally from daily closes.
+
+All functions take a 1-D float array ordered oldest to newest and return an
+array of the same length, with NaN where the indicator is not yet defined.
+Seeding follows the usual TA conventions (EMA seeded with the SMA of the
+first window, Wilder smoothing for RSI) so values line up with Polygon's
+server-side indicators.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+import math
+
+import numpy as np
+
+
+def sma(values: np.ndarray, window: int) -> np.ndarray:
+    """Simple moving average using a cumulative-sum difference"""
+    values = np.asarray(values, dtype=float)
+    out = np.full(values.shape, np.nan)
+    if window <= 0 or len(values) < window:
+        return out
+    csum = np.cumsum(np.insert(values, 0, 0.0))
+    out[window - 1:] = (csum[window:] - csum[:-window]) / window
+    return out
+
+
+def _smooth(values: np.ndarray, alpha: float, seed: float) -> np.ndarray:
+    """Exponential smoothing y_t = (1 - alpha) * y_{t-1} + alpha * x_t.
+
+    Evaluated in closed form per block: y_k = d^k * (y_0 + alpha * sum_j x_j d^-j).
+    Blocks are sized so d^-k stays well inside float64 range.
+    """
+    decay = 1.0 - alpha
+    if len(values) == 0:
+        return np.empty(0)
+    if decay <= 0.0:
+        return values.astype(float).copy()
+    block = max(1, int(100 / -math.log10(decay)))
+    out = np.empty(len(values))
+    prev = seed
+    for start in range(0, len(values), block):
+        chunk = values[start:start + block]
+        k = np.arange(1, len(chunk) + 1)
+        inv_powers = decay ** -k
+        out[start:start + len(chunk)] = (decay ** k) * (prev + alpha * np.cumsum(chunk * inv_powers))
+        prev = out[start + len(chunk) - 1]
+    return out
+
+
+def ema(values: np.ndarray, window: int) -> np.ndarray:
+    """Exponential moving average seeded with the SMA of the first window"""
+    values = np.asarray(values, dtype=float)
+    out = np.full(values.shape, np.nan)
+    valid = np.flatnonzero(~np.isnan(values))
+    if window <= 0 or len(valid) < window:
+        return out
+    start = valid[0]
+    series = values[start:]
+    seed = series[:window].mean()
+    out[start + window - 1] = seed
+    out[start + window:] = _smooth(series[window:], 2.0 / (window + 1), seed)
+    return out
+
+
+def macd(values: np.ndarray, short_window: int = 12, long_window: int = 26,
+         signal_window: int = 9) -> Dict[str, np.ndarray]:
+    """MACD line, signal line and histogram"""
+    line = ema(values, short_window) - ema(values, long_window)
+    signal = ema(line, signal_window)
+    return {"value": line, "signal": signal, "histogram": line - signal}
+
+
+def rsi(values: np.ndarray, window: int = 14) -> np.ndarray:
+    """Relative strength index with Wilder smoothing"""
+    values = np.asarray(values, dtype=float)
+    out = np.full(values.shape, np.nan)
+    if window <= 0 or len(values) <= window:
+        return out
+    delta = np.diff(values)
+    gains = np.clip(delta, 0, None)
+    losses = np.clip(-delta, 0, None)
+    alpha = 1.0 / window
+    avg_gain = np.concatenate(([gains[:window].mean()],
+                               _smooth(gains[window:], alpha, gains[:window].mean())))
+    avg_loss = np.concatenate(([losses[:window].mean()],
+                               _smooth(losses[window:], alpha, losses[:window].mean())))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = avg_gain / avg_loss
+        out[window:] = np.where(avg_loss == 0, 100.0, 100.0 - 100.0 / (1.0 + rs))
+    return out
+
+
+def bollinger(values: np.ndarray, window: int = 20, k: float = 2.0) -> Dict[str, np.ndarray]:
+    """Bollinger bands around the SMA using the rolling population std"""
+    values = np.asarray(values, dtype=float)
+    middle = sma(values, window)
+    mean_sq = sma(values ** 2, window)
+    std = np.sqrt(np.clip(mean_sq - middle ** 2, 0, None))
+    return {"middle": middle, "upper": middle + k * std, "lower": middle - k * std}
+
+
+def compact(values: np.ndarray, points: int, digits: int = 4) -> List[Optional[float]]:
+    """Last `points` values as a rounded list, NaN mapped to None"""
+    tail = np.round(np.asarray(values, dtype=float)[-points:], digits)
+    return [None if math.isnan(v) else float(v) for v in tail]
+
+
+def validate_macd_windows(windows: Iterable[int]) -> Tuple[int, int, int]:
+    """Check MACD windows are (short, long, signal) positive integers"""
+    windows = tuple(windows)
+    if len(windows) != 3:
+        raise ValueError(f"macd_windows needs exactly 3 values (short, long, signal), got {list(windows)}")
+    if any(int(w) != w or w <= 0 for w in windows):
+        raise ValueError(f"macd_windows must be positive integers, got {list(windows)}")
+    return tuple(int(w) for w in windows)
+
+
+def compute_indicators(closes: np.ndarray,
+                       sma_windows: Iterable[int] = (50,),
+                       ema_windows: Iterable[int] = (50,),
+                       macd_windows: Iterable[int] = (12, 26, 9),
+                       rsi_window: Optional[int] = 14,
+                       bollinger_window: Optional[int] = 20,
+                       bollinger_k: float = 2.0,
+                       points: int = 30) -> Dict[str, object]:
+    """Compute the requested indicator set, returning compact trailing arrays"""
+    closes = np.asarray(closes, dtype=float)
+    result: Dict[str, object] = {
+        "sma": {str(w): compact(sma(closes, w), points) for w in sma_windows},
+        "ema": {str(w): compact(ema(closes, w), points) for w in ema_windows},
+    }
+    if macd_windows:
+        short_window, long_window, signal_window = validate_macd_windows(macd_windows)
+        result["macd"] = {
+            "windows": [short_window, long_window, signal_window],
+            **{name: compact(series, points)
+               for name, series in macd(closes, short_window, long_window, signal_window).items()},
+        }
+    if rsi_window:
+        result["rsi"] = {str(rsi_window): compact(rsi(closes, rsi_window), points, 2)}
+    if bollinger_window:
+        result["bollinger"] = {
+            "window": bollinger_window,
+            "k": bollinger_k,
+            **{name: compact(series, points)
+               for name, series in bollinger(closes, bollinger_window, bollinger_k).items()},
+        }
+    return result
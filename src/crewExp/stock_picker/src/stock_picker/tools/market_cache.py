@@ -0,0 +1,250 @@
+"""
+Local on-disk cache for Polygon market data.
+
+Entries live in a small SQLite database and expire according to how often the
+underlying data actually changes:
+
+- reference data (ticker details) keeps for a few days
+- financials keep until the next quarterly filing is due
+- daily indicators expire at the next US market close
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time as clock
+
+logger = logging.getLogger(__name__)
+
+MARKET_TZ = ZoneInfo("America/New_York")
+MARKET_CLOSE = time(16, 0)
+
+REFERENCE = "reference"
+FINANCIALS = "financials"
+INDICATORS = "indicators"
+
+
+@dataclass
+class MarketCacheConfig:
+    """Location and expiry settings for the market data cache"""
+    db_path: str = "./cache/market_data.db"
+    reference_ttl_days: float = 3.0
+    filing_interval_days: int = 100
+    stats_flush_seconds: float = 60.0
+    enabled: bool = True
+
+    @classmethod
+    def from_env(cls) -> 'MarketCacheConfig':
+        """Create config from environment variables"""
+        return cls(
+            db_path=os.getenv("STOCK_PICKER_MARKET_CACHE", "./cache/market_data.db"),
+            reference_ttl_days=float(os.getenv("MARKET_CACHE_REFERENCE_TTL_DAYS", "3")),
+            filing_interval_days=int(os.getenv("MARKET_CACHE_FILING_INTERVAL_DAYS", "100")),
+            stats_flush_seconds=float(os.getenv("MARKET_CACHE_STATS_FLUSH_SECONDS", "60")),
+            enabled=os.getenv("MARKET_CACHE_DISABLED", "").lower() not in ("1", "true", "yes"),
+        )
+
+
+def next_market_close(now: Optional[datetime] = None) -> datetime:
+    """Return the next 16:00 America/New_York close after `now`.
+
+    Weekends are skipped; exchange holidays are not, which only costs an
+    extra refetch on those days.
+    """
+    now = (now or datetime.now(timezone.utc)).astimezone(MARKET_TZ)
+    candidate = datetime.combine(now.date(), MARKET_CLOSE, tzinfo=MARKET_TZ)
+    if now >= candidate:
+        candidate += timedelta(days=1)
+    while candidate.weekday() >= 5:
+        candidate += timedelta(days=1)
+    return candidate.astimezone(timezone.utc)
+
+
+def _latest_filing_date(financials: List[Dict[str, Any]]) -> Optional[date]:
+    dates = []
+    for item in financials or []:
+        filing_date = item.get("filing_date") if isinstance(item, dict) else None
+        if filing_date:
+            try:
+                dates.append(date.fromisoformat(filing_date))
+            except ValueError:
+                continue
+    return max(dates) if dates else None
+
+
+class MarketDataCache:
+    """SQLite-backed cache of Polygon responses with data-aware expiry.
+
+    Lookups run on the shared tool loop, so they only read: each thread
+    reuses one connection, and hit/miss counts are kept in memory and
+    written out every `stats_flush_seconds`, on stats() and at exit.
+    """
+
+    def __init__(self, config: Optional[MarketCacheConfig] = None):
+        self.config = config or MarketCacheConfig.from_env()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._session_stats: Dict[str, Dict[str, int]] = {}
+        self._unflushed: Dict[str, Dict[str, int]] = {}
+        self._flushed_at = clock.monotonic()
+        Path(self.config.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._initialize_db()
+        atexit.register(self.flush_stats)
+
+    def _connect(self) -> sqlite3.Connection:
+        """This thread's connection, opened on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.config.db_path, timeout=30)
+            self._local.conn = conn
+        return conn
+
+    def _initialize_db(self):
+        with self._connect() as conn:
+            # WAL is a property of the database file; setting it once is enough
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS market_data (
+                    kind TEXT NOT NULL,
+                    ticker TEXT NOT NULL,
+                    part TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    PRIMARY KEY (ticker, part)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_stats (
+                    kind TEXT PRIMARY KEY,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    misses INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+
+    def expires_at(self, kind: str, payload: Any, now: Optional[datetime] = None) -> datetime:
+        """Compute when a freshly fetched payload of the given kind goes stale"""
+        now = now or datetime.now(timezone.utc)
+        if kind == REFERENCE:
+            return now + timedelta(days=self.config.reference_ttl_days)
+        if kind == FINANCIALS:
+            latest = _latest_filing_date(payload)
+            if latest is not None:
+                due = datetime.combine(
+                    latest + timedelta(days=self.config.filing_interval_days),
+                    MARKET_CLOSE,
+                    tzinfo=MARKET_TZ,
+                ).astimezone(timezone.utc)
+                if due > now:
+                    return due
+            # Overdue or unknown filing: re-check once per trading day
+            return next_market_close(now)
+        return next_market_close(now)
+
+    def get(self, kind: str, ticker: str, part: str) -> Tuple[bool, Any]:
+        """Return (hit, payload) for a cached part, counting the lookup"""
+        if not self.config.enabled:
+            return False, None
+        now = datetime.now(timezone.utc).timestamp()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT payload FROM market_data WHERE ticker = ? AND part = ? AND expires_at > ?",
+                (ticker.upper(), part, now),
+            ).fetchone()
+        hit = row is not None
+        self._record(kind, hit)
+        return hit, json.loads(row[0]) if hit else None
+
+    def put(self, kind: str, ticker: str, part: str, payload: Any):
+        """Store a freshly fetched part with its kind-specific expiry"""
+        if not self.config.enabled or payload is None:
+            return
+        now = datetime.now(timezone.utc)
+        expires = self.expires_at(kind, payload, now)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO market_data "
+                "(kind, ticker, part, payload, fetched_at, expires_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (kind, ticker.upper(), part, json.dumps(payload, default=str),
+                 now.timestamp(), expires.timestamp()),
+            )
+
+    def _record(self, kind: str, hit: bool):
+        column = "hits" if hit else "misses"
+        with self._lock:
+            for counts in (self._session_stats, self._unflushed):
+                counts.setdefault(kind, {"hits": 0, "misses": 0})[column] += 1
+            due = clock.monotonic() - self._flushed_at >= self.config.stats_flush_seconds
+        if due:
+            self.flush_stats()
+
+    def flush_stats(self):
+        """Add the counts gathered since the last flush to the all-time totals"""
+        with self._lock:
+            pending, self._unflushed = self._unflushed, {}
+            self._flushed_at = clock.monotonic()
+        if not pending:
+            return
+        try:
+            with self._connect() as conn:
+                conn.executemany(
+                    "INSERT INTO cache_stats (kind, hits, misses) VALUES (?, ?, ?) "
+                    "ON CONFLICT(kind) DO UPDATE SET hits = hits + excluded.hits, misses = misses + excluded.misses",
+                    [(kind, c["hits"], c["misses"]) for kind, c in pending.items()],
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Failed to persist market cache stats: {str(e)}")
+
+    def purge_expired(self) -> int:
+        """Delete stale entries, returning how many were removed"""
+        now = datetime.now(timezone.utc).timestamp()
+        with self._connect() as conn:
+            cursor = conn.execute("DELETE FROM market_data WHERE expires_at <= ?", (now,))
+            return cursor.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counts and hit rate per kind, for this process and all time"""
+        self.flush_stats()
+        with self._connect() as conn:
+            totals = conn.execute("SELECT kind, hits, misses FROM cache_stats").fetchall()
+            entries = dict(conn.execute(
+                "SELECT kind, COUNT(*) FROM market_data GROUP BY kind"
+            ).fetchall())
+
+        def _rate(hits: int, misses: int) -> float:
+            return round(hits / (hits + misses), 3) if hits + misses else 0.0
+
+        with self._lock:
+            session = {
+                kind: {**s, "hit_rate": _rate(s["hits"], s["misses"])}
+                for kind, s in self._session_stats.items()
+            }
+        return {
+            "session": session,
+            "total": {
+                kind: {"hits": hits, "misses": misses, "hit_rate": _rate(hits, misses)}
+                for kind, hits, misses in totals
+            },
+            "entries": entries,
+        }
+
+
+_cache_lock = threading.Lock()
+_cache: Optional[MarketDataCache] = None
+
+
+def get_market_cache() -> MarketDataCache:
+    """Return the process-wide market data cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = MarketDataCache()
+        return _cache
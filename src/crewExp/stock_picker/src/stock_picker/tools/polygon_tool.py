@@ -1,57 +1,351 @@
-# polygon-api-client
-from crewai.tools import BaseTool
-from typing import Type
-from pydantic import BaseModel, Field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Type
+from pydantic import BaseModel, Field, field_validator
+from datetime import date, datetime, timedelta, timezone
+from dataclasses import dataclass
+import asyncio
+import logging
 import os
-from polygon import RESTClient
+import threading
+import time
+from urllib.parse import quote
+import httpx
+import numpy as np
+from crew_common import AsyncBaseTool, request_json, run_async
+from .indicators import compute_indicators, validate_macd_windows
+from .market_cache import FINANCIALS, INDICATORS, REFERENCE, get_market_cache
+from .summarize import SummaryConfig, summarize_market_data
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SMA_WINDOWS = [50]
+DEFAULT_EMA_WINDOWS = [50]
+DEFAULT_MACD_WINDOWS = [12, 26, 9]
+
+
+@dataclass
+class PolygonClientConfig:
+    """Endpoint, timeout and retry settings for Polygon requests"""
+    api_key: str
+    base_url: str = "https://api.polygon.io"
+    connect_timeout: float = 5.0
+    read_timeout: float = 15.0
+    retries: int = 3
+    request_deadline: float = 30.0
+    lookback_days: int = 400
+    requests_per_minute: float = 0.0
+    batch_concurrency: int = 4
+
+    @classmethod
+    def from_env(cls) -> 'PolygonClientConfig':
+        """Create config from environment variables"""
+        return cls(
+            api_key=os.getenv("POLYGON_DATA_TOKEN", ""),
+            base_url=os.getenv("POLYGON_BASE_URL", "https://api.polygon.io"),
+            connect_timeout=float(os.getenv("POLYGON_CONNECT_TIMEOUT", "5")),
+            read_timeout=float(os.getenv("POLYGON_READ_TIMEOUT", "15")),
+            retries=int(os.getenv("POLYGON_RETRIES", "3")),
+            request_deadline=float(os.getenv("POLYGON_REQUEST_DEADLINE", "30")),
+            lookback_days=int(os.getenv("POLYGON_LOOKBACK_DAYS", "400")),
+            requests_per_minute=float(os.getenv("POLYGON_REQUESTS_PER_MINUTE", "0")),
+            batch_concurrency=int(os.getenv("POLYGON_BATCH_CONCURRENCY", "4")),
+        )
+
+
+class RateLimiter:
+    """Token bucket shared by every Polygon request in the process.
+
+    A rate of 0 disables limiting (paid plans); the free tier allows 5/min.
+    """
+
+    def __init__(self, per_minute: float):
+        self.per_minute = per_minute
+        self._capacity = max(1.0, per_minute / 60.0 * 5) if per_minute > 0 else 0.0
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self) -> float:
+        """Take a token if one is available, else return how long to wait"""
+        rate = self.per_minute / 60.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._capacity, self._tokens + (now - self._updated) * rate)
+            self._updated = now
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return 0.0
+            return (1.0 - self._tokens) / rate
+
+    async def acquire(self):
+        """Wait (without blocking the loop) until a request may be sent"""
+        if self.per_minute <= 0:
+            return
+        while True:
+            wait_for = self._take()
+            if wait_for <= 0:
+                return
+            await asyncio.sleep(wait_for)
+
+
+_config_lock = threading.Lock()
+_config: Optional[PolygonClientConfig] = None
+_limiter: Optional[RateLimiter] = None
+
+
+def _get_config() -> PolygonClientConfig:
+    global _config, _limiter
+    with _config_lock:
+        if _config is None:
+            _config = PolygonClientConfig.from_env()
+            _limiter = RateLimiter(_config.requests_per_minute)
+        return _config
+
+
+def _get_limiter() -> RateLimiter:
+    _get_config()
+    return _limiter
+
+
+async def _polygon_get(path_or_url: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """GET a Polygon endpoint over the shared connection pool.
+
+    Retries with backoff on 429/5xx and connect/read errors happen in
+    crew_common.request; the rate limiter is applied to every page. The
+    request deadline starts once the limiter lets the request through, so
+    time queued behind other requests never counts against it.
+    """
+    config = _get_config()
+    await _get_limiter().acquire()
+    url = path_or_url if path_or_url.startswith("http") else f"{config.base_url}{path_or_url}"
+    return await asyncio.wait_for(
+        request_json(
+            "GET",
+            url,
+            params=params,
+            headers={"Authorization": f"Bearer {config.api_key}"} if config.api_key else None,
+            timeout=httpx.Timeout(config.read_timeout, connect=config.connect_timeout),
+            retries=config.retries,
+        ),
+        config.request_deadline,
+    )
+
 
 class PolygonStockRequest(BaseModel):
     """The Ticker to get the market information on"""
     ticker: str = Field(..., description="The stock ticker to research.")
+    sma_windows: List[int] = Field([50], description="Windows (in trading days) for simple moving averages.")
+    ema_windows: List[int] = Field([50], description="Windows (in trading days) for exponential moving averages.")
+    macd_windows: List[int] = Field([12, 26, 9], description="MACD short, long and signal windows.")
+    rsi_window: Optional[int] = Field(14, description="RSI window, or null to skip RSI.")
+    bollinger_window: Optional[int] = Field(20, description="Bollinger band window, or null to skip the bands.")
+    points: int = Field(30, description="How many trailing daily values the indicator trends are computed over.")
+
+    @field_validator("macd_windows")
+    @classmethod
+    def check_macd_windows(cls, value: List[int]) -> List[int]:
+        return list(validate_macd_windows(value))
+
+class PolygonStockTool(AsyncBaseTool):
 
-class PolygonStockTool(BaseTool):
-    
     name: str = "Use the polygon api for market data to get information"
     description: str = (
-        "This tool is used to get stock information from the Polygon API on a specific ticker."
+        "This tool is used to get stock information from the Polygon API on a specific ticker: "
+        "company details, recent financials and daily technical indicators (SMA, EMA, MACD, "
+        "RSI, Bollinger bands) for any windows you ask for."
     )
     args_schema: Type[BaseModel] = PolygonStockRequest
+    # Each part already has its own deadline and retries
+    timeout: float = 120.0
+    max_retries: int = 0
+
+    async def _get_details(self, ticker: str) -> Dict[str, Any]:
+        data = await _polygon_get(f"/v3/reference/tickers/{quote(ticker, safe='')}")
+        return data.get("results") or {}
 
-    def _getFin(self, client, ticker):
+    async def _get_financials(self, ticker: str) -> list:
         financials = []
-        for f in client.vx.list_stock_financials(
-            ticker=ticker,
-            order="asc",
-            limit="5",
-            period_of_report_date_gte="2025-01-01",
-            sort="filing_date",
-            ):
-            financials.append(f.__dict__)
+        data = await _polygon_get("/vX/reference/financials", params={
+            "ticker": ticker,
+            "order": "asc",
+            "limit": 5,
+            "period_of_report_date.gte": "2025-01-01",
+            "sort": "filing_date",
+        })
+        financials.extend(data.get("results") or [])
+        while data.get("next_url"):
+            data = await _polygon_get(data["next_url"])
+            financials.extend(data.get("results") or [])
         return financials
 
-    def _run(self, ticker: str) -> str:
-        polygonToken = os.getenv("POLYGON_DATA_TOKEN")
-        client = RESTClient(polygonToken)
-        gen = client.get_ticker_details(ticker)
-        fin = self._getFin(client, ticker)
-        macd = client.get_macd(
-                ticker=ticker,
-                timespan="day",
-                short_window=12,
-                long_window=26,
-                signal_window=9,
-                series_type="close",
-            )
-        sma = client.get_sma(
-                ticker=ticker,
-                timespan="day",
-                window=50,
-                series_type="close",
-            )
-        ema = client.get_ema(
-                ticker=ticker,
-                timespan="day",
-                window=50,
-                series_type="close",
-            )
-        return {'ticker': ticker, 'financials': fin, 'macd': macd.__dict__, 'sma': sma.__dict__, 'ema': ema.__dict__}
\ No newline at end of file
+    async def _get_aggregates(self, ticker: str) -> Dict[str, list]:
+        """Daily bars for the lookback period, stored column-wise"""
+        today = date.today()
+        start = today - timedelta(days=_get_config().lookback_days)
+        data = await _polygon_get(
+            f"/v2/aggs/ticker/{quote(ticker, safe='')}/range/1/day/{start.isoformat()}/{today.isoformat()}",
+            params={"adjusted": "true", "sort": "asc", "limit": 50000},
+        )
+        bars = data.get("results") or []
+        columns = {"timestamp": "t", "open": "o", "high": "h", "low": "l", "close": "c", "volume": "v"}
+        return {c: [bar.get(key) for bar in bars] for c, key in columns.items()}
+
+    async def _fetch_all(self, ticker: str, requests: Dict[str, Tuple[str, Any]]) -> Dict[str, Any]:
+        """Serve parts from the local cache, fetching the rest concurrently.
+
+        Misses are awaited together, so wall time is bounded by the slowest
+        request (each HTTP call has the configured deadline). Parts that fail
+        or time out are reported under "errors" instead of failing the whole call.
+        """
+        cache = get_market_cache()
+        result: Dict[str, Any] = {"ticker": ticker}
+        missing: Dict[str, Tuple[str, Any]] = {}
+        for part, (kind, fetch) in requests.items():
+            hit, payload = cache.get(kind, ticker, part)
+            if hit:
+                result[part] = payload
+            else:
+                missing[part] = (kind, fetch)
+        if not missing:
+            return result
+
+        config = _get_config()
+        outcomes = await asyncio.gather(
+            *(fetch(ticker) for _, fetch in missing.values()),
+            return_exceptions=True,
+        )
+
+        errors: Dict[str, str] = {}
+        for (part, (kind, _)), outcome in zip(missing.items(), outcomes):
+            if isinstance(outcome, asyncio.TimeoutError):
+                logger.error(f"Polygon {part} request timed out for {ticker}")
+                errors[part] = f"timed out after {config.request_deadline}s"
+                result[part] = None
+            elif isinstance(outcome, BaseException):
+                logger.error(f"Polygon {part} request failed for {ticker}: {str(outcome)}")
+                errors[part] = str(outcome)
+                result[part] = None
+            else:
+                result[part] = outcome
+                cache.put(kind, ticker, part, outcome)
+        if errors:
+            result["errors"] = errors
+        return result
+
+    def _requests(self) -> Dict[str, Tuple[str, Any]]:
+        return {
+            "details": (REFERENCE, self._get_details),
+            "financials": (FINANCIALS, self._get_financials),
+            "aggregates": (INDICATORS, self._get_aggregates),
+        }
+
+    async def _for_each_ticker(self, tickers: List[str],
+                               work: Callable[[str], Awaitable[dict]]) -> Dict[str, Any]:
+        """Run `work` for several tickers concurrently (at most batch_concurrency at a time), keyed by ticker"""
+        tickers = list(dict.fromkeys(t.strip().upper() for t in tickers if t.strip()))
+        semaphore = asyncio.Semaphore(max(1, _get_config().batch_concurrency))
+
+        async def run_one(ticker: str) -> dict:
+            async with semaphore:
+                return await work(ticker)
+
+        results = await asyncio.gather(*(run_one(t) for t in tickers))
+        return dict(zip(tickers, results))
+
+    async def _run_many(self, tickers: List[str], **options) -> Dict[str, Any]:
+        return await self._for_each_ticker(tickers, lambda t: PolygonStockTool._arun(self, t, **options))
+
+    def warm(self, tickers: List[str]) -> Dict[str, Any]:
+        """Prefetch market data for a list of tickers into the local cache (fetch only, no indicators)"""
+        results = run_async(self._for_each_ticker(tickers, lambda t: self._fetch_all(t, self._requests())))
+        failed = {t: r["errors"] for t, r in results.items() if r.get("errors")}
+        return {"warmed": len(results) - len(failed), "failed": failed, "cache": get_market_cache().stats()}
+
+    async def _collect(self, ticker: str, sma_windows: Optional[List[int]] = None,
+                       ema_windows: Optional[List[int]] = None, macd_windows: Optional[List[int]] = None,
+                       rsi_window: Optional[int] = 14, bollinger_window: Optional[int] = 20,
+                       points: int = 30) -> dict:
+        """Full, unsummarized market data for one ticker"""
+        sma_windows = DEFAULT_SMA_WINDOWS if sma_windows is None else sma_windows
+        ema_windows = DEFAULT_EMA_WINDOWS if ema_windows is None else ema_windows
+        macd_windows = DEFAULT_MACD_WINDOWS if macd_windows is None else macd_windows
+        try:
+            validate_macd_windows(macd_windows)
+        except ValueError as e:
+            return {"status": "error", "message": str(e)}
+        result = await self._fetch_all(ticker.upper(), self._requests())
+        aggregates = result.pop("aggregates", None)
+        if not aggregates or not aggregates.get("close"):
+            result["indicators"] = None
+            return result
+        closes = np.array(aggregates["close"], dtype=float)
+        result["indicators"] = {
+            "dates": [datetime.fromtimestamp(t / 1000, tz=timezone.utc).date().isoformat() for t in aggregates["timestamp"][-points:]],
+            "close": [round(c, 4) for c in aggregates["close"][-points:]],
+            **compute_indicators(
+                closes,
+                sma_windows=sma_windows,
+                ema_windows=ema_windows,
+                macd_windows=macd_windows,
+                rsi_window=rsi_window,
+                bollinger_window=bollinger_window,
+                points=points,
+            ),
+        }
+        return result
+
+    async def _arun(self, ticker: str, sma_windows: Optional[List[int]] = None,
+                    ema_windows: Optional[List[int]] = None, macd_windows: Optional[List[int]] = None,
+                    rsi_window: Optional[int] = 14, bollinger_window: Optional[int] = 20,
+                    points: int = 30) -> dict:
+        result = await self._collect(
+            ticker,
+            sma_windows=sma_windows,
+            ema_windows=ema_windows,
+            macd_windows=macd_windows,
+            rsi_window=rsi_window,
+            bollinger_window=bollinger_window,
+            points=points,
+        )
+        if result.get("status") == "error":
+            return result
+        return summarize_market_data(result, SummaryConfig.from_env())
+
+
+class PolygonBatchStockRequest(BaseModel):
+    """The Tickers to get the market information on"""
+    tickers: List[str] = Field(..., description="All the stock tickers to research, e.g. [\"AAPL\", \"MSFT\"].")
+    sma_windows: List[int] = Field([50], description="Windows (in trading days) for simple moving averages.")
+    ema_windows: List[int] = Field([50], description="Windows (in trading days) for exponential moving averages.")
+    macd_windows: List[int] = Field([12, 26, 9], description="MACD short, long and signal windows.")
+    rsi_window: Optional[int] = Field(14, description="RSI window, or null to skip RSI.")
+    bollinger_window: Optional[int] = Field(20, description="Bollinger band window, or null to skip the bands.")
+    points: int = Field(30, description="How many trailing daily values the indicator trends are computed over.")
+
+    @field_validator("macd_windows")
+    @classmethod
+    def check_macd_windows(cls, value: List[int]) -> List[int]:
+        return list(validate_macd_windows(value))
+
+class PolygonBatchStockTool(PolygonStockTool):
+
+    name: str = "Use the polygon api for market data on several tickers at once"
+    description: str = (
+        "This tool gets the same stock information as the single-ticker Polygon tool for a whole "
+        "list of tickers in one call, returned as a table keyed by ticker. Prefer it whenever "
+        "you need market data on more than one company."
+    )
+    args_schema: Type[BaseModel] = PolygonBatchStockRequest
+
+    async def _arun(self, tickers: List[str], sma_windows: Optional[List[int]] = None,
+                    ema_windows: Optional[List[int]] = None, macd_windows: Optional[List[int]] = None,
+                    rsi_window: Optional[int] = 14, bollinger_window: Optional[int] = 20,
+                    points: int = 30) -> dict:
+        return {"tickers": await self._run_many(
+            tickers,
+            sma_windows=sma_windows,
+            ema_windows=ema_windows,
+            macd_windows=macd_windows,
+            rsi_window=rsi_window,
+            bollinger_window=bollinger_window,
+            points=points,
+        )}
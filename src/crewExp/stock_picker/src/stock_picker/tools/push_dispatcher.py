@@ -0,0 +1,199 @@
+"""
+Background dispatcher for Pushover notifications.
+
+`enqueue` returns immediately; a worker coroutine on the shared tool loop
+drains the queue, folds messages that arrive within the digest window into one
+notification and sends it over the shared connection pool. 429s honour
+Retry-After, 5xx and connection errors back off exponentially, and anything
+still pending at exit is flushed with a bounded wait.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+import asyncio
+import atexit
+import logging
+import os
+import threading
+import time
+
+import httpx
+from crew_common import HttpRequestError, get_loop, request
+
+logger = logging.getLogger(__name__)
+
+PUSHOVER_URL = "https://api.pushover.net/1/messages.json"
+
+# Pushover rejects messages longer than this
+MAX_MESSAGE_CHARS = 1024
+
+
+@dataclass
+class PushDispatcherConfig:
+    """Endpoint, credentials, batching and retry settings for push delivery"""
+    url: str = PUSHOVER_URL
+    user: Optional[str] = None
+    token: Optional[str] = None
+    digest_window: float = 5.0
+    connect_timeout: float = 3.0
+    read_timeout: float = 10.0
+    max_retries: int = 5
+    max_queue: int = 1000
+    shutdown_timeout: float = 10.0
+
+    @classmethod
+    def from_env(cls) -> 'PushDispatcherConfig':
+        """Create config from environment variables"""
+        return cls(
+            url=os.getenv("PUSHOVER_URL", PUSHOVER_URL),
+            user=os.getenv("PUSHOVER_USER"),
+            token=os.getenv("PUSHOVER_TOKEN"),
+            digest_window=float(os.getenv("PUSH_DIGEST_WINDOW", "5")),
+            connect_timeout=float(os.getenv("PUSH_CONNECT_TIMEOUT", "3")),
+            read_timeout=float(os.getenv("PUSH_READ_TIMEOUT", "10")),
+            max_retries=int(os.getenv("PUSH_MAX_RETRIES", "5")),
+            max_queue=int(os.getenv("PUSH_MAX_QUEUE", "1000")),
+            shutdown_timeout=float(os.getenv("PUSH_SHUTDOWN_TIMEOUT", "10")),
+        )
+
+
+def build_digest(messages: List[str]) -> List[str]:
+    """Fold messages into as few notifications as fit Pushover's size limit"""
+    if len(messages) == 1:
+        return [messages[0][:MAX_MESSAGE_CHARS]]
+    digests: List[str] = []
+    current = ""
+    for message in messages:
+        line = f"• {message}"[:MAX_MESSAGE_CHARS]
+        candidate = f"{current}\n{line}" if current else line
+        if len(candidate) > MAX_MESSAGE_CHARS:
+            digests.append(current)
+            current = line
+        else:
+            current = candidate
+    if current:
+        digests.append(current)
+    return digests
+
+
+class PushDispatcher:
+    """Queue-backed, coalescing Pushover sender running on the shared tool loop"""
+
+    def __init__(self, config: Optional[PushDispatcherConfig] = None):
+        self.config = config or PushDispatcherConfig.from_env()
+        self._loop = get_loop()
+        self._queue: Optional["asyncio.Queue[str]"] = None
+        self._worker_task: Optional["asyncio.Task"] = None
+        self._lock = threading.Lock()
+        self._done = threading.Condition(self._lock)
+        self._pending = 0
+        self.stats = {"enqueued": 0, "dropped": 0, "sent": 0, "coalesced": 0, "failed": 0, "errors": 0}
+
+    def _put(self, message: str):
+        # Runs on the loop, so the queue and worker are only touched there
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._worker_task is None or self._worker_task.done():
+            self._worker_task = self._loop.create_task(self._worker())
+        self._queue.put_nowait(message)
+
+    def enqueue(self, message: str) -> bool:
+        """Queue a message for delivery from any thread; never waits on the network"""
+        with self._lock:
+            if self._pending >= self.config.max_queue:
+                logger.error(f"Push queue full, dropping message: {message[:80]}")
+                self.stats["dropped"] += 1
+                return False
+            self._pending += 1
+            self.stats["enqueued"] += 1
+        self._loop.call_soon_threadsafe(self._put, message)
+        return True
+
+    async def _drain(self, first: str) -> List[str]:
+        """Collect everything that arrives within the digest window"""
+        batch = [first]
+        deadline = time.monotonic() + self.config.digest_window
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _worker(self):
+        while True:
+            batch = await self._drain(await self._queue.get())
+            try:
+                with self._lock:
+                    self.stats["coalesced"] += len(batch) - 1
+                for digest in build_digest(batch):
+                    await self._send(digest)
+            finally:
+                # Even if the worker is cancelled mid-batch, flush() must not wait on it
+                with self._done:
+                    self._pending -= len(batch)
+                    self._done.notify_all()
+
+    async def _send(self, message: str) -> bool:
+        payload = {"user": self.config.user, "token": self.config.token, "message": message}
+        try:
+            # Shared pooled client; 429s honour Retry-After, 5xx and
+            # connection errors back off with jitter
+            await request(
+                "POST",
+                self.config.url,
+                data={k: v for k, v in payload.items() if v is not None},
+                timeout=httpx.Timeout(self.config.read_timeout, connect=self.config.connect_timeout),
+                retries=self.config.max_retries,
+            )
+        except HttpRequestError as e:
+            logger.error(f"Pushover delivery failed: {str(e)}")
+            with self._lock:
+                self.stats["failed"] += 1
+            return False
+        except Exception as e:
+            # Bad URL, undecodable response, ... must not take the worker down
+            logger.error(f"Pushover delivery failed unexpectedly: {type(e).__name__}: {str(e)}")
+            with self._lock:
+                self.stats["failed"] += 1
+                self.stats["errors"] += 1
+            return False
+        with self._lock:
+            self.stats["sent"] += 1
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued message has been sent (or given up on)"""
+        with self._done:
+            return self._done.wait_for(
+                lambda: self._pending == 0,
+                self.config.shutdown_timeout if timeout is None else timeout,
+            )
+
+    def close(self, timeout: Optional[float] = None):
+        """Deliver what's pending (bounded wait) and stop the worker"""
+        if not self.flush(timeout):
+            logger.error(f"Gave up on {self._pending} undelivered push notifications at shutdown")
+        if self._worker_task is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._worker_task.cancel)
+
+    def summary(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self.stats, "queued": self._pending}
+
+
+_dispatcher: Optional[PushDispatcher] = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_push_dispatcher() -> PushDispatcher:
+    """Process-wide dispatcher, closed (and flushed) at exit"""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = PushDispatcher()
+            atexit.register(_dispatcher.close)
+        return _dispatcher
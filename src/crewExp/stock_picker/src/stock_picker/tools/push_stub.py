@@ -0,0 +1,112 @@
+"""
+Local stand-in for the Pushover messages endpoint.
+
+Records every message it receives and can be told to answer slowly, rate
+limit (429 with Retry-After) or fail, so the dispatcher can be exercised
+without network access or a Pushover account:
+
+    with PushStubServer(fail_first=2) as stub:
+        os.environ["PUSHOVER_URL"] = stub.url
+        ...
+        print(stub.messages)
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs
+import json
+import os
+import threading
+import time
+
+
+class PushStubServer:
+    """In-process HTTP server mimicking POST /1/messages.json"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, delay: float = 0.0,
+                 fail_first: int = 0, rate_limit_first: int = 0, retry_after: int = 1):
+        self.delay = delay
+        self.fail_first = fail_first
+        self.rate_limit_first = rate_limit_first
+        self.retry_after = retry_after
+        self.messages: List[Dict[str, str]] = []
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/1/messages.json"
+
+    def _respond(self, form: Dict[str, str]):
+        """Status, headers and body for the next request"""
+        with self._lock:
+            self.requests += 1
+            if self.rate_limit_first > 0:
+                self.rate_limit_first -= 1
+                return 429, {"Retry-After": str(self.retry_after)}, {"status": 0, "errors": ["rate limited"]}
+            if self.fail_first > 0:
+                self.fail_first -= 1
+                return 500, {}, {"status": 0, "errors": ["server error"]}
+            if not form.get("message"):
+                return 400, {}, {"status": 0, "errors": ["message cannot be blank"]}
+            self.messages.append(form)
+            return 200, {}, {"status": 1, "request": f"stub-{len(self.messages)}"}
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length).decode("utf-8")
+                form = {k: v[0] for k, v in parse_qs(body).items()}
+                if stub.delay:
+                    time.sleep(stub.delay)
+                status, headers, payload = stub._respond(form)
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> 'PushStubServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, name="push-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> 'PushStubServer':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    """Serve the stub in the foreground and print each message it receives"""
+    port = int(os.getenv("PUSH_STUB_PORT", "8765"))
+    stub = PushStubServer(port=port).start()
+    print(f"Push stub listening on {stub.url}  (set PUSHOVER_URL to use it)")
+    seen = 0
+    try:
+        while True:
+            time.sleep(0.5)
+            while seen < len(stub.messages):
+                print(f"--- message {seen + 1} ---\n{stub.messages[seen].get('message')}")
+                seen += 1
+    except KeyboardInterrupt:
+        stub.stop()
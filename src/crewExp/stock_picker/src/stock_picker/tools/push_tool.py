@@ -1,29 +1,32 @@
-from crewai.tools import BaseTool
 from typing import Type
+import logging
 from pydantic import BaseModel, Field
-import os
-import requests
+from crew_common import AsyncBaseTool
+
+from .push_dispatcher import get_push_dispatcher
+
+logger = logging.getLogger(__name__)
 
 
 class PushNotification(BaseModel):
     """A message to be sent to the user"""
     message: str = Field(..., description="The message to be sent to the user.")
 
-class PushNotificationTool(BaseTool):
-    
+class PushNotificationTool(AsyncBaseTool):
+
 
     name: str = "Send a Push Notification"
     description: str = (
         "This tool is used to send a push notification to the user."
     )
     args_schema: Type[BaseModel] = PushNotification
+    timeout: float = 5.0
+    max_retries: int = 0
 
-    def _run(self, message: str) -> str:
-        pushover_user = os.getenv("PUSHOVER_USER")
-        pushover_token = os.getenv("PUSHOVER_TOKEN")
-        pushover_url = "https://api.pushover.net/1/messages.json"
-
-        print(f"Push: {message}")
-        payload = {"user": pushover_user, "token": pushover_token, "message": message}
-        requests.post(pushover_url, data=payload)
-        return '{"notification": "ok"}'
\ No newline at end of file
+    async def _arun(self, message: str) -> str:
+        logger.info(f"Push: {message}")
+        # Delivery happens on the dispatcher's worker; a slow or down
+        # Pushover API never holds up the task
+        if get_push_dispatcher().enqueue(message):
+            return '{"notification": "queued"}'
+        return '{"notification": "dropped", "reason": "queue full"}'
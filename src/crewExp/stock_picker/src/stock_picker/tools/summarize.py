@@ -0,0 +1,278 @@
+"""
+Compact, size-bounded summaries of Polygon tool results.
+
+The raw payload (nested financial statements, full indicator series) is far
+larger than what the researcher agent needs and ends up in every later prompt
+of the crew. `summarize_market_data` keeps the key fields and the latest
+values/trends, then trims in stages until the result fits a token budget.
+If the named trims are not enough, whole fields and list items are dropped
+until it fits, so the result is always a complete JSON object.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import json
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+# Rough chars-per-token ratio for English/JSON with OpenAI tokenizers
+CHARS_PER_TOKEN = 4
+
+# Tickers come from the LLM; anything else is not used in a file name
+TICKER_PATTERN = re.compile(r"^[A-Z.\-]{1,10}$")
+
+# Sections emptied by the last-resort trim, least useful first
+FALLBACK_ORDER = ("indicators", "financials", "details", "errors")
+
+DETAIL_FIELDS = (
+    "name", "market_cap", "primary_exchange", "sic_description",
+    "total_employees", "list_date", "homepage_url",
+)
+
+FINANCIAL_FIELDS = {
+    "revenue": ("income_statement", "revenues"),
+    "gross_profit": ("income_statement", "gross_profit"),
+    "operating_income": ("income_statement", "operating_income_loss"),
+    "net_income": ("income_statement", "net_income_loss"),
+    "eps_diluted": ("income_statement", "diluted_earnings_per_share"),
+    "total_assets": ("balance_sheet", "assets"),
+    "total_liabilities": ("balance_sheet", "liabilities"),
+    "equity": ("balance_sheet", "equity"),
+    "operating_cash_flow": ("cash_flow_statement", "net_cash_flow_from_operating_activities"),
+    "net_cash_flow": ("cash_flow_statement", "net_cash_flow"),
+}
+
+
+@dataclass
+class SummaryConfig:
+    """Budget and full-payload settings for tool result summaries"""
+    token_budget: int = 600
+    max_filings: int = 2
+    description_chars: int = 240
+    full_payload_dir: str = ""
+
+    @classmethod
+    def from_env(cls) -> 'SummaryConfig':
+        """Create config from environment variables"""
+        return cls(
+            token_budget=int(os.getenv("POLYGON_TOKEN_BUDGET", "600")),
+            max_filings=int(os.getenv("POLYGON_MAX_FILINGS", "2")),
+            description_chars=int(os.getenv("POLYGON_DESCRIPTION_CHARS", "240")),
+            full_payload_dir=os.getenv("POLYGON_FULL_PAYLOAD_DIR", ""),
+        )
+
+
+def estimate_tokens(value: Any) -> int:
+    """Approximate the prompt tokens a JSON-serialized value will cost"""
+    return len(json.dumps(value, default=str, separators=(",", ":"))) // CHARS_PER_TOKEN + 1
+
+
+def _summarize_details(details: Optional[Dict[str, Any]], description_chars: int) -> Optional[Dict[str, Any]]:
+    if not details:
+        return None
+    summary = {k: details[k] for k in DETAIL_FIELDS if details.get(k) is not None}
+    description = details.get("description")
+    if description and description_chars > 0:
+        summary["description"] = (
+            description if len(description) <= description_chars
+            else description[:description_chars].rsplit(" ", 1)[0] + "..."
+        )
+    return summary
+
+
+def _statement_value(filing: Dict[str, Any], statement: str, field: str) -> Optional[float]:
+    section = (filing.get("financials") or {}).get(statement) or {}
+    point = section.get(field)
+    if isinstance(point, dict):
+        return point.get("value")
+    return None
+
+
+def _summarize_financials(financials: Optional[List[Dict[str, Any]]], max_filings: int) -> Optional[List[Dict[str, Any]]]:
+    if not financials:
+        return None
+    latest = sorted(financials, key=lambda f: f.get("filing_date") or "", reverse=True)[:max_filings]
+    summaries = []
+    for filing in latest:
+        summary = {
+            "period": f"{filing.get('fiscal_period', '')} {filing.get('fiscal_year', '')}".strip(),
+            "filing_date": filing.get("filing_date"),
+        }
+        for name, (statement, field) in FINANCIAL_FIELDS.items():
+            value = _statement_value(filing, statement, field)
+            if value is not None:
+                summary[name] = value
+        summaries.append(summary)
+    return summaries
+
+
+def _latest(series: List[Optional[float]]) -> Optional[float]:
+    for value in reversed(series or []):
+        if value is not None:
+            return value
+    return None
+
+
+def _trend(series: List[Optional[float]]) -> Optional[Dict[str, Any]]:
+    values = [v for v in series or [] if v is not None]
+    if not values:
+        return None
+    first, last = values[0], values[-1]
+    change = last - first
+    scale = abs(first) or 1.0
+    direction = "flat" if abs(change) / scale < 0.005 else ("up" if change > 0 else "down")
+    return {"latest": last, "change": round(change, 4), "trend": direction}
+
+
+def _summarize_indicators(indicators: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if not indicators:
+        return None
+    close = indicators.get("close") or []
+    last_close = _latest(close)
+    summary: Dict[str, Any] = {
+        "as_of": (indicators.get("dates") or [None])[-1],
+        "close": _trend(close),
+        "recent_close": close[-5:],
+    }
+    for kind in ("sma", "ema"):
+        for window, series in (indicators.get(kind) or {}).items():
+            trend = _trend(series)
+            if trend and last_close is not None:
+                trend["price_vs"] = "above" if last_close >= trend["latest"] else "below"
+            summary[f"{kind}_{window}"] = trend
+
+    macd = indicators.get("macd")
+    if macd:
+        histogram = [v for v in macd.get("histogram") or [] if v is not None]
+        crossover = None
+        for previous, current in zip(histogram[-6:], histogram[-5:]):
+            if previous < 0 <= current:
+                crossover = "bullish"
+            elif previous >= 0 > current:
+                crossover = "bearish"
+        summary["macd"] = {
+            "windows": macd.get("windows"),
+            "value": _latest(macd.get("value")),
+            "signal": _latest(macd.get("signal")),
+            "histogram": _trend(macd.get("histogram")),
+            "recent_crossover": crossover,
+        }
+
+    for window, series in (indicators.get("rsi") or {}).items():
+        value = _latest(series)
+        if value is not None:
+            zone = "overbought" if value >= 70 else "oversold" if value <= 30 else "neutral"
+            summary[f"rsi_{window}"] = {"latest": value, "zone": zone}
+
+    bands = indicators.get("bollinger")
+    if bands:
+        upper, lower = _latest(bands.get("upper")), _latest(bands.get("lower"))
+        percent_b = None
+        if None not in (upper, lower, last_close) and upper != lower:
+            percent_b = round((last_close - lower) / (upper - lower), 3)
+        summary["bollinger"] = {
+            "window": bands.get("window"),
+            "upper": upper,
+            "lower": lower,
+            "percent_b": percent_b,
+        }
+    return summary
+
+
+def _write_full_payload(result: Dict[str, Any], directory: str) -> Optional[str]:
+    try:
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+        ticker = str(result.get("ticker") or "")
+        name = ticker if TICKER_PATTERN.match(ticker) else "unknown"
+        file_path = path / f"{name}-{stamp}.json"
+        file_path.write_text(json.dumps(result, default=str))
+        return str(file_path)
+    except OSError as e:
+        logger.error(f"Could not write full Polygon payload: {str(e)}")
+        return None
+
+
+def _drop_recent_close(summary: Dict[str, Any]):
+    if summary.get("indicators"):
+        summary["indicators"].pop("recent_close", None)
+
+
+def _drop_description(summary: Dict[str, Any]):
+    if summary.get("details"):
+        summary["details"].pop("description", None)
+
+
+def _keep_latest_filing(summary: Dict[str, Any]):
+    if summary.get("financials"):
+        summary["financials"] = summary["financials"][:1]
+
+
+def _drop_bollinger(summary: Dict[str, Any]):
+    if summary.get("indicators"):
+        summary["indicators"].pop("bollinger", None)
+
+
+def _keep_name_and_market_cap(summary: Dict[str, Any]):
+    if summary.get("details"):
+        details = summary["details"]
+        summary["details"] = {k: details[k] for k in ("name", "market_cap") if k in details}
+
+
+# Applied in order, least useful first, until the summary fits
+TRIMS = (
+    _drop_recent_close,
+    _drop_description,
+    _keep_latest_filing,
+    _drop_bollinger,
+    _keep_name_and_market_cap,
+)
+
+
+def _drop_one_item(summary: Dict[str, Any]) -> bool:
+    """Remove the last field or list item of the first non-empty fallback section"""
+    for section in FALLBACK_ORDER:
+        value = summary.get(section)
+        if isinstance(value, dict) and value:
+            value.popitem()
+        elif isinstance(value, list) and value:
+            value.pop()
+        elif section in summary:
+            del summary[section]
+        else:
+            continue
+        return True
+    return False
+
+
+def summarize_market_data(result: Dict[str, Any], config: Optional[SummaryConfig] = None) -> Dict[str, Any]:
+    """Reduce a full Polygon tool result to a summary within the token budget"""
+    config = config or SummaryConfig.from_env()
+    summary: Dict[str, Any] = {"ticker": result.get("ticker")}
+    if result.get("errors"):
+        summary["errors"] = result["errors"]
+    if config.full_payload_dir:
+        path = _write_full_payload(result, config.full_payload_dir)
+        if path:
+            summary["full_payload"] = path
+
+    summary["details"] = _summarize_details(result.get("details"), config.description_chars)
+    summary["financials"] = _summarize_financials(result.get("financials"), config.max_filings)
+    summary["indicators"] = _summarize_indicators(result.get("indicators"))
+
+    for trim in TRIMS:
+        if estimate_tokens(summary) <= config.token_budget:
+            return summary
+        trim(summary)
+
+    if estimate_tokens(summary) > config.token_budget:
+        summary["truncated"] = True
+        while estimate_tokens(summary) > config.token_budget and _drop_one_item(summary):
+            pass
+    return summary
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Tests for the local technical indicators.
+Checks the vectorized implementations against straightforward loops.
+Run directly, or with pytest.
+"""
+
+import importlib.util
+import math
+import sys
+from pathlib import Path
+
+import numpy as np
+
+spec = importlib.util.spec_from_file_location("indicators", Path(__file__).parent / "indicators.py")
+indicators = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(indicators)
+
+rng = np.random.default_rng(7)
+CLOSES = 100 + np.cumsum(rng.normal(0, 1.5, 300))
+
+
+def loop_ema(values, window):
+    out = [math.nan] * len(values)
+    out[window - 1] = sum(values[:window]) / window
+    alpha = 2 / (window + 1)
+    for i in range(window, len(values)):
+        out[i] = alpha * values[i] + (1 - alpha) * out[i - 1]
+    return np.array(out)
+
+
+def test_sma_matches_rolling_mean():
+    result = indicators.sma(CLOSES, 20)
+    assert np.isnan(result[:19]).all()
+    expected = [CLOSES[i - 19:i + 1].mean() for i in range(19, len(CLOSES))]
+    assert np.allclose(result[19:], expected)
+
+
+def test_sma_short_series_is_all_nan():
+    assert np.isnan(indicators.sma(CLOSES[:5], 20)).all()
+
+
+def test_ema_matches_recursive_definition():
+    for window in (5, 50, 200):
+        assert np.allclose(indicators.ema(CLOSES, window), loop_ema(CLOSES, window), equal_nan=True)
+
+
+def test_ema_long_series_stays_finite():
+    # Long series exercise the blocked closed form of the smoothing
+    closes = 100 + np.cumsum(rng.normal(0, 1, 5000))
+    result = indicators.ema(closes, 3)
+    assert np.isfinite(result[2:]).all()
+    assert np.allclose(result, loop_ema(closes, 3), equal_nan=True)
+
+
+def test_macd_histogram_is_line_minus_signal():
+    result = indicators.macd(CLOSES, 12, 26, 9)
+    line = loop_ema(CLOSES, 12) - loop_ema(CLOSES, 26)
+    assert np.allclose(result["value"], line, equal_nan=True)
+    valid = ~np.isnan(result["signal"])
+    assert valid.sum() == len(CLOSES) - 25 - 8
+    assert np.allclose(result["histogram"][valid], (result["value"] - result["signal"])[valid])
+
+
+def test_rsi_bounds_and_monotonic_series():
+    result = indicators.rsi(CLOSES, 14)
+    assert np.isnan(result[:14]).all()
+    assert ((result[14:] >= 0) & (result[14:] <= 100)).all()
+    rising = np.arange(1.0, 60.0)
+    assert np.allclose(indicators.rsi(rising, 14)[14:], 100.0)
+
+
+def test_bollinger_bands_are_symmetric():
+    bands = indicators.bollinger(CLOSES, 20, 2.0)
+    expected_std = np.array([CLOSES[i - 19:i + 1].std() for i in range(19, len(CLOSES))])
+    assert np.allclose(bands["upper"][19:] - bands["middle"][19:], 2.0 * expected_std)
+    assert np.allclose(bands["middle"][19:] - bands["lower"][19:], 2.0 * expected_std)
+
+
+def test_compute_indicators_compact_output():
+    result = indicators.compute_indicators(CLOSES[:40], sma_windows=[10, 50], points=5)
+    assert set(result) == {"sma", "ema", "macd", "rsi", "bollinger"}
+    assert len(result["sma"]["10"]) == 5
+    assert result["sma"]["50"] == [None] * 5
+    assert result["macd"]["windows"] == [12, 26, 9]
+
+
+def test_compute_indicators_skips_optional_sets():
+    result = indicators.compute_indicators(CLOSES, macd_windows=[], rsi_window=None, bollinger_window=None)
+    assert set(result) == {"sma", "ema"}
+
+
+def test_macd_windows_must_be_three_positive_ints():
+    assert indicators.validate_macd_windows([12, 26, 9]) == (12, 26, 9)
+    for bad in ([12, 26], [12, 26, 9, 3], [12, 0, 9], [12.5, 26, 9]):
+        try:
+            indicators.validate_macd_windows(bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"{bad} was accepted")
+    try:
+        indicators.compute_indicators(CLOSES, macd_windows=[12, 26])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("compute_indicators accepted two MACD windows")
+
+
+def main():
+    """Run all tests"""
+    print("🧪 Indicator Test Suite")
+    print("=" * 50)
+    tests = [(name, fn) for name, fn in globals().items() if name.startswith("test_") and callable(fn)]
+    failed = 0
+    for name, fn in tests:
+        try:
+            fn()
+            print(f"✅ {name}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {name}: {e}")
+    print("=" * 50)
+    print(f"📊 {len(tests) - failed}/{len(tests)} passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Tests for the Polygon market data tools.
+Runs the tools against a local stand-in for the Polygon API, covering the
+batch tool, its concurrency cap, the rate limiter and the market cache.
+Run from the crew's environment (`uv run python -m
+stock_picker.tools.test_polygon_tool`), or with pytest.
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from crew_common import run_async
+
+from stock_picker.tools import market_cache, polygon_tool
+from stock_picker.tools.market_cache import MarketCacheConfig, MarketDataCache
+from stock_picker.tools.polygon_tool import (
+    PolygonBatchStockTool,
+    PolygonClientConfig,
+    PolygonStockTool,
+    RateLimiter,
+)
+
+
+class PolygonStub:
+    """Answers the three endpoints the tool uses, counting requests and peak concurrency"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.paths = []
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with stub._lock:
+                    stub.paths.append(self.path)
+                    stub.in_flight += 1
+                    stub.peak = max(stub.peak, stub.in_flight)
+                try:
+                    if stub.delay:
+                        time.sleep(stub.delay)
+                    data = json.dumps(stub.payload(self.path)).encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the client gave up on a slow answer
+                finally:
+                    with stub._lock:
+                        stub.in_flight -= 1
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    @staticmethod
+    def payload(path: str):
+        if path.startswith("/v3/reference/tickers/"):
+            return {"results": {"ticker": path.rsplit("/", 1)[-1], "name": "Test Corp"}}
+        if path.startswith("/vX/reference/financials"):
+            return {"results": [{"filing_date": "2025-05-01", "fiscal_period": "Q1"}]}
+        day = 86_400_000
+        return {"results": [
+            {"t": 1_700_000_000_000 + i * day, "o": 100 + i, "h": 101 + i, "l": 99 + i, "c": 100 + i, "v": 1000}
+            for i in range(60)
+        ]}
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def configure(stub: PolygonStub, tmp: str, **overrides):
+    """Point the tool at the stub and a fresh cache"""
+    config = PolygonClientConfig(api_key="test", base_url=stub.url, retries=0, **overrides)
+    polygon_tool._config = config
+    polygon_tool._limiter = RateLimiter(config.requests_per_minute)
+    market_cache._cache = MarketDataCache(MarketCacheConfig(db_path=str(Path(tmp) / "market.db")))
+
+
+def test_batch_returns_every_ticker_once():
+    stub = PolygonStub()
+    with tempfile.TemporaryDirectory() as tmp:
+        configure(stub, tmp)
+        result = run_async(PolygonBatchStockTool()._arun(["aapl", "AAPL", " msft "]))
+        assert list(result["tickers"]) == ["AAPL", "MSFT"]
+        assert all(r["ticker"] == t for t, r in result["tickers"].items())
+        # Three parts per ticker, duplicates fetched once
+        assert len(stub.paths) == 6
+    stub.stop()
+
+
+def test_batch_concurrency_is_capped():
+    stub = PolygonStub(delay=0.2)
+    with tempfile.TemporaryDirectory() as tmp:
+        configure(stub, tmp, batch_concurrency=1)
+        run_async(PolygonBatchStockTool()._arun(["AAPL", "MSFT", "NVDA"]))
+        # One ticker at a time, its three parts in parallel
+        assert stub.peak == 3
+    stub.stop()
+
+
+def test_limiter_spaces_requests_after_the_burst():
+    limiter = RateLimiter(per_minute=60)
+
+    async def take(n: int) -> float:
+        started = time.perf_counter()
+        for _ in range(n):
+            await limiter.acquire()
+        return time.perf_counter() - started
+
+    assert run_async(take(5)) < 0.1  # burst capacity
+    assert 0.8 <= run_async(take(1)) < 1.5
+
+
+def test_limiter_wait_does_not_count_against_the_deadline():
+    stub = PolygonStub()
+    with tempfile.TemporaryDirectory() as tmp:
+        # Nine requests at 1/s with a burst of five: the last ones queue for
+        # seconds, far longer than the deadline on each HTTP call
+        configure(stub, tmp, requests_per_minute=60, request_deadline=0.5)
+        tool = PolygonStockTool()
+        results = run_async(tool._for_each_ticker(
+            ["AAPL", "MSFT", "NVDA"], lambda t: tool._fetch_all(t, tool._requests()),
+        ))
+        assert all("errors" not in r for r in results.values()), {t: r.get("errors") for t, r in results.items()}
+        assert len(stub.paths) == 9
+    stub.stop()
+
+
+def test_slow_request_times_out_as_a_part_error():
+    stub = PolygonStub(delay=1.0)
+    with tempfile.TemporaryDirectory() as tmp:
+        configure(stub, tmp, request_deadline=0.2)
+        result = run_async(PolygonStockTool()._collect("AAPL"))
+        assert set(result["errors"]) == {"details", "financials", "aggregates"}
+        assert result["indicators"] is None
+    stub.stop()
+
+
+def test_cached_parts_are_not_refetched():
+    stub = PolygonStub()
+    with tempfile.TemporaryDirectory() as tmp:
+        configure(stub, tmp)
+        tool = PolygonStockTool()
+        first = run_async(tool._collect("AAPL"))
+        second = run_async(tool._collect("AAPL"))
+        assert len(stub.paths) == 3
+        assert first == second and first["indicators"]["close"]
+        session = market_cache.get_market_cache().stats()["session"]
+        assert sum(s["hits"] for s in session.values()) == 3
+        assert sum(s["misses"] for s in session.values()) == 3
+    stub.stop()
+
+
+def test_warm_fetches_into_the_cache():
+    stub = PolygonStub()
+    with tempfile.TemporaryDirectory() as tmp:
+        configure(stub, tmp)
+        report = PolygonStockTool().warm(["AAPL", "MSFT"])
+        assert report["warmed"] == 2 and report["failed"] == {}
+        run_async(PolygonStockTool()._collect("MSFT"))
+        assert len(stub.paths) == 6
+    stub.stop()
+
+
+def main():
+    """Run all tests"""
+    print("🧪 Polygon Tool Test Suite")
+    print("=" * 50)
+    tests = [(name, fn) for name, fn in globals().items() if name.startswith("test_") and callable(fn)]
+    failed = 0
+    for name, fn in tests:
+        try:
+            fn()
+            print(f"✅ {name}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {name}: {e!r}")
+    print("=" * 50)
+    print(f"📊 {len(tests) - failed}/{len(tests)} passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Tests for the push notification dispatcher.
+Runs PushDispatcher against the local PushStubServer, so no Pushover
+account or network access is needed. Run directly, or with pytest.
+"""
+
+import importlib.util
+import sys
+import time
+from pathlib import Path
+
+
+def load(name: str):
+    spec = importlib.util.spec_from_file_location(name, Path(__file__).parent / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+push_dispatcher = load("push_dispatcher")
+push_stub = load("push_stub")
+
+PushDispatcher = push_dispatcher.PushDispatcher
+PushDispatcherConfig = push_dispatcher.PushDispatcherConfig
+PushStubServer = push_stub.PushStubServer
+
+
+def dispatcher_for(stub: PushStubServer, digest_window: float = 0.0, **overrides) -> PushDispatcher:
+    config = PushDispatcherConfig(url=stub.url, user="user", token="token",
+                                  digest_window=digest_window, shutdown_timeout=10.0, **overrides)
+    return PushDispatcher(config)
+
+
+def test_messages_in_window_are_coalesced():
+    with PushStubServer() as stub:
+        dispatcher = dispatcher_for(stub, digest_window=0.5)
+        for ticker in ("AAPL", "MSFT", "NVDA"):
+            assert dispatcher.enqueue(f"Buy {ticker}")
+        assert dispatcher.flush()
+        assert len(stub.messages) == 1
+        assert all(f"Buy {t}" in stub.messages[0]["message"] for t in ("AAPL", "MSFT", "NVDA"))
+        summary = dispatcher.summary()
+        assert summary["sent"] == 1 and summary["coalesced"] == 2 and summary["queued"] == 0
+        dispatcher.close()
+
+
+def test_rate_limit_honours_retry_after():
+    with PushStubServer(rate_limit_first=1, retry_after=1) as stub:
+        dispatcher = dispatcher_for(stub)
+        started = time.monotonic()
+        dispatcher.enqueue("Buy AAPL")
+        assert dispatcher.flush()
+        assert time.monotonic() - started >= 1.0
+        assert stub.requests == 2
+        assert [m["message"] for m in stub.messages] == ["Buy AAPL"]
+        dispatcher.close()
+
+
+def test_server_errors_are_retried():
+    with PushStubServer(fail_first=2) as stub:
+        dispatcher = dispatcher_for(stub)
+        dispatcher.enqueue("Buy AAPL")
+        assert dispatcher.flush()
+        assert stub.requests == 3
+        assert dispatcher.summary()["sent"] == 1
+        dispatcher.close()
+
+
+def test_gives_up_after_max_retries():
+    with PushStubServer(fail_first=10) as stub:
+        dispatcher = dispatcher_for(stub, max_retries=1)
+        dispatcher.enqueue("Buy AAPL")
+        assert dispatcher.flush()
+        assert stub.requests == 2
+        assert dispatcher.summary()["failed"] == 1
+        dispatcher.close()
+
+
+def test_close_flushes_pending_messages():
+    with PushStubServer() as stub:
+        dispatcher = dispatcher_for(stub, digest_window=1.0)
+        dispatcher.enqueue("Buy AAPL")
+        dispatcher.enqueue("Sell MSFT")
+        dispatcher.close()
+        assert dispatcher.summary()["queued"] == 0
+        assert len(stub.messages) == 1
+        assert "Sell MSFT" in stub.messages[0]["message"]
+
+
+def test_unexpected_errors_do_not_stop_the_worker():
+    with PushStubServer() as stub:
+        dispatcher = dispatcher_for(stub)
+        dispatcher.config.url = "http://[::1"  # httpx.InvalidURL, not a transport error
+        dispatcher.enqueue("Buy AAPL")
+        # Returns promptly instead of waiting out shutdown_timeout
+        assert dispatcher.flush(timeout=5.0)
+        assert dispatcher.summary()["errors"] == 1
+        dispatcher.config.url = stub.url
+        dispatcher.enqueue("Sell MSFT")
+        assert dispatcher.flush(timeout=5.0)
+        assert [m["message"] for m in stub.messages] == ["Sell MSFT"]
+        dispatcher.close()
+
+
+def test_full_queue_drops_messages():
+    with PushStubServer(delay=0.5) as stub:
+        dispatcher = dispatcher_for(stub, max_queue=2)
+        assert dispatcher.enqueue("one")
+        assert dispatcher.enqueue("two")
+        assert not dispatcher.enqueue("three")
+        assert dispatcher.summary()["dropped"] == 1
+        dispatcher.close()
+
+
+def main():
+    """Run all tests"""
+    print("🧪 Push Dispatcher Test Suite")
+    print("=" * 50)
+    tests = [(name, fn) for name, fn in globals().items() if name.startswith("test_") and callable(fn)]
+    failed = 0
+    for name, fn in tests:
+        try:
+            fn()
+            print(f"✅ {name}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {name}: {e!r}")
+    print("=" * 50)
+    print(f"📊 {len(tests) - failed}/{len(tests)} passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Tests for the Polygon result summaries.
+Checks the trim ladder keeps summaries within budget as valid, complete JSON
+and that LLM-supplied tickers never reach a file name unchecked.
+Run directly, or with pytest.
+"""
+
+import importlib.util
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+spec = importlib.util.spec_from_file_location("summarize", Path(__file__).parent / "summarize.py")
+summarize = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(summarize)
+
+
+def sample_result(ticker="AAPL"):
+    series = [100 + i * 0.5 for i in range(30)]
+    filing = {
+        "fiscal_period": "Q1",
+        "fiscal_year": "2025",
+        "financials": {
+            "income_statement": {"revenues": {"value": 1.2e11}, "net_income_loss": {"value": 2.5e10}},
+            "balance_sheet": {"assets": {"value": 3.5e11}},
+        },
+    }
+    return {
+        "ticker": ticker,
+        "details": {
+            "name": "Apple Inc.",
+            "market_cap": 3.1e12,
+            "primary_exchange": "XNAS",
+            "sic_description": "ELECTRONIC COMPUTERS",
+            "description": "Apple designs smartphones, computers and services. " * 20,
+        },
+        "financials": [dict(filing, filing_date=f"2025-0{m}-01") for m in range(1, 5)],
+        "indicators": {
+            "dates": [f"2025-01-{d:02d}" for d in range(1, 31)],
+            "close": series,
+            "sma": {"50": series},
+            "ema": {"50": series},
+            "macd": {"windows": [12, 26, 9], "value": series, "signal": series, "histogram": series},
+            "rsi": {"14": [55.0] * 30},
+            "bollinger": {"window": 20, "upper": series, "lower": series},
+        },
+    }
+
+
+def summary_for(budget, **options):
+    config = summarize.SummaryConfig(token_budget=budget, **options)
+    summary = summarize.summarize_market_data(sample_result(), config)
+    # Must round-trip as a complete JSON object
+    assert json.loads(json.dumps(summary)) == summary
+    return summary
+
+
+def test_large_budget_keeps_everything():
+    summary = summary_for(10_000)
+    assert "truncated" not in summary
+    assert "recent_close" in summary["indicators"]
+    assert "description" in summary["details"]
+    assert len(summary["financials"]) == 2
+
+
+def test_named_trims_run_in_order():
+    full = summary_for(10_000)
+    budget = summarize.estimate_tokens(full) - 1
+    summary = summary_for(budget)
+    assert "recent_close" not in summary["indicators"]
+    assert "description" in summary["details"]
+    assert summarize.estimate_tokens(summary) <= budget
+
+    summary = summary_for(budget - 60)
+    assert "description" not in summary["details"]
+    assert "bollinger" in summary["indicators"]
+
+
+def test_named_trims_leave_missing_sections_alone():
+    summary = {"ticker": "AAPL", "details": None, "financials": None, "indicators": None}
+    for trim in summarize.TRIMS:
+        trim(summary)
+    assert summary == {"ticker": "AAPL", "details": None, "financials": None, "indicators": None}
+
+
+def test_fallback_drops_whole_items_until_it_fits():
+    for budget in (120, 80, 40):
+        summary = summary_for(budget)
+        assert summary["truncated"] is True
+        assert summary["ticker"] == "AAPL"
+        assert summarize.estimate_tokens(summary) <= budget
+        # Whatever is left of a section is whole, not a sliced string
+        for filing in summary.get("financials") or []:
+            assert isinstance(filing, dict)
+
+
+def test_fallback_keeps_ticker_and_payload_path_when_nothing_else_fits():
+    with tempfile.TemporaryDirectory() as tmp:
+        summary = summary_for(1, full_payload_dir=tmp)
+        assert summary["ticker"] == "AAPL"
+        assert Path(summary["full_payload"]).exists()
+        assert not any(k in summary for k in summarize.FALLBACK_ORDER)
+
+
+def test_full_payload_name_ignores_unsafe_tickers():
+    with tempfile.TemporaryDirectory() as tmp:
+        for ticker, prefix in (("BRK.B", "BRK.B-"), ("../../etc/passwd", "unknown-"), ("aapl/x", "unknown-"), (None, "unknown-")):
+            path = Path(summarize._write_full_payload(sample_result(ticker), tmp))
+            assert path.parent == Path(tmp), path
+            assert path.name.startswith(prefix), path.name
+
+
+def main():
+    """Run all tests"""
+    print("🧪 Summary Test Suite")
+    print("=" * 50)
+    tests = [(name, fn) for name, fn in globals().items() if name.startswith("test_") and callable(fn)]
+    failed = 0
+    for name, fn in tests:
+        try:
+            fn()
+            print(f"✅ {name}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {name}: {e}")
+    print("=" * 50)
+    print(f"📊 {len(tests) - failed}/{len(tests)} passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
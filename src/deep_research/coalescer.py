@@ -0,0 +1,199 @@
+"""
+Single-flight coalescing of identical research queries.
+
+Requests with the same normalized query and settings share one
+ResearchManager run. Each subscriber gets the full progress stream: a late
+joiner first replays what it missed. When the last subscriber leaves, the
+shared run is cancelled. Completed runs can be kept for a short TTL so a
+repeat query replays the finished stream instead of running again.
+"""
+
+from dataclasses import asdict, dataclass
+import asyncio
+import json
+import os
+import re
+import time
+
+from research_manager import ResearchManager
+from speculative import SpeculativeConfig
+from writer_agent import ReportData
+
+
+@dataclass
+class CoalesceConfig:
+    """Research coalescing configuration"""
+    enabled: bool = True
+    ttl_seconds: float = 0.0
+
+    @classmethod
+    def from_env(cls) -> 'CoalesceConfig':
+        """Create config from environment variables"""
+        return cls(
+            enabled=os.getenv('AI_LAB_COALESCE', '1') != '0',
+            ttl_seconds=float(os.getenv('AI_LAB_COALESCE_TTL', '0')),
+        )
+
+
+def normalize_query(query: str) -> str:
+    return re.sub(r"\s+", " ", query).strip().rstrip("?.!").lower()
+
+
+def flight_key(query: str, speculative: SpeculativeConfig) -> str:
+    return json.dumps({"query": normalize_query(query), "speculative": asdict(speculative)}, sort_keys=True)
+
+
+class Flight:
+    """One shared ResearchManager run and the progress it has produced so far"""
+
+    def __init__(self, key: str, manager: ResearchManager):
+        self.key = key
+        self.manager = manager
+        self.chunks: list[str] = []
+        self.subscribers: set['Subscription'] = set()
+        self.error: Exception | None = None
+        self.finished_at: float | None = None
+        self.abandoned = False
+        # Every subscriber that has followed this run, cache replays included
+        self.attached = 0
+        self._changed = asyncio.Event()
+        self.task: asyncio.Task | None = None
+
+    @property
+    def finished(self) -> bool:
+        return self.finished_at is not None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.finished and self.error is None and self.manager.report is not None \
+            and "cancelled" not in self.manager.metrics
+
+    def start(self, query: str):
+        self.task = asyncio.create_task(self._drive(query))
+
+    def notify(self):
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def wait(self):
+        await self._changed.wait()
+
+    async def _drive(self, query: str):
+        try:
+            async for chunk in self.manager.run(query):
+                self.chunks.append(chunk)
+                self.notify()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.finished_at = time.monotonic()
+            self.notify()
+
+    def detach(self, subscription: 'Subscription', reason: str):
+        self.subscribers.discard(subscription)
+        if not self.subscribers and not self.finished and not self.abandoned:
+            self.abandoned = True
+            self.manager.cancel(f"all subscribers left ({reason})")
+
+
+class Subscription:
+    """One caller's view of a flight: iterate for the progress stream, then read `report`"""
+
+    def __init__(self, flight: Flight, joined: bool, cached: bool):
+        self.flight = flight
+        self.joined = joined
+        self.cached = cached
+        self.closed = False
+
+    @property
+    def report(self) -> ReportData | None:
+        return self.flight.manager.report
+
+    @property
+    def metrics(self) -> dict:
+        return {
+            **self.flight.manager.metrics,
+            "coalesced": self.joined,
+            "cached": self.cached,
+            "subscribers": self.flight.attached,
+        }
+
+    def cancel(self, reason: str = "cancelled"):
+        """Stop following the flight; the run itself stops only if nobody else follows it"""
+        if self.closed:
+            return
+        self.closed = True
+        self.flight.detach(self, reason)
+        self.flight.notify()
+
+    async def __aiter__(self):
+        sent = 0
+        try:
+            while not self.closed:
+                while sent < len(self.flight.chunks):
+                    yield self.flight.chunks[sent]
+                    sent += 1
+                if self.flight.finished:
+                    if self.flight.error is not None:
+                        raise self.flight.error
+                    break
+                await self.flight.wait()
+        finally:
+            self.cancel("consumer closed")
+
+
+class ResearchCoalescer:
+    """Share in-flight and recently completed research runs between identical requests"""
+
+    def __init__(self, config: CoalesceConfig | None = None):
+        self.config = config or CoalesceConfig.from_env()
+        self.inflight: dict[str, Flight] = {}
+        self.completed: dict[str, Flight] = {}
+        self.stats = {"runs": 0, "joined": 0, "cache_hits": 0}
+
+    def subscribe(self, query: str) -> Subscription:
+        """Attach to a matching run, or start one; must be called on the running loop"""
+        speculative = SpeculativeConfig.from_env()
+        key = flight_key(query, speculative)
+        self._evict()
+        if self.config.enabled:
+            flight = self.completed.get(key)
+            if flight is not None:
+                self.stats["cache_hits"] += 1
+                return self._attach(flight, joined=True, cached=True)
+            flight = self.inflight.get(key)
+            if flight is not None and not flight.abandoned:
+                self.stats["joined"] += 1
+                return self._attach(flight, joined=True, cached=False)
+
+        flight = Flight(key, ResearchManager(speculative))
+        self.stats["runs"] += 1
+        if self.config.enabled:
+            self.inflight[key] = flight
+        subscription = self._attach(flight, joined=False, cached=False)
+        flight.start(query)
+        flight.task.add_done_callback(lambda _: self._finish(flight))
+        return subscription
+
+    async def run(self, query: str):
+        """Same stream as ResearchManager.run, shared with identical concurrent queries"""
+        async for chunk in self.subscribe(query):
+            yield chunk
+
+    def _attach(self, flight: Flight, joined: bool, cached: bool) -> Subscription:
+        subscription = Subscription(flight, joined, cached)
+        flight.subscribers.add(subscription)
+        flight.attached += 1
+        return subscription
+
+    def _finish(self, flight: Flight):
+        if self.inflight.get(flight.key) is flight:
+            del self.inflight[flight.key]
+        if self.config.enabled and self.config.ttl_seconds > 0 and flight.succeeded:
+            self.completed[flight.key] = flight
+
+    def _evict(self):
+        now = time.monotonic()
+        for key, flight in list(self.completed.items()):
+            if now - flight.finished_at > self.config.ttl_seconds:
+                del self.completed[key]
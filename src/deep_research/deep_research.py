@@ -1,13 +1,35 @@
 import gradio as gr
 from dotenv import load_dotenv
-from research_manager import ResearchManager
+from coalescer import ResearchCoalescer, Subscription
+
+from ai_lab.tracing import install_local_tracing
 
 load_dotenv(override=True)
+install_local_tracing()
+
+# Identical queries from different sessions share one run
+coalescer = ResearchCoalescer()
+
+# What each browser session is following, so a new query or a closed tab can stop it
+active_runs: dict[str, Subscription] = {}
+
 
+def cancel_session(request: gr.Request):
+    subscription = active_runs.pop(request.session_hash, None)
+    if subscription is not None:
+        subscription.cancel("superseded or disconnected")
 
-async def run(query: str):
-    async for chunk in ResearchManager().run(query):
-        yield chunk
+
+async def run(query: str, request: gr.Request):
+    cancel_session(request)
+    subscription = coalescer.subscribe(query)
+    active_runs[request.session_hash] = subscription
+    try:
+        async for chunk in subscription:
+            yield chunk
+    finally:
+        if active_runs.get(request.session_hash) is subscription:
+            del active_runs[request.session_hash]
 
 
 with gr.Blocks(theme=gr.themes.Default(primary_hue="sky")) as ui:
@@ -15,9 +37,11 @@ with gr.Blocks(theme=gr.themes.Default(primary_hue="sky")) as ui:
     query_textbox = gr.Textbox(label="What topic would you like to research?")
     run_button = gr.Button("Run", variant="primary")
     report = gr.Markdown(label="Report")
-    
-    run_button.click(fn=run, inputs=query_textbox, outputs=report)
-    query_textbox.submit(fn=run, inputs=query_textbox, outputs=report)
 
-ui.launch(inbrowser=True)
+    # The unqueued cancel fires straight away; a queued run could sit behind the one it replaces
+    for trigger in (run_button.click, query_textbox.submit):
+        trigger(fn=cancel_session, queue=False)
+        trigger(fn=run, inputs=query_textbox, outputs=report, trigger_mode="multiple")
+    ui.unload(cancel_session)
 
+ui.launch(inbrowser=True)
@@ -1,6 +1,8 @@
 from pydantic import BaseModel, Field
 from agents import Agent
 
+from ai_lab.cascade import cascade_model
+
 HOW_MANY_SEARCHES = 5
 
 INSTRUCTIONS = f"You are a helpful research assistant. Given a query, come up with a set of web searches \
@@ -14,10 +16,20 @@ class WebSearchItem(BaseModel):
 
 class WebSearchPlan(BaseModel):
     searches: list[WebSearchItem] = Field(description="A list of web searches to perform to best answer the query.")
-    
+
+
+def check_plan(plan: WebSearchPlan):
+    """Escalate plans that come back short or with blank queries"""
+    if len(plan.searches) < HOW_MANY_SEARCHES:
+        return "too few searches"
+    if any(not item.query.strip() for item in plan.searches):
+        return "blank query"
+    return None
+
+
 planner_agent = Agent(
     name="PlannerAgent",
     instructions=INSTRUCTIONS,
-    model="gpt-4o-mini",
+    model=cascade_model("PlannerAgent", checks=[check_plan]),
     output_type=WebSearchPlan,
 )
\ No newline at end of file
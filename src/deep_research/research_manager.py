@@ -1,12 +1,50 @@
-from agents import Runner, trace, gen_trace_id
+from agents import Runner, custom_span, trace, gen_trace_id
 from search_agent import search_agent
 from planner_agent import planner_agent, WebSearchItem, WebSearchPlan
 from writer_agent import writer_agent, ReportData
 from email_agent import email_agent
+from speculative import SpeculativeConfig, SpeculativeStats, baseline_items, match_baselines
 import asyncio
+import time
 
 class ResearchManager:
 
+    def __init__(self, speculative: SpeculativeConfig | None = None):
+        self.speculative = speculative or SpeculativeConfig.from_env()
+        # Timings and search counts of the most recent run
+        self.metrics: dict = {}
+        self.report: ReportData | None = None
+        self.cancel_reason: str | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self._cancelled: set[asyncio.Task] = set()
+
+    def spawn(self, coro) -> asyncio.Task:
+        """ Run a stage or search as a task that cancel() can reach """
+        if self.cancel_reason:
+            coro.close()
+            raise asyncio.CancelledError(self.cancel_reason)
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+        return task
+
+    def _task_done(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if task.cancelled():
+            self._cancelled.add(task)
+
+    def cancel(self, reason: str = "cancelled") -> int:
+        """ Stop the run from outside: cancel every outstanding task, returning how many """
+        self.cancel_reason = self.cancel_reason or reason
+        return self._cancel_outstanding()
+
+    def _cancel_outstanding(self) -> int:
+        pending = [task for task in self._tasks if not task.done()]
+        for task in pending:
+            task.cancel()
+        self._cancelled.update(pending)
+        return len(pending)
+
     async def run(self, query: str):
         """ Run the deep research process, yielding the status updates and the final report"""
         trace_id = gen_trace_id()
@@ -14,16 +52,56 @@ class ResearchManager:
             print(f"View trace: https://platform.openai.com/traces/trace?trace_id={trace_id}")
             yield f"View trace: https://platform.openai.com/traces/trace?trace_id={trace_id}"
             print("Starting research...")
-            search_plan = await self.plan_searches(query)
-            yield "Searches planned, starting to search..."     
-            search_results = await self.perform_searches(search_plan)
-            yield "Searches complete, writing report..."
-            report = await self.write_report(query, search_results)
-            yield "Report written, sending email..."
-            await self.send_email(report)
-            yield "Email sent, research complete"
-            yield report.markdown_report
-        
+            self.metrics = metrics = {"speculative": self.speculative.enabled}
+            start = time.perf_counter()
+            stage = "planning"
+            try:
+                baselines = self.start_baselines(query) if self.speculative.enabled else []
+                search_plan = await self.spawn(self.plan_searches(query))
+                metrics["plan_ms"] = round((time.perf_counter() - start) * 1000, 1)
+                stage = "searching"
+                yield "Searches planned, starting to search..."     
+                search_results = await self.spawn(self.perform_searches(search_plan, baselines))
+                metrics["search_ms"] = round((time.perf_counter() - start) * 1000 - metrics["plan_ms"], 1)
+                stage = "writing"
+                yield "Searches complete, writing report..."
+                report = self.report = await self.spawn(self.write_report(query, search_results))
+                stage = "emailing"
+                yield "Report written, sending email..."
+                await self.spawn(self.send_email(report))
+                metrics["total_ms"] = round((time.perf_counter() - start) * 1000, 1)
+                stage = "done"
+                yield "Email sent, research complete"
+                yield report.markdown_report
+            except (asyncio.CancelledError, GeneratorExit) as e:
+                # GeneratorExit: the consumer closed the generator, e.g. the UI disconnected
+                if stage != "done":
+                    self.record_cancellation(stage, start)
+                if self.cancel_reason and not self.cancelled_from_outside(e):
+                    return
+                raise
+            finally:
+                self._cancel_outstanding()
+
+    @staticmethod
+    def cancelled_from_outside(error: BaseException) -> bool:
+        """ True if the task running the research was itself cancelled, not just a stage cancel() stopped """
+        task = asyncio.current_task()
+        return isinstance(error, asyncio.CancelledError) and task is not None and task.cancelling() > 0
+
+    def record_cancellation(self, stage: str, start: float):
+        """ Note what was still running when the run was cancelled """
+        reason = self.cancel_reason or "consumer closed"
+        self._cancel_outstanding()
+        self.metrics.update({
+            "cancelled": reason,
+            "cancelled_stage": stage,
+            "cancelled_tasks": len(self._cancelled),
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+        })
+        print(f"Research cancelled while {stage} ({reason})")
+        with custom_span("research_cancelled", data=dict(self.metrics)):
+            pass
 
     async def plan_searches(self, query: str) -> WebSearchPlan:
         """ Plan the searches to perform for the query """
@@ -35,11 +113,44 @@ class ResearchManager:
         print(f"Will perform {len(result.final_output.searches)} searches")
         return result.final_output_as(WebSearchPlan)
 
-    async def perform_searches(self, search_plan: WebSearchPlan) -> list[str]:
+    def start_baselines(self, query: str) -> list[tuple[WebSearchItem, asyncio.Task]]:
+        """ Start searches on the raw query so they run while the planner thinks """
+        items = baseline_items(query, self.speculative.searches)
+        print(f"Starting {len(items)} speculative searches...")
+        return [(item, self.spawn(self.search(item))) for item in items]
+
+    def reconcile_baselines(self, search_plan: WebSearchPlan,
+                            baselines: list[tuple[WebSearchItem, asyncio.Task]]) -> dict[int, asyncio.Task]:
+        """ Keep baselines that overlap a planned search, cancel or drop the rest """
+        matches = match_baselines([item for item, _ in baselines], search_plan, self.speculative.overlap)
+        kept = set(matches.values())
+        stats = SpeculativeStats(launched=len(baselines), kept=len(kept))
+        for b, (_, task) in enumerate(baselines):
+            if b in kept:
+                continue
+            if task.done():
+                stats.discarded += 1
+            else:
+                task.cancel()
+                stats.cancelled += 1
+        print(f"Speculative searches: kept {stats.kept}/{stats.launched}, wasted {stats.wasted}")
+        self.metrics["baseline"] = stats.as_dict()
+        with custom_span("speculative_searches", data={
+            **stats.as_dict(),
+            "kept_for": [search_plan.searches[p].query for p in matches],
+        }):
+            pass
+        return {p: baselines[b][1] for p, b in matches.items()}
+
+    async def perform_searches(self, search_plan: WebSearchPlan,
+                               baselines: list[tuple[WebSearchItem, asyncio.Task]] | None = None) -> list[str]:
         """ Perform the searches to perform for the query """
         print("Searching...")
         num_completed = 0
-        tasks = [asyncio.create_task(self.search(item)) for item in search_plan.searches]
+        reused = self.reconcile_baselines(search_plan, baselines) if baselines else {}
+        tasks = [reused.get(i) or self.spawn(self.search(item))
+                 for i, item in enumerate(search_plan.searches)]
+        self.metrics["searches"] = len(tasks) - len(reused) + len(baselines or [])
         results = []
         for task in asyncio.as_completed(tasks):
             result = await task
@@ -0,0 +1,97 @@
+"""
+Speculative baseline searches for ResearchManager.
+
+While the planner is thinking, one or two searches derived from the raw query
+are already running. When the plan arrives, a baseline that overlaps a planned
+search stands in for it; the others are cancelled, or dropped if they already
+finished.
+"""
+
+from dataclasses import asdict, dataclass
+import os
+import re
+
+from planner_agent import WebSearchItem, WebSearchPlan
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how", "in", "is", "it",
+    "of", "on", "or", "the", "to", "vs", "what", "when", "which", "who", "why", "with",
+}
+
+BASELINE_SUFFIXES = ["", "latest developments"]
+
+
+@dataclass
+class SpeculativeConfig:
+    """Speculative search configuration"""
+    enabled: bool = False
+    searches: int = 2
+    overlap: float = 0.6
+
+    @classmethod
+    def from_env(cls) -> 'SpeculativeConfig':
+        """Create config from environment variables"""
+        return cls(
+            enabled=os.getenv('AI_LAB_SPECULATIVE', '0') == '1',
+            searches=max(1, min(int(os.getenv('AI_LAB_SPECULATIVE_SEARCHES', '2')), len(BASELINE_SUFFIXES))),
+            overlap=float(os.getenv('AI_LAB_SPECULATIVE_OVERLAP', '0.6')),
+        )
+
+
+@dataclass
+class SpeculativeStats:
+    """What happened to the baseline searches of one run"""
+    launched: int = 0
+    kept: int = 0
+    cancelled: int = 0
+    discarded: int = 0
+
+    @property
+    def wasted(self) -> int:
+        return self.cancelled + self.discarded
+
+    def as_dict(self) -> dict:
+        return {**asdict(self), "wasted": self.wasted}
+
+
+def terms(text: str) -> set[str]:
+    return {word for word in re.findall(r"[a-z0-9]+", text.lower()) if word not in STOPWORDS}
+
+
+def overlap(a: str, b: str) -> float:
+    """Jaccard similarity of two queries' terms"""
+    ta, tb = terms(a), terms(b)
+    if not ta or not tb:
+        return 0.0
+    return len(ta & tb) / len(ta | tb)
+
+
+def baseline_items(query: str, count: int) -> list[WebSearchItem]:
+    """Searches that can start from the raw query before there is a plan"""
+    items = []
+    for suffix in BASELINE_SUFFIXES[:count]:
+        items.append(WebSearchItem(
+            reason="Baseline search started from the raw query while planning",
+            query=f"{query} {suffix}".strip(),
+        ))
+    return items
+
+
+def match_baselines(baselines: list[WebSearchItem], plan: WebSearchPlan, threshold: float) -> dict[int, int]:
+    """Map planned search index -> baseline index, best overlaps first, each used once"""
+    candidates = sorted(
+        ((overlap(base.query, item.query), p, b)
+         for b, base in enumerate(baselines)
+         for p, item in enumerate(plan.searches)),
+        reverse=True,
+    )
+    matches: dict[int, int] = {}
+    used: set[int] = set()
+    for score, p, b in candidates:
+        if score < threshold:
+            break
+        if p in matches or b in used:
+            continue
+        matches[p] = b
+        used.add(b)
+    return matches
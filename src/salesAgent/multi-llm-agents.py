@@ -8,6 +8,8 @@ import os
 from sendgrid.helpers.mail import Mail, Email, To, Content
 from pydantic import BaseModel
 
+from ai_lab.cascade import cascade_model
+
 load_dotenv(override=True)
 
 openai_api_key = os.getenv('OPENAI_API_KEY')
@@ -126,7 +128,7 @@ guardrail_agent = Agent(
     name="Name check",
     instructions="Check if the user is including someone's personal name in what they want you to do.",
     output_type=NameCheckOutput,
-    model="gpt-4o-mini"
+    model=cascade_model("Name check")
 )
 
 @input_guardrail
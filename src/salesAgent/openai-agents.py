@@ -15,6 +15,9 @@ from agents import Agent, Runner, trace, function_tool
 import sendgrid
 from sendgrid.helpers.mail import Mail, Email, To, Content
 
+from ai_lab.cascade import cascade_model
+from ai_lab.tracing import install_local_tracing
+
 # Configure logging
 logging.basicConfig(
     level=os.getenv('LOG_LEVEL', 'INFO'),
@@ -23,6 +26,7 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 load_dotenv(override=True)
+install_local_tracing()
 
 
 @dataclass
@@ -58,12 +62,27 @@ class EmailConfig:
         return bool(re.match(pattern, email))
 
 
+MAX_SUBJECT_LENGTH = 120
+
+
+def check_subject_line(subject: str) -> Optional[str]:
+    """Escalate subjects that are multi-line or too long to be a subject line"""
+    subject = subject.strip().strip('"')
+    if "\n" in subject:
+        return "multi-line subject"
+    if len(subject) > MAX_SUBJECT_LENGTH:
+        return "subject too long"
+    return None
+
+
 class SalesAgentSystem:
     """Production-ready sales agent system for automated cold email generation"""
     
-    def __init__(self, email_config: EmailConfig, model: str = "gpt-4o-mini"):
+    def __init__(self, email_config: EmailConfig, model: Optional[str] = None):
         self.email_config = email_config
-        self.model = model
+        # Without an explicit model the subject writer escalates to AI_LAB_CASCADE_LARGE_MODEL
+        self.escalation_model = model
+        self.model = model or "gpt-4o-mini"
         self._setup_agents()
         self._setup_tools()
         
@@ -111,7 +130,7 @@ class SalesAgentSystem:
         self.subject_writer = Agent(
             name="Subject Writer",
             instructions=subject_instructions,
-            model=self.model
+            model=cascade_model("Subject Writer", large=self.escalation_model, checks=[check_subject_line])
         )
 
         self.html_converter = Agent(